@@ -1,6 +1,6 @@
 from django.contrib import admin
 from .models import (
-    MaterialCategory, MaterialType, Material, MaterialEntry, MaterialTransaction,
+    MaterialCategory, MaterialType, Material, MaterialEntry, MaterialTransaction, StockMovement,
     MachineType, Machine, Operator, AttachmentType, MaterialAttachment,
     Client, ContactPerson, ClientHistory, Communication, ClientDocument
 )
@@ -61,6 +61,12 @@ class MaterialAdmin(admin.ModelAdmin):
         }),
     )
     
+    def get_readonly_fields(self, request, obj=None):
+        # Stock and average price are maintained by the stock ledger once the material exists
+        if obj:
+            return self.readonly_fields + Material.LEDGER_FIELDS
+        return self.readonly_fields
+    
     def save_model(self, request, obj, form, change):
         if not change:  # Only set created_by for new objects
             obj.created_by = request.user
@@ -80,6 +86,23 @@ class MaterialTransactionAdmin(admin.ModelAdmin):
     search_fields = ('material__material_id', 'material__name', 'job_reference', 'operator_name', 'notes')
     date_hierarchy = 'transaction_date'
 
+@admin.register(StockMovement)
+class StockMovementAdmin(admin.ModelAdmin):
+    list_display = ('id', 'material', 'movement_type', 'quantity', 'balance_after', 'average_cost_after', 'reference', 'created_at')
+    list_filter = ('movement_type', 'created_at')
+    search_fields = ('material__material_id', 'material__name', 'reference', 'operator_name', 'notes')
+    date_hierarchy = 'created_at'
+    
+    # The ledger is append-only and written through StockMovement.record()
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def has_delete_permission(self, request, obj=None):
+        return False
+
 @admin.register(AttachmentType)
 class AttachmentTypeAdmin(admin.ModelAdmin):
     list_display = ('id', 'name')
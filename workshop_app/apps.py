@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class WorkshopAppConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'workshop_app'
+    
+    def ready(self):
+        # Connect the search index, cache and database handlers
+        from . import signals
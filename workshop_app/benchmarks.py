@@ -0,0 +1,264 @@
+import platform
+import statistics
+import time
+import tracemalloc
+
+import django
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from . import lookup_cache, request_metrics
+from .models import Job, JobFinancial, Material, MachineSession, StockMovement, JobActivityLog
+
+# Benchmarks of the busiest views and model methods, run against a seeded
+# database (manage.py seed_workshop). Each case is timed over several runs,
+# then run once more with its queries captured and memory traced, so the
+# instrumentation doesn't inflate the times. Results are plain dicts that
+# the benchmark command writes as JSON and compares with an earlier run.
+
+ITERATIONS = 5
+WARMUP = 1
+
+# Slower or bigger than the baseline by more than this fraction is a regression.
+# Times are compared by the fastest run, the one least disturbed by whatever
+# else the machine was doing.
+DEFAULT_THRESHOLD = 0.25
+
+# Differences smaller than these are noise, whatever the fraction
+MIN_TIME_DIFFERENCE_MS = 1.0
+MIN_MEMORY_DIFFERENCE_KB = 64
+
+BENCHMARK_USERNAME = 'benchmark'
+
+# Row counts recorded with the results, so runs on different data stand out
+DATASET_MODELS = (Material, StockMovement, Job, MachineSession, JobActivityLog)
+
+CASES = {}
+
+
+def case(name):
+    """Register a benchmark: fn(subjects) returns the function to time"""
+    def register(fn):
+        CASES[name] = fn
+        return fn
+    return register
+
+
+class Subjects:
+    """
+    The rows the cases work on: the job with the most material usage and
+    the material with the longest stock ledger, so the same dataset always
+    gives the same (and the heaviest typical) pages
+    """
+    
+    def __init__(self):
+        self.job = (
+            Job.objects.annotate(rows=Count('materials')).order_by('-rows', 'pk').first()
+        )
+        self.material = (
+            Material.objects.annotate(rows=Count('stock_movements')).order_by('-rows', 'pk').first()
+        )
+        if self.job is None or self.material is None:
+            raise ValueError("No jobs or materials to benchmark - seed the database first (manage.py seed_workshop)")
+        
+        user, created = User.objects.get_or_create(
+            username=BENCHMARK_USERNAME, defaults={'is_staff': True, 'first_name': 'Benchmark'}
+        )
+        if created:
+            user.set_unusable_password()
+            user.save()
+        self.client = Client()
+        self.client.force_login(user)
+
+
+def get_page(subjects, url, params=None):
+    def run():
+        response = subjects.client.get(url, params)
+        if response.status_code != 200:
+            raise RuntimeError(f"GET {url} returned {response.status_code}")
+    return run
+
+
+def rolled_back(fn):
+    """Run fn in a transaction that is rolled back, for cases that write"""
+    def run():
+        with transaction.atomic():
+            fn()
+            transaction.set_rollback(True)
+    return run
+
+
+@case('dashboard_view')
+def dashboard_view(subjects):
+    return get_page(subjects, reverse('workshop_app:dashboard'))
+
+
+@case('material_list')
+def material_list(subjects):
+    return get_page(subjects, reverse('workshop_app:material_list'))
+
+
+@case('job_detail')
+def job_detail(subjects):
+    return get_page(subjects, reverse('workshop_app:job_detail', args=[subjects.job.job_id]))
+
+
+@case('job_detail_financials')
+def job_detail_financials(subjects):
+    """The job page when its financial summary has to be built first"""
+    page = get_page(subjects, reverse('workshop_app:job_detail', args=[subjects.job.job_id]))
+    
+    def run():
+        JobFinancial.objects.filter(job=subjects.job).delete()
+        page()
+    return rolled_back(run)
+
+
+@case('machine_usage_list')
+def machine_usage_list(subjects):
+    return get_page(subjects, reverse('workshop_app:machine_usage_list'))
+
+
+@case('machine_usage_report')
+def machine_usage_report(subjects):
+    return get_page(subjects, reverse('workshop_app:machine_usage_report'), {'period': 'week'})
+
+
+@case('material_lookup')
+def material_lookup(subjects):
+    return get_page(subjects, reverse('workshop_app:material_lookup'), {'identifier': subjects.material.material_id})
+
+
+@case('job_lookup')
+def job_lookup(subjects):
+    return get_page(subjects, reverse('workshop_app:job_lookup'), {'identifier': subjects.job.job_id})
+
+
+@case('Job.create_financial_summary')
+def create_financial_summary(subjects):
+    return rolled_back(subjects.job.create_financial_summary)
+
+
+@case('Material.update_price_and_stock')
+def update_price_and_stock(subjects):
+    return rolled_back(subjects.material.update_price_and_stock)
+
+
+def clear_caches():
+    cache.clear()
+    lookup_cache.clear_local()
+
+
+def measure(run, iterations=ITERATIONS, warmup=WARMUP, cold=True):
+    """
+    Wall times of iterations runs, then the queries and peak memory of one
+    more. With cold=True the cache is cleared before every run, so the
+    database work is measured rather than cache hits.
+    """
+    for _ in range(warmup):
+        if cold:
+            clear_caches()
+        run()
+    
+    times = []
+    for _ in range(iterations):
+        if cold:
+            clear_caches()
+        started = time.perf_counter()
+        run()
+        times.append((time.perf_counter() - started) * 1000)
+    
+    if cold:
+        clear_caches()
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    
+    return {
+        'median_ms': round(statistics.median(times), 3),
+        'min_ms': round(min(times), 3),
+        'max_ms': round(max(times), 3),
+        'queries': len(queries.captured_queries),
+        'sql_ms': round(sum(float(query['time']) for query in queries.captured_queries) * 1000, 3),
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+
+
+def run_benchmarks(names=None, iterations=ITERATIONS, warmup=WARMUP, cold=True, progress=None):
+    """
+    Run the named cases (default: all) and return the results with details
+    of the run. A case that raises is recorded with its error instead.
+    """
+    subjects = Subjects()
+    results = {}
+    # No request samples written or request log lines while measuring
+    with override_settings(REQUEST_METRICS_SAMPLE_RATE=0), request_metrics.logging_disabled():
+        for name in names or CASES:
+            try:
+                results[name] = measure(CASES[name](subjects), iterations, warmup, cold)
+            except Exception as e:
+                # One broken page shouldn't stop the others being measured
+                results[name] = {'error': f"{type(e).__name__}: {e}"}
+            if progress:
+                progress(name, results[name])
+    
+    database = connection.vendor
+    if database == 'sqlite':
+        database += f" {connection.Database.sqlite_version}"
+    return {
+        'meta': {
+            'created': timezone.now().isoformat(),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': database,
+            'iterations': iterations,
+            'cold_cache': cold,
+            'job': subjects.job.job_id,
+            'material': subjects.material.material_id,
+            'rows': {model.__name__: model.objects.count() for model in DATASET_MODELS},
+        },
+        'cases': results,
+    }
+
+
+def compare(baseline, current, threshold=DEFAULT_THRESHOLD):
+    """
+    Regressions of current against baseline (both as returned by
+    run_benchmarks): {case: [description, ...]} for every case that
+    failed, got slower, ran more queries or used more memory. A failing
+    case is a regression whatever the baseline did.
+    """
+    regressions = {}
+    for name, result in current['cases'].items():
+        if 'error' in result:
+            regressions[name] = [f"failed: {result['error']}"]
+            continue
+        before = baseline['cases'].get(name)
+        if before is None or 'error' in before:
+            continue
+        
+        problems = []
+        time_difference = result['min_ms'] - before['min_ms']
+        if time_difference > before['min_ms'] * threshold and time_difference > MIN_TIME_DIFFERENCE_MS:
+            problems.append(f"fastest run {before['min_ms']:.1f} ms -> {result['min_ms']:.1f} ms")
+        
+        if result['queries'] > before['queries']:
+            problems.append(f"queries {before['queries']} -> {result['queries']}")
+        
+        memory_difference = result['peak_memory_kb'] - before['peak_memory_kb']
+        if memory_difference > before['peak_memory_kb'] * threshold and memory_difference > MIN_MEMORY_DIFFERENCE_KB:
+            problems.append(f"peak memory {before['peak_memory_kb']:.0f} KB -> {result['peak_memory_kb']:.0f} KB")
+        
+        if problems:
+            regressions[name] = problems
+    return regressions
@@ -0,0 +1,44 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
+
+# Workshop-wide dashboard tiles are shared by every user for a short while
+CACHE_KEY = 'workshop_app:dashboard_stats'
+CACHE_TIMEOUT = 60
+
+# Number of low-stock materials listed on the dashboard
+LOW_STOCK_LIMIT = 5
+
+
+def calculate_dashboard_stats():
+    """Material and machine tiles for the dashboard, in three queries"""
+    from .models import Material, Machine
+    from .models.material import LOW_STOCK_FILTER
+    
+    material_counts = Material.objects.aggregate(
+        materials_count=Count('pk'),
+        low_stock_count=Count('pk', filter=LOW_STOCK_FILTER),
+    )
+    low_stock_materials = list(Material.objects.low_stock().order_by('name')[:LOW_STOCK_LIMIT])
+    
+    machine_counts = Machine.objects.aggregate(
+        machines_count=Count('pk'),
+        active_machines=Count('pk', filter=Q(status='active')),
+        maintenance_machines=Count('pk', filter=Q(status='maintenance')),
+    )
+    
+    return {
+        **material_counts,
+        'low_stock_materials': low_stock_materials,
+        **machine_counts,
+    }
+
+
+def get_dashboard_stats():
+    """Cached dashboard tiles, recalculated at most once per CACHE_TIMEOUT"""
+    return cache.get_or_set(CACHE_KEY, calculate_dashboard_stats, CACHE_TIMEOUT)
+
+
+def invalidate_dashboard_stats():
+    """Drop the cached tiles once the current transaction commits"""
+    transaction.on_commit(lambda: cache.delete(CACHE_KEY))
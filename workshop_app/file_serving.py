@@ -0,0 +1,204 @@
+import mimetypes
+import os
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe
+
+# Uploaded files (attachments, receipts, documents) are served through here
+# rather than straight from MEDIA_URL: streamed in chunks, with byte ranges,
+# conditional GET and a sniffed content type, or handed to the front web
+# server when settings.FILE_OFFLOAD is set. Uploads are untrusted, so only
+# raster images and PDFs are shown in the browser; anything else (HTML,
+# SVG, scripts) is downloaded as an opaque attachment.
+
+CHUNK_SIZE = 64 * 1024
+
+# Bytes read to recognise a file by its contents
+SNIFF_LENGTH = 16
+
+# Leading bytes of common upload types, for files without a useful extension
+SIGNATURES = (
+    (b'%PDF-', 'application/pdf'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'GIF87a', 'image/gif'),
+    (b'GIF89a', 'image/gif'),
+    (b'BM', 'image/bmp'),
+    (b'PK\x03\x04', 'application/zip'),
+)
+
+# Types safe to display inline
+INLINE_TYPES = frozenset((
+    'application/pdf',
+    'image/png',
+    'image/jpeg',
+    'image/gif',
+    'image/bmp',
+    'image/webp',
+))
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def sniff_content_type(path):
+    """Content type from the file's extension, or its first bytes if that fails"""
+    content_type, encoding = mimetypes.guess_type(path)
+    if content_type and not encoding:
+        return content_type
+    
+    with open(path, 'rb') as f:
+        head = f.read(SNIFF_LENGTH)
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'image/webp'
+    for signature, content_type in SIGNATURES:
+        if head.startswith(signature):
+            return content_type
+    return 'application/octet-stream'
+
+
+def parse_range(header, size):
+    """
+    (start, end) of a single-range Range header, inclusive, None to serve
+    the whole file, or False when the range can't be satisfied
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if not match or not any(match.groups()):
+        return None
+    
+    first, last = match.groups()
+    if not first:
+        # Suffix range: the last N bytes
+        length = int(last)
+        if length == 0:
+            return False
+        return max(size - length, 0), size - 1
+    
+    start = int(first)
+    if last and int(last) < start:
+        # Not a valid range at all - ignored, as RFC 9110 says
+        return None
+    if start >= size:
+        return False
+    end = min(int(last), size - 1) if last else size - 1
+    return start, end
+
+
+def iter_range(path, start, end):
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def content_disposition(filename, as_attachment):
+    disposition = 'attachment' if as_attachment else 'inline'
+    try:
+        filename.encode('ascii')
+        return f'{disposition}; filename="{filename}"'
+    except UnicodeEncodeError:
+        return f"{disposition}; filename*=utf-8''{quote(filename)}"
+
+
+def file_response(request, field_file, as_attachment=False):
+    """
+    Response serving a stored FileField file, honouring Range, If-Range,
+    If-None-Match and If-Modified-Since
+    """
+    if not field_file:
+        raise Http404("No file")
+    try:
+        path = field_file.path
+    except NotImplementedError:
+        raise Http404("File not found")
+    return path_response(request, path, as_attachment)
+
+
+def path_response(request, path, as_attachment=False):
+    """file_response() for a file under MEDIA_ROOT given by its path"""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        raise Http404("File not found")
+    
+    size = stat.st_size
+    last_modified = int(stat.st_mtime)
+    etag = f'"{size:x}-{last_modified:x}"'
+    
+    content_type = sniff_content_type(path)
+    if content_type not in INLINE_TYPES:
+        content_type = 'application/octet-stream'
+        as_attachment = True
+    
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = _body_response(request, path, size, etag, last_modified, content_type, as_attachment)
+    
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, private=True, no_cache=True)
+    
+    # Keep browsers from second-guessing the type, and from running anything
+    # in the file if they do display it. Browser PDF viewers won't render a
+    # sandboxed document (and run PDFs in their own sandbox), so inline PDFs
+    # go without.
+    response['X-Content-Type-Options'] = 'nosniff'
+    if as_attachment or content_type != 'application/pdf':
+        response['Content-Security-Policy'] = 'sandbox'
+    return response
+
+
+def _body_response(request, path, size, etag, last_modified, content_type, as_attachment):
+    disposition = content_disposition(os.path.basename(path), as_attachment)
+    
+    offload = getattr(settings, 'FILE_OFFLOAD', None)
+    if offload:
+        # The front server sends the file (and handles ranges itself)
+        response = HttpResponse(content_type=content_type)
+        if offload == 'x-accel':
+            relative = os.path.relpath(path, settings.MEDIA_ROOT).replace(os.sep, '/')
+            response['X-Accel-Redirect'] = settings.FILE_OFFLOAD_PREFIX.rstrip('/') + '/' + quote(relative)
+        else:
+            response['X-Sendfile'] = path
+        response['Content-Disposition'] = disposition
+        return response
+    
+    byte_range = parse_range(request.headers.get('Range'), size)
+    if byte_range is not None and not _if_range_matches(request, etag, last_modified):
+        byte_range = None
+    
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+    
+    if byte_range:
+        start, end = byte_range
+        response = StreamingHttpResponse(iter_range(path, start, end), status=206, content_type=content_type)
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        response['Content-Length'] = str(end - start + 1)
+    else:
+        response = FileResponse(open(path, 'rb'), content_type=content_type)
+        response.block_size = CHUNK_SIZE
+    
+    response['Accept-Ranges'] = 'bytes'
+    response['Content-Disposition'] = disposition
+    return response
+
+
+def _if_range_matches(request, etag, last_modified):
+    """Whether a Range request's If-Range (if any) still matches the file"""
+    if_range = request.headers.get('If-Range')
+    if not if_range:
+        return True
+    if if_range.startswith('"') or if_range.startswith('W/'):
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
@@ -1,4 +1,5 @@
 from django import forms
+from django.db import transaction
 from django.utils import timezone
 
 from ..models import JobMaterial, Material
@@ -57,13 +58,12 @@ class JobMaterialForm(forms.ModelForm):
         instance.date_used = timezone.now()
         
         if commit:
-            instance.save()
-            
-            # Update material stock if not a 'returned' record
-            if instance.result != 'returned':
-                material = instance.material
-                material.current_stock -= instance.quantity
-                material.save(update_fields=['current_stock'])
+            with transaction.atomic():
+                instance.save()
+                
+                # Update material stock if not a 'returned' record
+                if instance.result != 'returned':
+                    instance.take_from_inventory()
             
         return instance
 
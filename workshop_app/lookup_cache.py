@@ -0,0 +1,191 @@
+import hashlib
+import random
+import threading
+import time
+from collections import OrderedDict
+
+from django.core.cache import cache
+from django.db import transaction
+
+# Scanner lookups (material and job details by the code scanned) are cached
+# in two tiers: a small LRU in each process in front of the shared cache.
+# Entries in both are keyed by a generation number per kind, kept in the
+# shared cache and bumped once a change to a row of that kind commits, so
+# one change drops every process's entries for the price of a single cache
+# read per lookup. That needs a cache shared by the processes (see CACHES in
+# settings.py); with the default per-process cache, LOCAL_TIMEOUT bounds how
+# long another process's change can go unseen.
+# Values that change with every stock movement (stock, average price) are
+# left out of the payloads and read fresh by the views, so the constant
+# stream of movements doesn't keep emptying the cache.
+
+GENERATION_KEY = 'workshop_app:lookup:{}:generation'
+ENTRY_KEY = 'workshop_app:lookup:{}:{}:{}'
+SHARED_TIMEOUT = 5 * 60
+
+# Entries kept by each process, and for how many seconds
+LOCAL_SIZE = 1024
+LOCAL_TIMEOUT = 30
+
+# Cached for identifiers that match nothing (None can't be told from a miss)
+NOT_FOUND = False
+
+# How each lookup was answered
+LOCAL_HIT = 'local_hit'
+SHARED_HIT = 'shared_hit'
+MISS = 'miss'
+OUTCOMES = (LOCAL_HIT, SHARED_HIT, MISS)
+
+STATS_KEY = 'workshop_app:lookup:stats:{}:{}'
+
+# Each process adds its counts to the shared totals every this many lookups
+STATS_FLUSH_EVERY = 50
+
+# (kind, generation, identifier): (expires, payload)
+_local = OrderedDict()
+_lock = threading.Lock()
+
+# outcome: [lookups, microseconds] not yet added to the shared totals
+_pending = {outcome: [0, 0] for outcome in OUTCOMES}
+
+
+def new_generation():
+    """
+    Starting generation, random so that entries cached before the number
+    was lost from the cache can't come back
+    """
+    return random.randrange(1 << 40)
+
+
+def _entry_key(kind, generation, identifier):
+    digest = hashlib.sha1(identifier.encode()).hexdigest()
+    return ENTRY_KEY.format(kind, generation, digest)
+
+
+def get_many(kind, identifiers, load):
+    """
+    {identifier: payload, or None when nothing matches} for identifiers,
+    from either tier where cached. load(identifiers) is called with the
+    rest and returns the same mapping for them.
+    """
+    started = time.perf_counter()
+    generation = cache.get_or_set(GENERATION_KEY.format(kind), new_generation, None)
+    
+    now = time.monotonic()
+    found = {}
+    with _lock:
+        for identifier in identifiers:
+            local_key = (kind, generation, identifier)
+            entry = _local.get(local_key)
+            if entry is not None and entry[0] > now:
+                _local.move_to_end(local_key)
+                found[identifier] = entry[1]
+    local_hits = len(found)
+    
+    missing = [identifier for identifier in identifiers if identifier not in found]
+    shared_hits = 0
+    if missing:
+        keys = {_entry_key(kind, generation, identifier): identifier for identifier in missing}
+        for key, payload in cache.get_many(keys).items():
+            found[keys[key]] = payload
+            shared_hits += 1
+        
+        missing = [identifier for identifier in missing if identifier not in found]
+        if missing:
+            loaded = load(missing)
+            payloads = {identifier: loaded.get(identifier) or NOT_FOUND for identifier in missing}
+            cache.set_many(
+                {_entry_key(kind, generation, identifier): payload for identifier, payload in payloads.items()},
+                SHARED_TIMEOUT
+            )
+            found.update(payloads)
+        
+        with _lock:
+            for identifier in keys.values():
+                local_key = (kind, generation, identifier)
+                _local[local_key] = (now + LOCAL_TIMEOUT, found[identifier])
+                _local.move_to_end(local_key)
+            while len(_local) > LOCAL_SIZE:
+                _local.popitem(last=False)
+    
+    # Split the time between the lookups by how they were answered
+    elapsed = (time.perf_counter() - started) / max(len(identifiers), 1)
+    _count(LOCAL_HIT, local_hits, elapsed)
+    _count(SHARED_HIT, shared_hits, elapsed)
+    _count(MISS, len(missing), elapsed)
+    return {identifier: found[identifier] or None for identifier in identifiers}
+
+
+def get(kind, identifier, load):
+    """get_many() for a single identifier, with load(identifier) returning its payload"""
+    return get_many(kind, [identifier], lambda missing: {identifier: load(identifier)})[identifier]
+
+
+def invalidate(kind):
+    """Drop every cached lookup of a kind, in all processes, once the transaction commits"""
+    def bump():
+        try:
+            cache.incr(GENERATION_KEY.format(kind))
+        except ValueError:
+            # Nothing cached yet (or the cache was cleared)
+            cache.add(GENERATION_KEY.format(kind), new_generation(), None)
+    
+    transaction.on_commit(bump)
+
+
+def clear_local():
+    """Forget this process's entries (the shared cache is left alone)"""
+    with _lock:
+        _local.clear()
+
+
+def _count(outcome, lookups, seconds_each):
+    if not lookups:
+        return
+    with _lock:
+        _pending[outcome][0] += lookups
+        _pending[outcome][1] += round(seconds_each * lookups * 1_000_000)
+        flush = sum(count for count, _ in _pending.values()) >= STATS_FLUSH_EVERY
+    if flush:
+        flush_stats()
+
+
+def flush_stats():
+    """Add this process's counts to the shared totals"""
+    with _lock:
+        pending = {outcome: tuple(totals) for outcome, totals in _pending.items() if totals[0]}
+        for outcome in pending:
+            _pending[outcome] = [0, 0]
+    
+    for outcome, (lookups, microseconds) in pending.items():
+        for name, value in (('lookups', lookups), ('microseconds', microseconds)):
+            key = STATS_KEY.format(outcome, name)
+            if not cache.add(key, value, None):
+                cache.incr(key, value)
+
+
+def get_stats():
+    """Lookups answered by each tier and their average time, across processes"""
+    flush_stats()
+    keys = [STATS_KEY.format(outcome, name) for outcome in OUTCOMES for name in ('lookups', 'microseconds')]
+    totals = cache.get_many(keys)
+    
+    stats = {}
+    for outcome in OUTCOMES:
+        lookups = totals.get(STATS_KEY.format(outcome, 'lookups'), 0)
+        microseconds = totals.get(STATS_KEY.format(outcome, 'microseconds'), 0)
+        stats[outcome] = {
+            'lookups': lookups,
+            'average_ms': round(microseconds / lookups / 1000, 3) if lookups else None,
+        }
+    
+    total = sum(entry['lookups'] for entry in stats.values())
+    stats['hit_rate'] = round(1 - stats[MISS]['lookups'] / total, 3) if total else None
+    return stats
+
+
+def reset_stats():
+    with _lock:
+        for outcome in OUTCOMES:
+            _pending[outcome] = [0, 0]
+    cache.delete_many([STATS_KEY.format(outcome, name) for outcome in OUTCOMES for name in ('lookups', 'microseconds')])
@@ -0,0 +1,77 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ... import benchmarks
+
+
+class Command(BaseCommand):
+    """Performance benchmarks of the busiest views and model methods"""
+    help = (
+        "Time the busiest views and model methods against the current (seeded) database, "
+        "optionally saving the results as JSON and failing on regressions against a baseline"
+    )
+    
+    def add_arguments(self, parser):
+        parser.add_argument('cases', nargs='*',
+                            help=f"Cases to run (default: all): {', '.join(benchmarks.CASES)}")
+        parser.add_argument('--iterations', type=int, default=benchmarks.ITERATIONS,
+                            help="Timed runs of each case")
+        parser.add_argument('--warmup', type=int, default=benchmarks.WARMUP,
+                            help="Untimed runs of each case first")
+        parser.add_argument('--warm-cache', action='store_true',
+                            help="Keep cached results between runs (by default the cache is cleared before each one)")
+        parser.add_argument('--output', help="Write the results to this JSON file")
+        parser.add_argument('--compare', metavar='BASELINE',
+                            help="Results JSON of an earlier run to check for regressions")
+        parser.add_argument('--threshold', type=float, default=benchmarks.DEFAULT_THRESHOLD * 100,
+                            help="Percentage slower or bigger than the baseline that counts as a regression")
+    
+    def handle(self, *args, **options):
+        unknown = set(options['cases']) - set(benchmarks.CASES)
+        if unknown:
+            raise CommandError(f"Unknown cases: {', '.join(sorted(unknown))}")
+        
+        baseline = None
+        if options['compare']:
+            with open(options['compare']) as f:
+                baseline = json.load(f)
+        
+        def progress(name, result):
+            if 'error' in result:
+                self.stdout.write(self.style.ERROR(f"{name:34} failed: {result['error']}"))
+                return
+            line = (
+                f"{name:34} {result['median_ms']:9.1f} ms (fastest {result['min_ms']:.1f})"
+                f"  {result['queries']:5} queries"
+                f"  {result['peak_memory_kb']:9.0f} KB"
+            )
+            before = baseline['cases'].get(name) if baseline else None
+            if before and before.get('min_ms'):
+                change = (result['min_ms'] - before['min_ms']) / before['min_ms'] * 100
+                line += f"  ({change:+.0f}% vs baseline)"
+            self.stdout.write(line)
+        
+        try:
+            results = benchmarks.run_benchmarks(
+                options['cases'], options['iterations'], options['warmup'],
+                cold=not options['warm_cache'], progress=progress,
+            )
+        except (ValueError, RuntimeError) as e:
+            raise CommandError(e)
+        
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+        
+        if baseline:
+            if baseline['meta'].get('rows') != results['meta']['rows']:
+                self.stdout.write(self.style.WARNING("The baseline was run on a different dataset"))
+            
+            regressions = benchmarks.compare(baseline, results, options['threshold'] / 100)
+            for name, problems in regressions.items():
+                self.stdout.write(self.style.ERROR(f"{name}: {'; '.join(problems)}"))
+            if regressions:
+                raise CommandError(f"{len(regressions)} cases regressed against {options['compare']}")
+            self.stdout.write(self.style.SUCCESS("No regressions against the baseline"))
@@ -0,0 +1,63 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.template.defaultfilters import filesizeformat
+
+from ...models import StoredFile
+from ...models.stored_file import GARBAGE_GRACE_PERIOD, StoredFileReferences
+from ...storage import CAS_DIR, content_storage
+
+
+class Command(BaseCommand):
+    """Garbage collection for the content-addressed media store"""
+    help = "Recount references to stored files and delete the ones nothing uses"
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--adopt', action='store_true',
+                            help="First move files uploaded before the store existed into it")
+        parser.add_argument('--grace-hours', type=float,
+                            default=GARBAGE_GRACE_PERIOD.total_seconds() / 3600,
+                            help="Keep unreferenced files younger than this")
+        parser.add_argument('--dry-run', action='store_true',
+                            help="Report what would change without changing it")
+    
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        
+        if options['adopt']:
+            adopted = self.adopt(dry_run)
+            self.stdout.write(f"{'Would adopt' if dry_run else 'Adopted'} {adopted} files")
+        
+        recounted, deleted, freed = StoredFile.collect_garbage(
+            timedelta(hours=options['grace_hours']), dry_run=dry_run
+        )
+        self.stdout.write(f"Reference counts corrected: {recounted}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{'Would delete' if dry_run else 'Deleted'} {deleted} unreferenced files "
+            f"({filesizeformat(freed)})"
+        ))
+    
+    def adopt(self, dry_run):
+        """Move files stored under their upload_to paths into the store"""
+        adopted = 0
+        for model in StoredFileReferences.referencing_models():
+            for field in model.stored_file_fields:
+                legacy_names = (
+                    model.objects.exclude(**{f'{field}__startswith': f'{CAS_DIR}/'})
+                    .exclude(**{field: ''}).exclude(**{f'{field}__isnull': True})
+                    .values_list(field, flat=True).distinct()
+                )
+                for name in list(legacy_names):
+                    if not content_storage.exists(name):
+                        self.stderr.write(f"{model.__name__}.{field}: {name} is missing")
+                        continue
+                    adopted += 1
+                    if dry_run:
+                        continue
+                    
+                    with content_storage.open(name) as f:
+                        stored_name = content_storage.save(name, f)
+                    model.objects.filter(**{field: name}).update(**{field: stored_name})
+                    if stored_name != name:
+                        content_storage.delete(name)
+        return adopted
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from ... import thumbnails
+from ...models import MaterialAttachment
+
+
+class Command(BaseCommand):
+    """Render thumbnails for image attachments uploaded before they existed"""
+    help = "Render the thumbnails of every image attachment that doesn't have them yet"
+    
+    def handle(self, *args, **options):
+        rendered = 0
+        for attachment in MaterialAttachment.objects.only('file').iterator():
+            if not attachment.is_image():
+                continue
+            try:
+                thumbnails.render_all(attachment.file.path)
+                rendered += 1
+            except OSError as e:
+                self.stderr.write(f"Attachment {attachment.pk}: {e}")
+        
+        self.stdout.write(self.style.SUCCESS(f"Thumbnails ready for {rendered} images"))
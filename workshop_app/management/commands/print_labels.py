@@ -0,0 +1,53 @@
+import datetime
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from ... import qr_labels
+
+
+class Command(BaseCommand):
+    """Write a printable QR label sheet for many materials or machines"""
+    help = "Render a multi-page PDF (or SVG) sheet of QR labels for materials or machines"
+    
+    def add_arguments(self, parser):
+        parser.add_argument('kind', choices=sorted(qr_labels.LABEL_SOURCES), help="What to print labels for")
+        parser.add_argument('ids', nargs='*', help="Material or machine IDs (default: everything matching the filters)")
+        parser.add_argument('--type', dest='type_code', default='', help="Only this material or machine type code")
+        parser.add_argument('--created', default='', help="Only materials created on this date (YYYY-MM-DD or 'today')")
+        parser.add_argument('--format', dest='fmt', choices=sorted(qr_labels.FORMATS), default='pdf')
+        parser.add_argument('--workers', type=int, default=None, help="Processes rendering PDF pages (default: CPU count)")
+        parser.add_argument('-o', '--output', help="Output file (default: <kind>-labels.<format>)")
+    
+    def handle(self, *args, **options):
+        created = options['created']
+        if created == 'today':
+            created = timezone.localdate()
+        elif created:
+            try:
+                created = datetime.datetime.strptime(created, '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError("--created must be YYYY-MM-DD or 'today'")
+        
+        try:
+            objects = qr_labels.label_queryset(
+                options['kind'], type_code=options['type_code'], created=created, identifiers=options['ids']
+            )
+        except ValueError as e:
+            raise CommandError(str(e))
+        
+        items = qr_labels.label_items(options['kind'], objects)
+        if not items:
+            raise CommandError("Nothing matches those filters")
+        
+        output = options['output'] or f"{options['kind']}-labels.{options['fmt']}"
+        if options['fmt'] == 'svg':
+            with open(output, 'w', encoding='utf-8') as f:
+                f.writelines(qr_labels.iter_svg(items))
+        else:
+            with open(output, 'wb') as f:
+                f.writelines(qr_labels.iter_pdf(items, workers=options['workers'] or os.cpu_count()))
+        
+        pages = -(-len(items) // qr_labels.LABELS_PER_PAGE)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {len(items)} labels on {pages} pages to {output}"))
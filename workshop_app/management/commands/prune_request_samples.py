@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from ...models import RequestSample
+
+
+class Command(BaseCommand):
+    """Retention for the sampled request metrics"""
+    help = "Delete request samples older than a number of days"
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=30, help="Keep samples from this many days")
+    
+    def handle(self, *args, **options):
+        deleted = RequestSample.prune(options['days'])
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} request samples"))
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from ...models import Job, JobFinancial
+
+
+class Command(BaseCommand):
+    """Verify job financial summaries against their rows and repair drift"""
+    help = "Check JobFinancial totals against job materials, machines and labor, and rebuild any that drifted"
+    
+    def add_arguments(self, parser):
+        parser.add_argument('job_ids', nargs='*', help="Job IDs to check (default: all jobs)")
+        parser.add_argument('--verify', action='store_true', help="Only report drift, don't fix it")
+    
+    def handle(self, *args, **options):
+        jobs = Job.objects.all()
+        if options['job_ids']:
+            jobs = jobs.filter(job_id__in=options['job_ids'])
+        
+        # Jobs without a summary yet get one built from scratch
+        missing = jobs.filter(financial__isnull=True)
+        created = 0
+        if not options['verify']:
+            for job in missing:
+                job.create_financial_summary()
+                created += 1
+        
+        job_ids = list(jobs.values_list('id', flat=True)) if options['job_ids'] else None
+        drifted = JobFinancial.reconcile(job_ids=job_ids, fix=not options['verify'])
+        
+        job_names = dict(Job.objects.filter(id__in=drifted).values_list('id', 'job_id'))
+        for job_pk, differences in drifted.items():
+            for field, (stored, actual) in differences.items():
+                self.stdout.write(f"{job_names.get(job_pk, job_pk)}: {field} stored {stored}, actual {actual}")
+        
+        if options['verify']:
+            self.stdout.write(f"{len(drifted)} summaries drifted, {missing.count()} missing")
+        else:
+            self.stdout.write(self.style.SUCCESS(
+                f"Rebuilt {len(drifted)} drifted summaries, created {created} missing"
+            ))
@@ -0,0 +1,42 @@
+from django.core.management.base import BaseCommand
+
+from ...models import Machine, MachineDailyUsage
+
+
+class Command(BaseCommand):
+    """Backfill the daily machine usage rollup and repair drift"""
+    help = "Check daily machine usage totals against the recorded sessions, and rebuild any that drifted"
+    
+    def add_arguments(self, parser):
+        parser.add_argument('machine_ids', nargs='*', help="Machine IDs to check (default: all machines)")
+        parser.add_argument('--verify', action='store_true', help="Only report drift, don't fix it")
+        parser.add_argument('--full', action='store_true', help="Rebuild every row without comparing first")
+    
+    def handle(self, *args, **options):
+        machine_pks = None
+        if options['machine_ids']:
+            machine_pks = list(Machine.objects.filter(
+                machine_id__in=options['machine_ids']
+            ).values_list('id', flat=True))
+        
+        if options['full']:
+            written = MachineDailyUsage.rebuild(machine_pks)
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt {written} machine days"))
+            return
+        
+        drifted = MachineDailyUsage.reconcile(machine_ids=machine_pks, fix=not options['verify'])
+        
+        machine_names = dict(Machine.objects.filter(
+            id__in={machine_pk for machine_pk, _ in drifted}
+        ).values_list('id', 'machine_id'))
+        for (machine_pk, date), (stored, actual) in sorted(drifted.items()):
+            differences = ', '.join(
+                f"{field} stored {stored[field]}, actual {actual[field]}"
+                for field in stored if stored[field] != actual[field]
+            )
+            self.stdout.write(f"{machine_names.get(machine_pk, machine_pk)} {date}: {differences}")
+        
+        if options['verify']:
+            self.stdout.write(f"{len(drifted)} machine days drifted")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt {len(drifted)} drifted machine days"))
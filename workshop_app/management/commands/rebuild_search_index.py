@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from ... import search_index
+
+
+class Command(BaseCommand):
+    """Re-index materials, machines, jobs and clients for full-text search"""
+    help = "Rebuild the full-text search index from the current rows"
+    
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'kinds', nargs='*', choices=sorted(search_index.SEARCH_SOURCES),
+            help="What to re-index (default: everything)"
+        )
+    
+    def handle(self, *args, **options):
+        if not search_index.is_available():
+            raise CommandError("The search index needs SQLite with FTS5")
+        
+        for kind in options['kinds'] or search_index.SEARCH_SOURCES:
+            with transaction.atomic():
+                count = search_index.rebuild(kind)
+            self.stdout.write(self.style.SUCCESS(f"Indexed {count} {kind} rows"))
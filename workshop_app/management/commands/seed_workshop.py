@@ -0,0 +1,43 @@
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from ...seed_data import BASE_COUNTS, WorkshopSeeder
+
+
+class Command(BaseCommand):
+    """Synthetic data for load testing and benchmarks"""
+    help = "Fill the database with a synthetic workshop: clients, jobs, materials, machines and their history"
+    
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=float, default=1,
+                            help="Multiplier for the number of rows (about 110,000 per unit; 9 gives about a million)")
+        parser.add_argument('--years', type=float, default=2, help="Years of history to generate")
+        parser.add_argument('--seed', type=int, default=0, help="Random seed - the same seed gives the same data")
+        parser.add_argument('--until', type=date.fromisoformat,
+                            help="Last day of the history, YYYY-MM-DD (default: today)")
+        parser.add_argument('--batch-size', type=int, default=2000, help="Rows per INSERT")
+    
+    def handle(self, *args, **options):
+        if not connection.features.can_return_rows_from_bulk_insert:
+            raise CommandError("Seeding needs a database that returns primary keys from bulk inserts")
+        
+        seeder = WorkshopSeeder(
+            seed=options['seed'], scale=options['scale'], years=options['years'],
+            until=options['until'], batch_size=options['batch_size'], log=self.stdout.write,
+        )
+        counts = ', '.join(f"{count} {name}" for name, count in seeder.counts.items())
+        self.stdout.write(f"Seeding {counts} over {options['years']:g} years")
+        
+        started = time.monotonic()
+        created = seeder.run()
+        elapsed = time.monotonic() - started
+        
+        for model, count in sorted(created.items()):
+            self.stdout.write(f"  {model}: {count}")
+        total = sum(created.values())
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {total} rows in {elapsed:.1f}s ({total / max(elapsed, 0.001):.0f} rows/s)"
+        ))
@@ -0,0 +1,63 @@
+import random
+
+from django.conf import settings
+from django.db import DatabaseError
+
+from . import request_metrics
+from .models import RequestSample, StaffSettings
+
+
+class ActiveJobMiddleware:
+    """
+    Resolve the signed-in user's StaffSettings and active job once per
+    request, in one query, as request.staff_settings and
+    request.active_job (None for anonymous users or users without settings).
+    """
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+    
+    def __call__(self, request):
+        staff_settings = None
+        if request.user.is_authenticated:
+            staff_settings = StaffSettings.for_user(request.user)
+        
+        request.staff_settings = staff_settings
+        request.active_job = staff_settings.active_job if staff_settings else None
+        return self.get_response(request)
+
+
+class RequestMetricsMiddleware:
+    """
+    Measure each request's queries, SQL and template time and response
+    size (see request_metrics), send them back in a Server-Timing header
+    (to staff, or anyone when DEBUG is on - it tells how the site's built),
+    log them as a JSON line on the 'workshop_app.requests' logger, and store
+    a settings.REQUEST_METRICS_SAMPLE_RATE fraction of them as
+    RequestSample rows for the staff performance page.
+    First in MIDDLEWARE, so the rest of the middleware is measured too.
+    """
+    
+    def __init__(self, get_response):
+        self.get_response = get_response
+        request_metrics.instrument_templates()
+    
+    def __call__(self, request):
+        metrics = request_metrics.RequestMetrics()
+        with metrics.collect():
+            response = self.get_response(request)
+        
+        user = getattr(request, 'user', None)
+        if settings.DEBUG or (user is not None and user.is_staff):
+            response['Server-Timing'] = metrics.server_timing()
+        record = metrics.as_record(request, response)
+        request_metrics.log_record(record)
+        
+        sample_rate = getattr(settings, 'REQUEST_METRICS_SAMPLE_RATE', 0)
+        if sample_rate and random.random() < sample_rate:
+            try:
+                RequestSample.record(record)
+            except DatabaseError:
+                # A lost sample mustn't fail the request
+                request_metrics.logger.exception("Could not store a request sample")
+        return response
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:29
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def record_opening_balances(apps, schema_editor):
+    """Start each material's ledger from its current stock and price"""
+    Material = apps.get_model('workshop_app', 'Material')
+    StockMovement = apps.get_model('workshop_app', 'StockMovement')
+    
+    StockMovement.objects.bulk_create([
+        StockMovement(
+            material=material,
+            movement_type='adjustment',
+            quantity=material.current_stock,
+            unit_cost=material.price_per_unit,
+            balance_after=material.current_stock,
+            average_cost_after=material.price_per_unit,
+            notes="Opening balance",
+        )
+        for material in Material.objects.all()
+    ], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workshop_app', '0010_jobstatus_alter_job_options_job_client_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('movement_type', models.CharField(choices=[('purchase', 'Purchase'), ('consumption', 'Consumption'), ('return', 'Return'), ('job_usage', 'Job Usage'), ('adjustment', 'Adjustment')], max_length=20)),
+                ('quantity', models.DecimalField(decimal_places=2, help_text='Signed change in stock (negative when stock leaves)', max_digits=10)),
+                ('unit_cost', models.DecimalField(blank=True, decimal_places=2, help_text='Cost per unit for stock coming in', max_digits=10, null=True)),
+                ('balance_after', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('average_cost_after', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('reference', models.CharField(blank=True, help_text='Job or document reference', max_length=100)),
+                ('operator_name', models.CharField(blank=True, max_length=100)),
+                ('notes', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('entry', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='stock_movements', to='workshop_app.materialentry')),
+                ('job_material', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='stock_movements', to='workshop_app.jobmaterial')),
+                ('material', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_movements', to='workshop_app.material')),
+                ('material_transaction', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='stock_movements', to='workshop_app.materialtransaction')),
+            ],
+            options={
+                'ordering': ['-created_at', '-id'],
+            },
+        ),
+        migrations.RunPython(record_opening_balances, migrations.RunPython.noop),
+    ]
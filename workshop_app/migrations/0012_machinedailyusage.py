@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:35
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workshop_app', '0011_stockmovement'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MachineDailyUsage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(help_text='Day the sessions started (local time)')),
+                ('sessions', models.IntegerField(default=0)),
+                ('busy_minutes', models.IntegerField(default=0, help_text='Operation time in minutes')),
+                ('setup_minutes', models.IntegerField(default=0)),
+                ('cleanup_minutes', models.IntegerField(default=0)),
+                ('total_cost', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('machine', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_usage', to='workshop_app.machine')),
+            ],
+            options={
+                'verbose_name_plural': 'Machine Daily Usage',
+                'ordering': ['-date', 'machine'],
+                'unique_together': {('machine', 'date')},
+            },
+        ),
+    ]
@@ -0,0 +1,87 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:37
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def minutes_between(start_time, end_time):
+    return int((end_time - start_time).total_seconds() / 60)
+
+
+def merge_machine_sessions(apps, schema_editor):
+    """Give every existing usage record and job machine entry its session"""
+    MachineUsage = apps.get_model('workshop_app', 'MachineUsage')
+    JobMachine = apps.get_model('workshop_app', 'JobMachine')
+    MachineSession = apps.get_model('workshop_app', 'MachineSession')
+    
+    sessions = [
+        MachineSession(
+            machine_id=usage.machine_id,
+            source='usage',
+            usage=usage,
+            job_reference=usage.job_reference,
+            operator_name=usage.operator_name,
+            start_time=usage.start_time,
+            end_time=usage.end_time,
+            setup_time=usage.setup_time,
+            operation_time=minutes_between(usage.start_time, usage.end_time) if usage.end_time else 0,
+            cleanup_time=usage.cleanup_time,
+            total_cost=usage.total_cost,
+        )
+        for usage in MachineUsage.objects.all().iterator()
+    ]
+    
+    for entry in JobMachine.objects.select_related('job').iterator():
+        operation_time = 0
+        if entry.end_time:
+            operation_time = entry.operation_time or minutes_between(entry.start_time, entry.end_time)
+        sessions.append(MachineSession(
+            machine_id=entry.machine_id,
+            source='job',
+            job_machine=entry,
+            job_id=entry.job_id,
+            job_reference=entry.job.job_id,
+            operator_name=entry.operator_name,
+            start_time=entry.start_time,
+            end_time=entry.end_time,
+            setup_time=entry.setup_time,
+            operation_time=operation_time,
+            cleanup_time=entry.cleanup_time,
+            total_cost=entry.total_cost,
+        ))
+    
+    MachineSession.objects.bulk_create(sessions, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workshop_app', '0012_machinedailyusage'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MachineSession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(choices=[('usage', 'Machine Usage Record'), ('job', 'Job Machine Usage')], max_length=10)),
+                ('job_reference', models.CharField(blank=True, max_length=100)),
+                ('operator_name', models.CharField(blank=True, max_length=100)),
+                ('start_time', models.DateTimeField()),
+                ('end_time', models.DateTimeField(blank=True, null=True)),
+                ('setup_time', models.IntegerField(default=0, help_text='Setup time in minutes')),
+                ('operation_time', models.IntegerField(default=0, help_text='Operation time in minutes')),
+                ('cleanup_time', models.IntegerField(default=0, help_text='Cleanup time in minutes')),
+                ('total_cost', models.DecimalField(blank=True, decimal_places=2, max_digits=10, null=True)),
+                ('job', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='machine_sessions', to='workshop_app.job')),
+                ('job_machine', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='session', to='workshop_app.jobmachine')),
+                ('machine', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sessions', to='workshop_app.machine')),
+                ('usage', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='session', to='workshop_app.machineusage')),
+            ],
+            options={
+                'ordering': ['-start_time'],
+                'indexes': [models.Index(fields=['machine', 'start_time'], name='workshop_ap_machine_247a10_idx'), models.Index(fields=['machine', 'end_time'], name='workshop_ap_machine_275072_idx')],
+            },
+        ),
+        migrations.RunPython(merge_machine_sessions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,65 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:47
+
+from django.db import migrations
+
+# Searched fields per kind as of this migration: model, identifier, title, body
+SEARCH_SOURCES = {
+    'material': ('Material', 'material_id', 'name', ('serial_number', 'supplier_sku', 'supplier_name')),
+    'machine': ('Machine', 'machine_id', 'name', ('serial_number', 'manufacturer')),
+    'job': ('Job', 'job_id', 'project_name', ('client__name', 'description')),
+    'client': ('Client', 'client_id', 'name', ('primary_email', 'phone_number', 'industry')),
+}
+
+
+def field_value(obj, path):
+    value = obj
+    for name in path.split('__'):
+        value = getattr(value, name, None)
+        if value is None:
+            return ''
+    return str(value)
+
+
+def create_search_index(apps, schema_editor):
+    """Create the FTS5 tables (SQLite only) and index the existing rows"""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    
+    for kind, (model_name, identifier, title, body) in SEARCH_SOURCES.items():
+        table = f'workshop_app_search_{kind}'
+        schema_editor.execute(
+            f"CREATE VIRTUAL TABLE {table} USING fts5(identifier, title, body, prefix='2 3')"
+        )
+        
+        model = apps.get_model('workshop_app', model_name)
+        objects = model.objects.all()
+        if model_name == 'Job':
+            objects = objects.select_related('client')
+        rows = [
+            (
+                obj.pk, field_value(obj, identifier), field_value(obj, title),
+                ' '.join(filter(None, (field_value(obj, path) for path in body)))
+            )
+            for obj in objects.iterator()
+        ]
+        with schema_editor.connection.cursor() as cursor:
+            cursor.executemany(f'INSERT INTO {table} (rowid, identifier, title, body) VALUES (%s, %s, %s, %s)', rows)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    
+    for kind in SEARCH_SOURCES:
+        schema_editor.execute(f'DROP TABLE IF EXISTS workshop_app_search_{kind}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workshop_app', '0014_idsequence'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
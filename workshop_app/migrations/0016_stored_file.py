@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-18 07:57
+
+import workshop_app.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workshop_app', '0015_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True)),
+                ('name', models.CharField(help_text='Path in media storage', max_length=255, unique=True)),
+                ('size', models.BigIntegerField(default=0)),
+                ('ref_count', models.IntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AlterField(
+            model_name='clientdocument',
+            name='file',
+            field=models.FileField(storage=workshop_app.storage.ContentAddressedStorage(), upload_to='client_documents/'),
+        ),
+        migrations.AlterField(
+            model_name='communication',
+            name='attachment',
+            field=models.FileField(blank=True, null=True, storage=workshop_app.storage.ContentAddressedStorage(), upload_to='client_communications/'),
+        ),
+        migrations.AlterField(
+            model_name='machinemaintenance',
+            name='documentation',
+            field=models.FileField(blank=True, null=True, storage=workshop_app.storage.ContentAddressedStorage(), upload_to='docs/maintenance/'),
+        ),
+        migrations.AlterField(
+            model_name='machinemaintenance',
+            name='receipt',
+            field=models.FileField(blank=True, null=True, storage=workshop_app.storage.ContentAddressedStorage(), upload_to='receipts/maintenance/'),
+        ),
+        migrations.AlterField(
+            model_name='materialattachment',
+            name='file',
+            field=models.FileField(storage=workshop_app.storage.ContentAddressedStorage(), upload_to='material_attachments/'),
+        ),
+        migrations.AlterField(
+            model_name='materialentry',
+            name='receipt',
+            field=models.FileField(blank=True, help_text='PDF receipt for this purchase', null=True, storage=workshop_app.storage.ContentAddressedStorage(), upload_to='receipts/materials/'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:10
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workshop_app', '0016_stored_file'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='communication',
+            index=models.Index(fields=['client_history', 'date'], name='workshop_ap_client__8d18a8_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['created_date'], name='workshop_ap_created_f9e0a1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='job',
+            index=models.Index(fields=['status', 'created_date'], name='workshop_ap_status__892151_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobactivitylog',
+            index=models.Index(fields=['user', 'timestamp', 'job'], name='workshop_ap_user_id_07d9bc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='joblabor',
+            index=models.Index(fields=['job', 'date'], name='workshop_ap_job_id_47e9e1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobmachine',
+            index=models.Index(fields=['job', 'start_time'], name='workshop_ap_job_id_efd415_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='jobmaterial',
+            index=models.Index(fields=['job', 'date_used'], name='workshop_ap_job_id_6c8fde_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='machine',
+            index=models.Index(fields=['serial_number'], name='workshop_ap_serial__5a1eea_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='machineusage',
+            index=models.Index(fields=['machine', 'start_time'], name='workshop_ap_machine_8819ca_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='material',
+            index=models.Index(fields=['serial_number'], name='workshop_ap_serial__d15854_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='materialtransaction',
+            index=models.Index(fields=['material', 'transaction_date'], name='workshop_ap_materia_5254aa_idx'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:24
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workshop_app', '0017_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestSample',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('timestamp', models.DateTimeField(default=django.utils.timezone.now)),
+                ('endpoint', models.CharField(help_text='URL name of the view', max_length=200)),
+                ('method', models.CharField(max_length=10)),
+                ('path', models.CharField(max_length=255)),
+                ('status_code', models.PositiveSmallIntegerField()),
+                ('duration_ms', models.FloatField()),
+                ('query_count', models.PositiveIntegerField()),
+                ('sql_ms', models.FloatField()),
+                ('duplicate_queries', models.PositiveIntegerField(default=0)),
+                ('template_ms', models.FloatField(default=0)),
+                ('response_bytes', models.PositiveIntegerField(blank=True, null=True)),
+                ('repeated_query', models.TextField(blank=True, help_text='Statement run most often, if repeated')),
+                ('repeated_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-timestamp'],
+                'indexes': [models.Index(fields=['timestamp'], name='workshop_ap_timesta_6559c1_idx')],
+            },
+        ),
+    ]
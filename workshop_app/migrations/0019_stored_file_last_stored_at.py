@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:49
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workshop_app', '0018_request_sample'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='storedfile',
+            name='last_stored_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, help_text='Last time an upload had these contents'),
+        ),
+    ]
@@ -0,0 +1,46 @@
+from decimal import Decimal
+
+from django.db import migrations
+from django.utils import timezone
+
+ROLLUP_FIELDS = ('sessions', 'busy_minutes', 'setup_minutes', 'cleanup_minutes', 'total_cost')
+
+
+def backfill_daily_usage(apps, schema_editor):
+    """
+    Sum every completed session into its machine's day, as
+    MachineDailyUsage.rebuild() does. Sessions merged in 0013 were bulk
+    created, so none of them reached the daily rows.
+    """
+    MachineSession = apps.get_model('workshop_app', 'MachineSession')
+    MachineDailyUsage = apps.get_model('workshop_app', 'MachineDailyUsage')
+    
+    days = {}
+    for session in MachineSession.objects.filter(end_time__isnull=False).order_by().iterator(chunk_size=2000):
+        start_time = session.start_time
+        if timezone.is_aware(start_time):
+            start_time = timezone.localtime(start_time)
+        
+        day = days.setdefault((session.machine_id, start_time.date()), dict.fromkeys(ROLLUP_FIELDS, 0))
+        day['sessions'] += 1
+        day['busy_minutes'] += session.operation_time
+        day['setup_minutes'] += session.setup_time or 0
+        day['cleanup_minutes'] += session.cleanup_time or 0
+        day['total_cost'] += Decimal(session.total_cost or 0).quantize(Decimal('0.01'))
+    
+    MachineDailyUsage.objects.all().delete()
+    MachineDailyUsage.objects.bulk_create(
+        [MachineDailyUsage(machine_id=machine_id, date=date, **totals) for (machine_id, date), totals in days.items()],
+        batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('workshop_app', '0019_stored_file_last_stored_at'),
+    ]
+    
+    operations = [
+        migrations.RunPython(backfill_daily_usage, migrations.RunPython.noop),
+    ]
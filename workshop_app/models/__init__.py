@@ -1,9 +1,14 @@
+from .id_sequence import IdSequence
+from .stored_file import StoredFile
 from .material import MaterialCategory, MaterialType, Material
 from .material_entry import MaterialEntry
 from .machine import MachineType, Machine  # Remove Job from here
 from .operator import Operator
 from .transaction import MaterialTransaction
+from .stock_movement import StockMovement
 from .machine_usage import MachineUsage
+from .machine_daily_usage import MachineDailyUsage
+from .machine_session import MachineSession
 from .machine_maintenance import MachineMaintenance
 from .machine_consumable import MachineConsumable, ConsumableReplacement
 from .material_attachment import AttachmentType, MaterialAttachment
@@ -15,3 +20,4 @@ from .job_machine import JobMachine
 from .job_labor import JobLabor
 from .job_financial import JobFinancial
 from .staff_settings import StaffSettings, JobActivityLog  # Include JobActivityLog
+from .request_sample import RequestSample
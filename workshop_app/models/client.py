@@ -1,6 +1,9 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.utils import timezone
+from .id_sequence import IdSequence
+from .stored_file import StoredFileReferences
+from ..storage import content_storage
 
 class Client(models.Model):
     """Model representing a client (company or individual)"""
@@ -57,30 +60,16 @@ class Client(models.Model):
     def __str__(self):
         return f"{self.client_id} - {self.name}"
     
+    def get_id_prefix(self):
+        """Sequence prefix for client IDs, e.g. CLI-2026-"""
+        return f"CLI-{timezone.now().year}-"
+    
     def save(self, *args, **kwargs):
         # Auto-generate client_id if not provided
         if not self.client_id:
-            # Get current year
-            year = timezone.now().year
-            
-            # Find the highest client number for current year
-            last_client = Client.objects.filter(
-                client_id__startswith=f"CLI-{year}"
-            ).order_by('-client_id').first()
-            
-            if last_client:
-                # Extract the sequential number and increment
-                try:
-                    last_num = int(last_client.client_id.split('-')[-1])
-                    next_num = last_num + 1
-                except (ValueError, IndexError):
-                    next_num = 1
-            else:
-                next_num = 1
-                
-            # Format: CLI-YYYY-XXXX
-            self.client_id = f"CLI-{year}-{next_num:04d}"
-            
+            # Format: CLI-YYYY-XXXX, numbered from the year's sequence
+            IdSequence.assign_ids([self], 'client_id')
+        
         super().save(*args, **kwargs)
 
 class ContactPerson(models.Model):
@@ -126,8 +115,9 @@ class ClientHistory(models.Model):
         else:
             self.average_project_value = None
 
-class Communication(models.Model):
+class Communication(StoredFileReferences):
     """Individual communication log entry with a client"""
+    stored_file_fields = ('attachment',)
     
     # Communication types
     COMM_TYPES = [
@@ -144,15 +134,21 @@ class Communication(models.Model):
     contact_person = models.ForeignKey(ContactPerson, on_delete=models.SET_NULL, null=True, blank=True)
     staff_member = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
     summary = models.TextField(help_text="Brief description of communication")
-    attachment = models.FileField(upload_to='client_communications/', blank=True, null=True)
+    attachment = models.FileField(upload_to='client_communications/', storage=content_storage, blank=True, null=True)
     follow_up_required = models.BooleanField(default=False)
     follow_up_date = models.DateField(null=True, blank=True)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['client_history', 'date']),
+        ]
+    
     def __str__(self):
         return f"{self.get_comm_type_display()} with {self.client_history.client.name} on {self.date.strftime('%Y-%m-%d')}"
 
-class ClientDocument(models.Model):
+class ClientDocument(StoredFileReferences):
     """Documents associated with a client"""
+    stored_file_fields = ('file',)
     
     # Document types
     DOC_TYPES = [
@@ -168,7 +164,7 @@ class ClientDocument(models.Model):
     title = models.CharField(max_length=100)
     upload_date = models.DateTimeField(default=timezone.now)
     expiration_date = models.DateField(null=True, blank=True)
-    file = models.FileField(upload_to='client_documents/')
+    file = models.FileField(upload_to='client_documents/', storage=content_storage)
     tags = models.CharField(max_length=200, blank=True, help_text="Comma-separated tags")
     notes = models.TextField(blank=True)
     
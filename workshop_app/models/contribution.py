@@ -0,0 +1,68 @@
+from django.db import models, transaction
+
+
+class TotalContributor(models.Model):
+    """
+    Base for rows that feed a total kept on another table: job costs on
+    JobFinancial, machine time on MachineDailyUsage and file references
+    on StoredFile.
+    What a row contributes is remembered when it's loaded and after each
+    save, so a save applies only the change from that, and a delete
+    (handled in signals.py, so cascades count too) takes it off again.
+    """
+    
+    class Meta:
+        abstract = True
+    
+    @classmethod
+    def get_contribution_fields(cls):
+        """Attributes get_contribution() reads"""
+        raise NotImplementedError
+    
+    def get_contribution(self):
+        """What this row adds to the total, from its current values"""
+        raise NotImplementedError
+    
+    def apply_contribution_change(self, old, new):
+        """
+        Update the total for this row's contribution going from old to new
+        (None for no row: old when it's new, new when it's deleted)
+        """
+        raise NotImplementedError
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what this row contributes, unless a deferred field would
+        # have to be loaded to find out
+        loaded = instance.__dict__
+        if all(name in loaded for name in cls.get_contribution_fields()):
+            instance._saved_contribution = instance.get_contribution()
+        return instance
+    
+    def get_saved_contribution(self):
+        """Contribution recorded for this row the last time it was saved"""
+        if self._state.adding:
+            return None
+        
+        if not hasattr(self, '_saved_contribution'):
+            # Loaded with deferred fields - read the stored values once
+            self._saved_contribution = type(self).objects.get(pk=self.pk).get_contribution()
+        return self._saved_contribution
+    
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            old = self.get_saved_contribution()
+            super().save(*args, **kwargs)
+            new = self.get_contribution()
+            self.apply_contribution_change(old, new)
+            self._saved_contribution = new
+    
+    def release_contribution(self):
+        """Take a deleted row's contribution off the total (from post_delete)"""
+        if hasattr(self, '_saved_contribution'):
+            old = self._saved_contribution
+        else:
+            old = self.get_contribution()
+        self.apply_contribution_change(old, None)
+        self._saved_contribution = None
@@ -0,0 +1,75 @@
+from django.db import models, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+
+
+def highest_number(queryset, field, prefix):
+    """Highest number already used after prefix in field, or 0"""
+    highest = 0
+    values = queryset.filter(**{f'{field}__startswith': prefix}).values_list(field, flat=True)
+    for value in values.iterator():
+        suffix = value[len(prefix):]
+        if suffix.isdigit():
+            highest = max(highest, int(suffix))
+    return highest
+
+
+class IdSequence(models.Model):
+    """
+    Last number handed out under an ID prefix (PRT-PLA-, JOB-2026-, CLI-2026-).
+    Numbers come from one atomic increment of this row, so concurrent
+    creates never pick the same ID and no scan of existing IDs is needed.
+    """
+    prefix = models.CharField(max_length=20, unique=True)
+    last_value = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        ordering = ['prefix']
+    
+    def __str__(self):
+        return f"{self.prefix}{self.last_value}"
+    
+    @classmethod
+    def _increment(cls, prefix, update, seed):
+        """
+        Apply update to the prefix's row, creating it from seed() (the
+        highest number already in use) the first time the prefix is seen
+        """
+        if cls.objects.filter(prefix=prefix).update(last_value=update):
+            return
+        
+        cls.objects.get_or_create(prefix=prefix, defaults={'last_value': seed() if seed else 0})
+        cls.objects.filter(prefix=prefix).update(last_value=update)
+    
+    @classmethod
+    def allocate(cls, prefix, count=1, seed=None):
+        """Reserve count consecutive numbers under prefix and return the first"""
+        with transaction.atomic():
+            cls._increment(prefix, F('last_value') + count, seed)
+            last_value = cls.objects.filter(prefix=prefix).values_list('last_value', flat=True).get()
+        return last_value - count + 1
+    
+    @classmethod
+    def advance(cls, prefix, value, seed=None):
+        """Make sure value is never handed out, for IDs numbered some other way"""
+        with transaction.atomic():
+            cls._increment(prefix, Greatest(F('last_value'), value), seed)
+    
+    @classmethod
+    def assign_ids(cls, objects, field, digits=4):
+        """
+        Give unsaved objects without an ID the next numbers under their
+        get_id_prefix(), reserving one block per prefix (for bulk imports).
+        Objects whose prefix is None are left alone.
+        """
+        by_prefix = {}
+        for obj in objects:
+            prefix = None if getattr(obj, field) else obj.get_id_prefix()
+            if prefix:
+                by_prefix.setdefault(prefix, []).append(obj)
+        
+        for prefix, group in by_prefix.items():
+            manager = type(group[0])._default_manager
+            first = cls.allocate(prefix, len(group), seed=lambda: highest_number(manager, field, prefix))
+            for number, obj in enumerate(group, first):
+                setattr(obj, field, f"{prefix}{number:0{digits}d}")
@@ -1,11 +1,10 @@
 from django.db import models
-from django.core.files.base import ContentFile
 from django.contrib.auth.models import User
+from django.urls import reverse
 from django.utils import timezone
-import qrcode
-import io
 
 from .client import Client, ContactPerson
+from .id_sequence import IdSequence
 # We'll import Quote when implemented
 
 class JobStatus(models.Model):
@@ -79,6 +78,10 @@ class Job(models.Model):
     
     class Meta:
         ordering = ['-created_date']
+        indexes = [
+            models.Index(fields=['created_date']),
+            models.Index(fields=['status', 'created_date']),
+        ]
     
     def __str__(self):
         return f"{self.job_id} - {self.project_name}"
@@ -86,51 +89,30 @@ class Job(models.Model):
     def save(self, *args, **kwargs):
         # Auto-generate job_id if not provided
         if not self.job_id:
-            # Get current year
-            year = timezone.now().year
-            
             # Different format for personal jobs
             if self.is_personal and self.owner:
                 username = self.owner.username[:4].upper()
-                self.job_id = f"PERS-{username}-{year}"
+                self.job_id = f"PERS-{username}-{timezone.now().year}"
             else:
-                # Find the highest job number for current year
-                last_job = Job.objects.filter(
-                    job_id__startswith=f"JOB-{year}"
-                ).order_by('-job_id').first()
-                
-                if last_job:
-                    # Extract the sequential number and increment
-                    try:
-                        last_num = int(last_job.job_id.split('-')[-1])
-                        next_num = last_num + 1
-                    except (ValueError, IndexError):
-                        next_num = 1
-                else:
-                    next_num = 1
-                    
-                # Format: JOB-YYYY-XXXX
-                self.job_id = f"JOB-{year}-{next_num:04d}"
-            
-        # Generate QR code for new jobs
-        if not self.qr_code and self.job_id:
-            qr = qrcode.QRCode(
-                version=1,
-                error_correction=qrcode.constants.ERROR_CORRECT_L,
-                box_size=10,
-                border=4,
-            )
-            qr.add_data(self.job_id)
-            qr.make(fit=True)
-
-            img = qr.make_image(fill_color="black", back_color="white")
-            buffer = io.BytesIO()
-            img.save(buffer)
-            filename = f'qr_job_{self.job_id}.png'
-            self.qr_code.save(filename, ContentFile(buffer.getvalue()), save=False)
+                # Format: JOB-YYYY-XXXX, numbered from the year's sequence
+                IdSequence.assign_ids([self], 'job_id')
         
         super().save(*args, **kwargs)
     
+    def get_id_prefix(self):
+        """Sequence prefix for numbered job IDs (None for personal jobs)"""
+        if self.is_personal and self.owner:
+            return None
+        return f"JOB-{timezone.now().year}-"
+    
+    def get_qr_data(self):
+        """Text encoded in this job's QR code"""
+        return self.job_id
+    
+    def get_qr_url(self, fmt='png'):
+        """QR code image, rendered on first request"""
+        return reverse('workshop_app:qr_code', args=['job', self.job_id]) + f'?format={fmt}'
+    
     def is_active(self):
         """Check if job is currently active"""
         active_statuses = ['in_progress', 'in progress', 'active']
@@ -178,23 +160,21 @@ class Job(models.Model):
         )
     
     def create_financial_summary(self):
-        """Update or create financial summary"""
+        """
+        Create the financial summary or rebuild it from all job rows.
+        Day-to-day changes are applied incrementally when rows are saved,
+        so this is only needed for new summaries and to repair drift.
+        """
         from .job_financial import JobFinancial
         
         summary, created = JobFinancial.objects.get_or_create(job=self)
-        summary.material_cost = self.get_total_material_cost()
-        summary.machine_cost = self.get_total_machine_cost()
-        summary.labor_cost = self.get_total_labor_cost()
-        summary.total_cost = summary.material_cost + summary.machine_cost + summary.labor_cost
+        summary.rebuild()
         
         # If we have a quote, calculate variance
         # if self.original_quote:
         #     summary.quoted_amount = self.original_quote.total_amount
         #     summary.variance = summary.total_cost - summary.quoted_amount
         
-        summary.last_updated = timezone.now()
-        summary.save()
-        
         return summary
 
 
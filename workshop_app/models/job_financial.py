@@ -1,6 +1,10 @@
+from decimal import Decimal
+
 from django.db import models
+from django.db.models import F
 from django.utils import timezone
 
+from .contribution import TotalContributor
 from .job import Job
 
 class JobFinancial(models.Model):
@@ -76,3 +80,124 @@ class JobFinancial(models.Model):
                 self.billing_status = 'partially_billed'
         
         self.save(update_fields=['billing_status'])
+
+    @classmethod
+    def apply_delta(cls, job_id, material_cost=0, machine_cost=0, labor_cost=0):
+        """
+        Add a cost change to a job's summary with a single atomic update.
+        Returns the number of summaries updated (0 if the job has none yet).
+        """
+        total = material_cost + machine_cost + labor_cost
+        if not (material_cost or machine_cost or labor_cost):
+            return 0
+        
+        return cls.objects.filter(job_id=job_id).update(
+            material_cost=F('material_cost') + material_cost,
+            machine_cost=F('machine_cost') + machine_cost,
+            labor_cost=F('labor_cost') + labor_cost,
+            total_cost=F('total_cost') + total,
+            last_updated=timezone.now()
+        )
+    
+    @classmethod
+    def reconcile(cls, job_ids=None, fix=False):
+        """
+        Compare stored summaries with totals aggregated from the job rows.
+        Returns a dict of job_id -> {field: (stored, actual)} for every summary
+        that has drifted. With fix=True the drifted summaries are rebuilt.
+        """
+        from .job_material import JobMaterial
+        from .job_machine import JobMachine
+        from .job_labor import JobLabor
+        
+        def totals(queryset, expression):
+            if job_ids is not None:
+                queryset = queryset.filter(job_id__in=job_ids)
+            return dict(
+                queryset.values('job_id').annotate(total=models.Sum(expression))
+                .values_list('job_id', 'total')
+            )
+        
+        # One grouped aggregate per cost source instead of three per job
+        actual = {
+            'material_cost': totals(JobMaterial.objects.all(), F('quantity') * F('unit_price')),
+            'machine_cost': totals(JobMachine.objects.all(), 'total_cost'),
+            'labor_cost': totals(JobLabor.objects.all(), F('hours') * F('hourly_rate')),
+        }
+        
+        summaries = cls.objects.all()
+        if job_ids is not None:
+            summaries = summaries.filter(job_id__in=job_ids)
+        
+        cent = Decimal('0.01')
+        drifted = {}
+        for summary in summaries:
+            expected = {
+                field: Decimal(values.get(summary.job_id) or 0)
+                for field, values in actual.items()
+            }
+            expected['total_cost'] = sum(expected.values())
+            
+            differences = {}
+            for field, value in expected.items():
+                stored = Decimal(getattr(summary, field) or 0)
+                if stored.quantize(cent) != value.quantize(cent):
+                    differences[field] = (stored, value)
+            
+            if differences:
+                drifted[summary.job_id] = differences
+                if fix:
+                    summary.rebuild()
+        
+        return drifted
+    
+    def rebuild(self):
+        """Recalculate every cost total from scratch"""
+        self.material_cost = self.job.get_total_material_cost()
+        self.machine_cost = self.job.get_total_machine_cost()
+        self.labor_cost = self.job.get_total_labor_cost()
+        self.total_cost = self.material_cost + self.machine_cost + self.labor_cost
+        self.last_updated = timezone.now()
+        self.save(update_fields=[
+            'material_cost', 'machine_cost', 'labor_cost', 'total_cost', 'last_updated'
+        ])
+
+
+class JobCostRollup(TotalContributor):
+    """
+    Base for job rows that contribute to a cost total on JobFinancial.
+    Each save or delete applies only the change in this row's cost to the
+    job's summary, instead of re-aggregating every row of the job.
+    """
+    # JobFinancial field this row's cost is added to
+    rollup_field = None
+    # Attributes the cost is calculated from (besides job_id)
+    rollup_depends_on = ()
+    
+    class Meta:
+        abstract = True
+    
+    @classmethod
+    def get_contribution_fields(cls):
+        return ('job_id',) + tuple(cls.rollup_depends_on)
+    
+    def get_rollup_cost(self):
+        """Cost this row adds to the job summary"""
+        raise NotImplementedError
+    
+    def get_contribution(self):
+        return self.job_id, self.get_rollup_cost()
+    
+    def apply_contribution_change(self, old, new):
+        old_job_id, old_cost = old or (None, 0)
+        new_job_id, new_cost = new or (None, 0)
+        
+        # Moved to another job (or deleted) - take the old cost off that job first
+        if old_job_id is not None and old_job_id != new_job_id:
+            JobFinancial.apply_delta(old_job_id, **{self.rollup_field: -old_cost})
+            old_cost = 0
+        
+        delta = new_cost - old_cost
+        if new_job_id is not None and delta and not JobFinancial.apply_delta(new_job_id, **{self.rollup_field: delta}):
+            # No summary yet - build it once from the saved rows
+            self.job.create_financial_summary()
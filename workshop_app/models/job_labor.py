@@ -1,12 +1,17 @@
+from decimal import Decimal
+
 from django.db import models
 from django.contrib.auth.models import User
 from django.utils import timezone
 
 from .job import Job
+from .job_financial import JobCostRollup
 from .operator import Operator
 
-class JobLabor(models.Model):
+class JobLabor(JobCostRollup):
     """Track labor hours and costs for a specific job"""
+    rollup_field = 'labor_cost'
+    rollup_depends_on = ('hours', 'hourly_rate')
     
     # Core relationships
     job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='labor_entries')
@@ -36,6 +41,9 @@ class JobLabor(models.Model):
     class Meta:
         ordering = ['-date']
         verbose_name_plural = "Job Labor Entries"
+        indexes = [
+            models.Index(fields=['job', 'date']),
+        ]
     
     def __str__(self):
         return f"{self.get_labor_type_display()} - {self.hours}h - {self.job.job_id}"
@@ -48,7 +56,7 @@ class JobLabor(models.Model):
                 self.hourly_rate = operator_record.hourly_rate
             except Operator.DoesNotExist:
                 # Default rate if no operator record
-                self.hourly_rate = 50.00
+                self.hourly_rate = Decimal('50.00')
         
         # If start_time and end_time are set, calculate hours
         if self.start_time and self.end_time and not self.hours:
@@ -62,13 +70,17 @@ class JobLabor(models.Model):
             
             # Calculate duration in hours
             duration = end_dt - start_dt
-            self.hours = round(duration.total_seconds() / 3600, 2)
+            self.hours = Decimal(str(duration.total_seconds() / 3600)).quantize(Decimal('0.01'))
         
+        # Saving also applies the cost change to the job's financial summary
         super().save(*args, **kwargs)
-        
-        # Update job's financial summary
-        self.job.create_financial_summary()
     
     def get_cost(self):
         """Calculate the cost for this labor entry"""
         return self.hours * self.hourly_rate
+    
+    def get_rollup_cost(self):
+        """Cost this entry adds to the job's labor cost"""
+        if self.hours is None or self.hourly_rate is None:
+            return 0
+        return self.get_cost()
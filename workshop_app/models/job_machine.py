@@ -1,11 +1,18 @@
+from decimal import Decimal
+
 from django.db import models
 from django.utils import timezone
 
 from .job import Job
+from .job_financial import JobCostRollup
 from .machine import Machine
+from .machine_session import MachineSessionSource
 
-class JobMachine(models.Model):
+class JobMachine(JobCostRollup, MachineSessionSource):
     """Track machine usage for a specific job"""
+    rollup_field = 'machine_cost'
+    rollup_depends_on = ('total_cost',)
+    session_link = 'job_machine'
     
     # Core relationships
     job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='machine_usages')
@@ -33,6 +40,9 @@ class JobMachine(models.Model):
     class Meta:
         ordering = ['-start_time']
         verbose_name_plural = "Job Machine Usages"
+        indexes = [
+            models.Index(fields=['job', 'start_time']),
+        ]
     
     def __str__(self):
         return f"{self.machine.name} - {self.get_duration_display()} - {self.job.job_id}"
@@ -76,18 +86,18 @@ class JobMachine(models.Model):
             # Operation cost
             operation_minutes = self.get_duration_minutes()
             self.operation_time = operation_minutes  # Update the stored operation time
-            operation_hours = operation_minutes / 60
+            operation_hours = Decimal(operation_minutes) / 60
             self.operation_cost = round(self.hourly_rate * operation_hours, 2)
             
             # Setup cost
             if self.setup_time > 0:
-                setup_hours = self.setup_time / 60
+                setup_hours = Decimal(self.setup_time) / 60
                 setup_rate = self.machine.setup_rate or self.hourly_rate
                 self.setup_cost = round(setup_rate * setup_hours, 2)
             
             # Cleanup cost
             if self.cleanup_time > 0:
-                cleanup_hours = self.cleanup_time / 60
+                cleanup_hours = Decimal(self.cleanup_time) / 60
                 cleanup_rate = self.machine.cleanup_rate or self.hourly_rate
                 self.cleanup_cost = round(cleanup_rate * cleanup_hours, 2)
             
@@ -105,9 +115,26 @@ class JobMachine(models.Model):
             self.is_active = False
             self.calculate_costs()
             self.save()
-            
-            # Update job's financial summary
-            self.job.create_financial_summary()
+    
+    def get_rollup_cost(self):
+        """Cost this session adds to the job's machine cost"""
+        return self.total_cost or 0
+    
+    def get_session_values(self):
+        """Field values for this entry's MachineSession"""
+        return {
+            'machine_id': self.machine_id,
+            'source': 'job',
+            'job_id': self.job_id,
+            'job_reference': self.job.job_id,
+            'operator_name': self.operator_name,
+            'start_time': self.start_time,
+            'end_time': self.end_time,
+            'setup_time': self.setup_time,
+            'operation_time': self.operation_time if self.end_time else 0,
+            'cleanup_time': self.cleanup_time,
+            'total_cost': self.total_cost,
+        }
     
     def save(self, *args, **kwargs):
         # Calculate costs before saving
@@ -117,7 +144,6 @@ class JobMachine(models.Model):
         if self.end_time:
             self.is_active = False
         
+        # Saving also applies the cost change to the job's financial summary
+        # and this entry's machine session
         super().save(*args, **kwargs)
-        
-        # Update job's financial summary
-        self.job.create_financial_summary()
@@ -1,11 +1,16 @@
-from django.db import models
+from decimal import Decimal
+
+from django.db import models, transaction
 from django.utils import timezone
 
 from .job import Job
+from .job_financial import JobCostRollup
 from .material import Material
 
-class JobMaterial(models.Model):
+class JobMaterial(JobCostRollup):
     """Track materials used for a specific job"""
+    rollup_field = 'material_cost'
+    rollup_depends_on = ('quantity', 'unit_price')
     
     # Core relationships
     job = models.ForeignKey(Job, on_delete=models.CASCADE, related_name='materials')
@@ -32,6 +37,9 @@ class JobMaterial(models.Model):
     class Meta:
         ordering = ['-date_used']
         verbose_name_plural = "Job Materials"
+        indexes = [
+            models.Index(fields=['job', 'date_used']),
+        ]
     
     def __str__(self):
         return f"{self.material.name} ({self.quantity} {self.material.unit_of_measurement}) - {self.job.job_id}"
@@ -41,10 +49,8 @@ class JobMaterial(models.Model):
         if not self.unit_price and self.material.price_per_unit:
             self.unit_price = self.material.price_per_unit
             
+        # Saving also applies the cost change to the job's financial summary
         super().save(*args, **kwargs)
-        
-        # Update job's financial summary
-        self.job.create_financial_summary()
     
     def get_total_price(self):
         """Calculate total price for this material usage"""
@@ -52,6 +58,23 @@ class JobMaterial(models.Model):
             return self.quantity * self.unit_price
         return None
     
+    def get_rollup_cost(self):
+        """Cost this usage adds to the job's material cost"""
+        return self.get_total_price() or 0
+    
+    def take_from_inventory(self):
+        """Book this usage in the stock ledger, reducing the material's stock"""
+        from .stock_movement import StockMovement
+        
+        return StockMovement.record(
+            self.material,
+            'job_usage',
+            -self.quantity,
+            job_material=self,
+            reference=self.job.job_id,
+            operator_name=self.added_by
+        )
+    
     def return_to_inventory(self, quantity=None):
         """Return material to inventory"""
         if quantity is None:
@@ -63,11 +86,17 @@ class JobMaterial(models.Model):
         if quantity <= 0:
             return
             
-        # Update material inventory
-        self.material.current_stock += quantity
-        self.material.save(update_fields=['current_stock'])
-        
-        # Update this record
-        self.quantity -= quantity
-        self.result = 'returned'
-        self.save()
+        # Update material inventory and this record together
+        from .stock_movement import StockMovement
+        with transaction.atomic():
+            StockMovement.record(
+                self.material,
+                'return',
+                quantity,
+                job_material=self,
+                reference=self.job.job_id
+            )
+            
+            self.quantity -= Decimal(str(quantity))
+            self.result = 'returned'
+            self.save()
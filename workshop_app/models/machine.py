@@ -1,7 +1,6 @@
 from django.db import models
-from django.core.files.base import ContentFile
-import qrcode
-import io
+from django.urls import reverse
+from ..dashboard_stats import invalidate_dashboard_stats
 
 class MachineType(models.Model):
     """Types of machines: FDM, CNC, LCUT, etc."""
@@ -60,29 +59,27 @@ class Machine(models.Model):
     # QR Code
     qr_code = models.ImageField(upload_to='qr_codes/machines/', blank=True)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=['serial_number']),
+        ]
+    
     def __str__(self):
         return f"{self.machine_id} - {self.name}"
     
+    def get_qr_data(self):
+        """Text encoded in this machine's QR code"""
+        return self.machine_id
+    
+    def get_qr_url(self, fmt='png'):
+        """QR code image, rendered on first request"""
+        return reverse('workshop_app:qr_code', args=['machine', self.machine_id]) + f'?format={fmt}'
+    
     def save(self, *args, **kwargs):
-        # Generate QR code if it doesn't exist and machine_id is set
-        if not self.qr_code and self.machine_id:
-            qr = qrcode.QRCode(
-                version=1,
-                error_correction=qrcode.constants.ERROR_CORRECT_L,
-                box_size=10,
-                border=4,
-            )
-            qr.add_data(self.machine_id)
-            qr.make(fit=True)
-
-            img = qr.make_image(fill_color="black", back_color="white")
-            buffer = io.BytesIO()
-            img.save(buffer)
-            filename = f'qr_machine_{self.machine_id}.png'
-            self.qr_code.save(filename, ContentFile(buffer.getvalue()), save=False)
-        
         # Call the parent save method
         super().save(*args, **kwargs)
+        # Status changes show up on the dashboard tiles
+        invalidate_dashboard_stats()
     
     def is_available(self):
         """Check if the machine is currently available"""
@@ -0,0 +1,219 @@
+from decimal import Decimal
+
+from django.db import models, transaction
+from django.db.models import F, Sum
+from django.db.models.functions import Trunc
+from django.utils import timezone
+from .contribution import TotalContributor
+from .machine import Machine
+
+# Report periods the daily rows can be grouped into
+PERIODS = ('day', 'week', 'month')
+
+# Totals one completed session adds to its machine's day
+ROLLUP_FIELDS = ('sessions', 'busy_minutes', 'setup_minutes', 'cleanup_minutes', 'total_cost')
+
+
+class MachineDailyUsageQuerySet(models.QuerySet):
+    """Query helpers for daily machine usage rows"""
+    
+    def totals(self):
+        """Summed totals over the filtered days"""
+        totals = self.aggregate(**{field: Sum(field) for field in ROLLUP_FIELDS})
+        return {field: value or 0 for field, value in totals.items()}
+    
+    def time_series(self, period='month'):
+        """
+        Sessions, minutes and cost per period, machine type and machine.
+        period is 'day', 'week' or 'month'.
+        """
+        return self.order_by().annotate(
+            period=Trunc('date', period, output_field=models.DateField())
+        ).values(
+            'period',
+            'machine__machine_type__code', 'machine__machine_type__name',
+            'machine__machine_id', 'machine__name'
+        ).annotate(
+            **{field: Sum(field) for field in ROLLUP_FIELDS}
+        ).order_by('period', 'machine__machine_id')
+
+
+class MachineDailyUsage(models.Model):
+    """
+    Completed machine sessions summed per machine and day.
+    Kept up to date by MachineSession saves, so reports read one row per
+    machine-day instead of every session.
+    """
+    machine = models.ForeignKey(Machine, on_delete=models.CASCADE, related_name='daily_usage')
+    date = models.DateField(help_text="Day the sessions started (local time)")
+    
+    sessions = models.IntegerField(default=0)
+    busy_minutes = models.IntegerField(default=0, help_text="Operation time in minutes")
+    setup_minutes = models.IntegerField(default=0)
+    cleanup_minutes = models.IntegerField(default=0)
+    total_cost = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    
+    objects = MachineDailyUsageQuerySet.as_manager()
+    
+    class Meta:
+        ordering = ['-date', 'machine']
+        unique_together = ['machine', 'date']
+        verbose_name_plural = "Machine Daily Usage"
+    
+    def __str__(self):
+        return f"{self.machine} on {self.date}: {self.busy_minutes} min"
+    
+    @classmethod
+    def apply_delta(cls, machine_id, date, create=True, **deltas):
+        """
+        Add deltas to a machine's day, creating the row on its first session
+        (unless create=False, for taking a session off)
+        """
+        deltas = {field: value for field, value in deltas.items() if value}
+        if not deltas:
+            return
+        
+        updates = {field: F(field) + value for field, value in deltas.items()}
+        if cls.objects.filter(machine_id=machine_id, date=date).update(**updates) or not create:
+            return
+        
+        row, created = cls.objects.get_or_create(machine_id=machine_id, date=date, defaults=deltas)
+        if not created:
+            cls.objects.filter(pk=row.pk).update(**updates)
+    
+    @classmethod
+    def apply_change(cls, old, new):
+        """
+        Move a session's contribution from old to new, where each is a
+        (machine_id, date, totals) tuple or None for a running session
+        """
+        if old == new:
+            return
+        
+        if old and new and old[:2] == new[:2]:
+            # The day already holds old, so a missing row is drift for
+            # rebuild_machine_usage to repair - a row of just the difference
+            # would be wrong (and could be negative)
+            machine_id, date, totals = new
+            cls.apply_delta(machine_id, date, create=False, **{
+                field: totals[field] - old[2][field] for field in ROLLUP_FIELDS
+            })
+            return
+        
+        if old:
+            machine_id, date, totals = old
+            # No row to take it off means the day went with its machine
+            cls.apply_delta(machine_id, date, create=False, **{field: -totals[field] for field in ROLLUP_FIELDS})
+        if new:
+            machine_id, date, totals = new
+            cls.apply_delta(machine_id, date, **totals)
+    
+    @classmethod
+    def calculate(cls, machine_ids=None, chunk_size=2000):
+        """
+        Daily totals recomputed from every completed session, optionally
+        only for some machines, as {(machine_id, date): totals}
+        """
+        from .machine_session import MachineSession
+        
+        sessions = MachineSession.objects.filter(end_time__isnull=False).order_by()
+        if machine_ids is not None:
+            sessions = sessions.filter(machine_id__in=machine_ids)
+        sessions = sessions.only('machine_id', *MachineSession.usage_rollup_depends_on)
+        
+        days = {}
+        for session in sessions.iterator(chunk_size=chunk_size):
+            machine_id, date, totals = session.get_daily_usage()
+            day = days.setdefault((machine_id, date), dict.fromkeys(ROLLUP_FIELDS, 0))
+            for field in ROLLUP_FIELDS:
+                day[field] += totals[field]
+        return days
+    
+    @classmethod
+    def reconcile(cls, machine_ids=None, fix=False):
+        """
+        Compare the stored rows with totals recomputed from the sessions.
+        Returns {(machine_id, date): (stored, actual)} for every day that
+        differs; with fix=True the affected machines are rebuilt.
+        """
+        actual = cls.calculate(machine_ids)
+        rows = cls.objects.all()
+        if machine_ids is not None:
+            rows = rows.filter(machine_id__in=machine_ids)
+        stored = {
+            (row['machine_id'], row['date']): {field: row[field] for field in ROLLUP_FIELDS}
+            for row in rows.values('machine_id', 'date', *ROLLUP_FIELDS)
+        }
+        
+        empty = dict.fromkeys(ROLLUP_FIELDS, 0)
+        drifted = {}
+        for key in stored.keys() | actual.keys():
+            stored_day, actual_day = stored.get(key, empty), actual.get(key, empty)
+            if any(stored_day[field] != actual_day[field] for field in ROLLUP_FIELDS):
+                drifted[key] = (stored_day, actual_day)
+        
+        if fix and drifted:
+            cls.rebuild(sorted({machine_id for machine_id, _ in drifted}))
+        return drifted
+    
+    @classmethod
+    def rebuild(cls, machine_ids=None):
+        """
+        Replace the rows with totals recomputed from every completed session,
+        optionally only for some machines. Returns the number of rows written.
+        """
+        with transaction.atomic():
+            days = cls.calculate(machine_ids)
+            rows = cls.objects.all()
+            if machine_ids is not None:
+                rows = rows.filter(machine_id__in=machine_ids)
+            rows.delete()
+            cls.objects.bulk_create(
+                [cls(machine_id=machine_id, date=date, **totals) for (machine_id, date), totals in days.items()],
+                batch_size=500
+            )
+        return len(days)
+
+
+class MachineUsageRollup(TotalContributor):
+    """
+    Base for machine session models that feed MachineDailyUsage.
+    Each save or delete moves only this session's contribution between
+    days, instead of re-aggregating the machine's history.
+    """
+    # Attributes the daily contribution is calculated from (besides machine_id)
+    usage_rollup_depends_on = ('start_time', 'end_time', 'setup_time', 'cleanup_time', 'total_cost')
+    
+    class Meta:
+        abstract = True
+    
+    @classmethod
+    def get_contribution_fields(cls):
+        return ('machine_id',) + tuple(cls.usage_rollup_depends_on)
+    
+    def get_busy_minutes(self):
+        """Operation minutes this session adds to its day"""
+        return self.get_duration_minutes()
+    
+    def get_daily_usage(self):
+        """(machine_id, date, totals) this session adds, or None while it's running"""
+        if not self.end_time:
+            return None
+        
+        start_time = self.start_time
+        if timezone.is_aware(start_time):
+            start_time = timezone.localtime(start_time)
+        
+        return (self.machine_id, start_time.date(), {
+            'sessions': 1,
+            'busy_minutes': self.get_busy_minutes(),
+            'setup_minutes': self.setup_time or 0,
+            'cleanup_minutes': self.cleanup_time or 0,
+            'total_cost': Decimal(self.total_cost or 0).quantize(Decimal('0.01')),
+        })
+    
+    def get_contribution(self):
+        return self.get_daily_usage()
+    
+    def apply_contribution_change(self, old, new):
+        MachineDailyUsage.apply_change(old, new)
@@ -1,9 +1,13 @@
 from django.db import models
 from django.utils import timezone
 from .machine import Machine
+from .stored_file import StoredFileReferences
+from ..storage import content_storage
 
-class MachineMaintenance(models.Model):
+class MachineMaintenance(StoredFileReferences):
     """Track machine maintenance records"""
+    stored_file_fields = ('receipt', 'documentation')
+    
     # Link to parent machine
     machine = models.ForeignKey(Machine, on_delete=models.CASCADE, related_name='maintenance_records')
     
@@ -39,8 +43,8 @@ class MachineMaintenance(models.Model):
     issues_found = models.TextField(blank=True, help_text="Issues discovered during maintenance")
     
     # Documentation
-    receipt = models.FileField(upload_to='receipts/maintenance/', blank=True, null=True)
-    documentation = models.FileField(upload_to='docs/maintenance/', blank=True, null=True)
+    receipt = models.FileField(upload_to='receipts/maintenance/', storage=content_storage, blank=True, null=True)
+    documentation = models.FileField(upload_to='docs/maintenance/', storage=content_storage, blank=True, null=True)
     
     # Tracking
     created_at = models.DateTimeField(auto_now_add=True)
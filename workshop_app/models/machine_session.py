@@ -0,0 +1,137 @@
+from django.db import models, transaction
+from django.db.models import Count, Q, Sum
+from .machine import Machine
+from .machine_daily_usage import MachineUsageRollup
+
+
+class MachineSessionQuerySet(models.QuerySet):
+    """Query helpers for machine sessions"""
+    
+    def running(self):
+        """Sessions that haven't ended yet"""
+        return self.filter(end_time__isnull=True)
+    
+    def overlapping(self, machine, start_time, end_time=None):
+        """
+        Sessions on a machine that overlap start_time..end_time
+        (an open range when end_time is None)
+        """
+        sessions = self.filter(machine=machine).filter(Q(end_time__isnull=True) | Q(end_time__gt=start_time))
+        if end_time is not None:
+            sessions = sessions.filter(start_time__lt=end_time)
+        return sessions
+    
+    def totals_by_machine(self):
+        """
+        Session count, operation/setup/cleanup minutes and cost per machine,
+        from a single grouped query over the filtered sessions
+        """
+        return self.order_by().values(
+            'machine', 'machine__machine_id', 'machine__name'
+        ).annotate(
+            count=Count('id'),
+            machine_time=Sum('operation_time', filter=Q(end_time__isnull=False)),
+            setup_time=Sum('setup_time'),
+            cleanup_time=Sum('cleanup_time'),
+            total_cost=Sum('total_cost'),
+        ).order_by('machine__machine_id')
+
+
+class MachineSession(MachineUsageRollup):
+    """
+    One stretch of machine time, whichever way it was entered.
+    MachineUsage records and JobMachine entries each keep their session
+    in step on save, so machine-level reports and overlap checks query
+    this one table.
+    """
+    SOURCE_CHOICES = [
+        ('usage', 'Machine Usage Record'),
+        ('job', 'Job Machine Usage'),
+    ]
+    
+    machine = models.ForeignKey(Machine, on_delete=models.CASCADE, related_name='sessions')
+    source = models.CharField(max_length=10, choices=SOURCE_CHOICES)
+    
+    # The entry this session was written from (exactly one is set)
+    usage = models.OneToOneField('MachineUsage', on_delete=models.CASCADE, null=True, blank=True, related_name='session')
+    job_machine = models.OneToOneField('JobMachine', on_delete=models.CASCADE, null=True, blank=True, related_name='session')
+    
+    # Job information
+    job = models.ForeignKey('Job', on_delete=models.SET_NULL, null=True, blank=True, related_name='machine_sessions')
+    job_reference = models.CharField(max_length=100, blank=True)
+    operator_name = models.CharField(max_length=100, blank=True)
+    
+    # Timing information
+    start_time = models.DateTimeField()
+    end_time = models.DateTimeField(null=True, blank=True)
+    setup_time = models.IntegerField(default=0, help_text="Setup time in minutes")
+    operation_time = models.IntegerField(default=0, help_text="Operation time in minutes")
+    cleanup_time = models.IntegerField(default=0, help_text="Cleanup time in minutes")
+    
+    total_cost = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    
+    objects = MachineSessionQuerySet.as_manager()
+    
+    usage_rollup_depends_on = MachineUsageRollup.usage_rollup_depends_on + ('operation_time',)
+    
+    class Meta:
+        ordering = ['-start_time']
+        indexes = [
+            models.Index(fields=['machine', 'start_time']),
+            models.Index(fields=['machine', 'end_time']),
+        ]
+    
+    def __str__(self):
+        return f"{self.machine_id} session from {self.start_time:%Y-%m-%d %H:%M}"
+    
+    @classmethod
+    def sync(cls, source):
+        """Write a source entry's current values to its session, creating it on the first save"""
+        link = {source.session_link: source}
+        session = cls.objects.filter(**link).first() or cls(**link)
+        for field, value in source.get_session_values().items():
+            setattr(session, field, value)
+        session.save()
+        return session
+    
+    def get_duration_minutes(self):
+        """Operation time in minutes (0 while running)"""
+        return self.operation_time if self.end_time else 0
+    
+    def get_duration_display(self):
+        """Format the duration for display"""
+        hours, mins = divmod(self.get_duration_minutes(), 60)
+        
+        if hours > 0:
+            return f"{hours}h {mins}m"
+        else:
+            return f"{mins}m"
+
+
+class MachineSessionSource(models.Model):
+    """
+    Base for the models machine time is entered through.
+    Saving an entry updates its MachineSession in the same transaction;
+    deleting one deletes the session with it (by cascade, which takes it
+    off the daily usage too).
+    """
+    # MachineSession field that links back to this entry
+    session_link = None
+    
+    class Meta:
+        abstract = True
+    
+    def get_session_values(self):
+        """Field values for this entry's MachineSession"""
+        raise NotImplementedError
+    
+    def get_overlapping_sessions(self):
+        """Other sessions on the same machine that overlap this entry"""
+        return MachineSession.objects.overlapping(
+            self.machine_id, self.start_time, self.end_time
+        ).exclude(**{self.session_link: self})
+    
+    def save(self, *args, **kwargs):
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            MachineSession.sync(self)
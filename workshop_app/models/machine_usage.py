@@ -1,8 +1,11 @@
+from decimal import Decimal
+
 from django.db import models
 from django.utils import timezone
 from .machine import Machine
+from .machine_session import MachineSessionSource
 
-class MachineUsage(models.Model):
+class MachineUsage(MachineSessionSource):
     """Track machine usage for specific jobs"""
     # Link to parent machine
     machine = models.ForeignKey(Machine, on_delete=models.CASCADE, related_name='usage_records')
@@ -28,9 +31,14 @@ class MachineUsage(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    session_link = 'usage'
+    
     class Meta:
         ordering = ['-start_time']
         verbose_name_plural = "Machine Usage Records"
+        indexes = [
+            models.Index(fields=['machine', 'start_time']),
+        ]
     
     def __str__(self):
         duration = self.get_duration_display()
@@ -65,31 +73,47 @@ class MachineUsage(models.Model):
             
         # Calculate operation cost
         operation_minutes = self.get_duration_minutes()
-        operation_hours = operation_minutes / 60
+        operation_hours = Decimal(operation_minutes) / 60
         
         if self.machine.hourly_rate:
-            self.operation_cost = self.machine.hourly_rate * operation_hours
+            self.operation_cost = round(self.machine.hourly_rate * operation_hours, 2)
         else:
             self.operation_cost = 0
             
         # Calculate setup cost
         if self.machine.setup_rate and self.setup_time > 0:
-            setup_hours = self.setup_time / 60
-            self.setup_cost = self.machine.setup_rate * setup_hours
+            setup_hours = Decimal(self.setup_time) / 60
+            self.setup_cost = round(self.machine.setup_rate * setup_hours, 2)
         else:
             self.setup_cost = 0
             
         # Calculate cleanup cost
         if self.machine.cleanup_rate and self.cleanup_time > 0:
-            cleanup_hours = self.cleanup_time / 60
-            self.cleanup_cost = self.machine.cleanup_rate * cleanup_hours
+            cleanup_hours = Decimal(self.cleanup_time) / 60
+            self.cleanup_cost = round(self.machine.cleanup_rate * cleanup_hours, 2)
         else:
             self.cleanup_cost = 0
             
         # Calculate total cost
         self.total_cost = (self.operation_cost or 0) + (self.setup_cost or 0) + (self.cleanup_cost or 0)
     
+    def get_session_values(self):
+        """Field values for this record's MachineSession"""
+        return {
+            'machine_id': self.machine_id,
+            'source': 'usage',
+            'job_reference': self.job_reference,
+            'operator_name': self.operator_name,
+            'start_time': self.start_time,
+            'end_time': self.end_time,
+            'setup_time': self.setup_time,
+            'operation_time': self.get_duration_minutes(),
+            'cleanup_time': self.cleanup_time,
+            'total_cost': self.total_cost,
+        }
+    
     def save(self, *args, **kwargs):
         """Override save to ensure costs are calculated"""
         self.calculate_costs()
+        # Saving also updates this record's machine session
         super().save(*args, **kwargs)
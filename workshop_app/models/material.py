@@ -1,10 +1,10 @@
 from django.db import models
-from django.core.files.base import ContentFile
+from django.db.models import F, Q
 from django.contrib.auth.models import User
+from django.urls import reverse
 from django.utils import timezone
-import qrcode
-import io
-from PIL import Image
+from ..dashboard_stats import invalidate_dashboard_stats
+from .id_sequence import IdSequence, highest_number
 
 
 class MaterialCategory(models.Model):
@@ -38,6 +38,22 @@ class MaterialType(models.Model):
         return f"{self.category.code}-{self.code}"
 
 
+# Same rule as Material.is_low_stock(), as a database filter
+LOW_STOCK_FILTER = (
+    Q(minimum_stock_level__isnull=False) &
+    ~Q(minimum_stock_level=0) &
+    Q(current_stock__lte=F('minimum_stock_level'))
+)
+
+
+class MaterialQuerySet(models.QuerySet):
+    """Query helpers for materials"""
+    
+    def low_stock(self):
+        """Materials at or below their minimum stock level"""
+        return self.filter(LOW_STOCK_FILTER)
+
+
 class Material(models.Model):
     """Individual material entries"""
     # Basic Info
@@ -75,6 +91,16 @@ class Material(models.Model):
     notes = models.TextField(blank=True)
     qr_code = models.ImageField(upload_to='qr_codes/materials/', blank=True)
     
+    objects = MaterialQuerySet.as_manager()
+    
+    # Kept by StockMovement.record() rather than saved with the material
+    LEDGER_FIELDS = ('current_stock', 'price_per_unit')
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['serial_number']),
+        ]
+    
     def __str__(self):
         display = f"{self.material_id} - {self.name}"
         if self.color:
@@ -96,66 +122,68 @@ class Material(models.Model):
         # Set created_at for new objects only
         if not self.pk:
             self.created_at = timezone.now()
-            
-        # Generate QR code if it doesn't exist and material_id is set
-        if not self.qr_code and self.material_id:
-            qr = qrcode.QRCode(
-                version=1,
-                error_correction=qrcode.constants.ERROR_CORRECT_L,
-                box_size=10,
-                border=4,
-            )
-            # Include both material_id and serial_number in QR code if available
-            qr_data = self.material_id
-            if self.serial_number:
-                qr_data += f"|{self.serial_number}"
-            
-            qr.add_data(qr_data)
-            qr.make(fit=True)
-
-            img = qr.make_image(fill_color="black", back_color="white")
-            buffer = io.BytesIO()
-            img.save(buffer)
-            filename = f'qr_material_{self.material_id}.png'
-            self.qr_code.save(filename, ContentFile(buffer.getvalue()), save=False)
+        
+        # Opening stock goes through the stock ledger like any other movement
+        opening_stock = None
+        if not self.pk and self.current_stock:
+            opening_stock, self.current_stock = self.current_stock, 0
+        
+        # Stock and average price belong to the stock ledger, which updates
+        # them in place - an edit mustn't write back the values it loaded
+        if not self._state.adding:
+            update_fields = kwargs.get('update_fields')
+            if update_fields is None:
+                update_fields = [field.name for field in self._meta.concrete_fields if not field.primary_key]
+            kwargs['update_fields'] = [name for name in update_fields if name not in self.LEDGER_FIELDS]
         
         # Call the parent save method
         super().save(*args, **kwargs)
+        invalidate_dashboard_stats()
+        
+        if opening_stock:
+            from .stock_movement import StockMovement
+            StockMovement.record(
+                self, 'adjustment', opening_stock,
+                unit_cost=self.price_per_unit, notes="Opening stock"
+            )
+    
+    def get_id_prefix(self):
+        """Sequence prefix for numbered material IDs, e.g. PRT-PLA-"""
+        if self.serial_number and len(self.serial_number) >= 4:
+            # Numbered from the serial number instead
+            return None
+        return f"{self.material_type.category.code}-{self.material_type.code}-"
     
     def generate_material_id(self):
         """Auto-generate material ID using category, type and serial number"""
-        # Get the category and type codes
-        category_code = self.material_type.category.code
-        type_code = self.material_type.code
-        
-        # Base part of the ID
-        base_id = f"{category_code}-{type_code}-"
-        
         # Try to use last 4 digits of serial number if available
         if self.serial_number and len(self.serial_number) >= 4:
+            base_id = f"{self.material_type.category.code}-{self.material_type.code}-"
+            
             # Get last 4 digits, or pad with zeros if shorter
             last_digits = self.serial_number[-4:].zfill(4)
             self.material_id = f"{base_id}{last_digits}"
-        else:
-            # If no serial number, find the next available number
-            # Get the highest number for this category and type
-            existing_materials = Material.objects.filter(
-                material_id__startswith=base_id
-            ).order_by('-material_id')
             
-            if existing_materials.exists():
-                # Extract the number part and increment
-                last_id = existing_materials.first().material_id
-                try:
-                    last_number = int(last_id.split('-')[-1])
-                    next_number = last_number + 1
-                except (ValueError, IndexError):
-                    next_number = 1
-            else:
-                next_number = 1
-                
-            # Format with leading zeros
-            self.material_id = f"{base_id}{next_number:04d}"
+            # Keep the sequence from handing out the same number later
+            if last_digits.isdigit():
+                IdSequence.advance(
+                    base_id, int(last_digits),
+                    seed=lambda: highest_number(Material.objects, 'material_id', base_id)
+                )
+        else:
+            # If no serial number, take the next number in the sequence
+            IdSequence.assign_ids([self], 'material_id')
+    
+    def get_qr_data(self):
+        """Text encoded in this material's QR code (ID and serial number if any)"""
+        qr_data = self.material_id
+        if self.serial_number:
+            qr_data += f"|{self.serial_number}"
+        return qr_data
+    
+    def get_qr_url(self, fmt='png'):
+        """QR code image, rendered on first request"""
+        return reverse('workshop_app:qr_code', args=['material', self.material_id]) + f'?format={fmt}'
     
     def is_low_stock(self):
         """Check if the material is running low on stock"""
@@ -164,21 +192,15 @@ class Material(models.Model):
         return False
     
     def update_price_and_stock(self):
-        """Update average price and stock based on entries"""
-        from .material_entry import MaterialEntry
-        entries = MaterialEntry.objects.filter(material=self)
+        """Sync cached stock and average price with the latest stock movement"""
+        latest = self.stock_movements.order_by('-id').first()
         
-        if entries.exists():
-            # Calculate total quantity and weighted price
-            total_quantity = sum(entry.quantity for entry in entries)
-            total_value = sum(entry.quantity * entry.price_per_unit for entry in entries)
-            
-            # Update stock and average price
-            self.current_stock = total_quantity
-            if total_quantity > 0:
-                self.price_per_unit = total_value / total_quantity
+        if latest:
+            self.current_stock = latest.balance_after
+            if latest.average_cost_after is not None:
+                self.price_per_unit = latest.average_cost_after
             
-            # Save without triggering another update
+            # Save without touching the other fields
             Material.objects.filter(id=self.id).update(
                 current_stock=self.current_stock,
                 price_per_unit=self.price_per_unit
@@ -1,6 +1,10 @@
 from django.db import models
+from django.urls import reverse
 from .material import Material
 from django.contrib.auth.models import User
+from .stored_file import StoredFileReferences
+from .. import thumbnails
+from ..storage import content_storage
 
 
 class AttachmentType(models.Model):
@@ -11,13 +15,15 @@ class AttachmentType(models.Model):
         return self.name
 
 
-class MaterialAttachment(models.Model):
+class MaterialAttachment(StoredFileReferences):
     """File attachments for materials"""
+    stored_file_fields = ('file',)
+    
     material = models.ForeignKey(Material, on_delete=models.CASCADE, related_name='attachments')
     attachment_type = models.ForeignKey(AttachmentType, on_delete=models.PROTECT, related_name='attachments')
     custom_type = models.CharField(max_length=50, blank=True, help_text="Custom type if not in dropdown")
     description = models.CharField(max_length=100, blank=True)
-    file = models.FileField(upload_to='material_attachments/')
+    file = models.FileField(upload_to='material_attachments/', storage=content_storage)
     uploaded_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='uploaded_attachments')
     upload_date = models.DateTimeField(auto_now_add=True)
     
@@ -44,5 +50,16 @@ class MaterialAttachment(models.Model):
         """Check if the file is a PDF"""
         return self.get_file_extension() == 'pdf'
     
+    def get_thumbnail_url(self, size='small'):
+        """Scaled-down copy of an image attachment (small, medium or large)"""
+        return reverse('workshop_app:material_attachment_thumbnail', args=[self.pk, size])
+    
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        
+        # Have the thumbnails ready before anyone asks for them
+        if self.file and self.is_image():
+            thumbnails.queue_thumbnails(self.file.path)
+    
     class Meta:
         ordering = ['attachment_type', 'upload_date']
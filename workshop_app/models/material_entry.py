@@ -1,9 +1,13 @@
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 from .material import Material
+from .stored_file import StoredFileReferences
+from ..storage import content_storage
 
-class MaterialEntry(models.Model):
+class MaterialEntry(StoredFileReferences):
     """Individual material purchase entries"""
+    stored_file_fields = ('receipt',)
+    
     # Link to parent material
     material = models.ForeignKey(Material, on_delete=models.CASCADE, related_name='entries')
     
@@ -13,7 +17,7 @@ class MaterialEntry(models.Model):
     purchase_date = models.DateField(default=timezone.now)
     
     # Receipt and notes
-    receipt = models.FileField(upload_to='receipts/materials/', blank=True, null=True, help_text="PDF receipt for this purchase")
+    receipt = models.FileField(upload_to='receipts/materials/', storage=content_storage, blank=True, null=True, help_text="PDF receipt for this purchase")
     supplier_name = models.CharField(max_length=100, blank=True)
     notes = models.TextField(blank=True)
     
@@ -29,8 +33,29 @@ class MaterialEntry(models.Model):
         return f"Entry {self.id} for {self.material.material_id} - {self.quantity} {self.material.unit_of_measurement}"
     
     def save(self, *args, **kwargs):
-        # Save the entry first
-        super().save(*args, **kwargs)
+        from .stock_movement import StockMovement
+        
+        # Work out how much stock this save adds
+        is_new = self._state.adding
+        if is_new:
+            added = self.quantity
+        else:
+            previous = MaterialEntry.objects.filter(pk=self.pk).values_list('quantity', flat=True).first()
+            added = self.quantity - (previous or 0)
         
-        # Update the parent material's average price and stock
-        self.material.update_price_and_stock()
+        with transaction.atomic():
+            # Save the entry first
+            super().save(*args, **kwargs)
+            
+            # Book the purchase (or a correction to it) in the stock ledger,
+            # which also updates the material's stock and average price
+            if added:
+                StockMovement.record(
+                    self.material,
+                    'purchase' if is_new else 'adjustment',
+                    added,
+                    unit_cost=self.price_per_unit,
+                    entry=self,
+                    reference=f"Entry {self.pk}",
+                    notes='' if is_new else "Purchase entry corrected"
+                )
@@ -0,0 +1,104 @@
+import math
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.db import models
+from django.utils import timezone
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of a sorted list"""
+    return sorted_values[max(math.ceil(fraction * len(sorted_values)) - 1, 0)]
+
+
+class RequestSample(models.Model):
+    """
+    Measurements of one request, stored for a sample of requests by
+    RequestMetricsMiddleware (settings.REQUEST_METRICS_SAMPLE_RATE)
+    """
+    timestamp = models.DateTimeField(default=timezone.now)
+    endpoint = models.CharField(max_length=200, help_text="URL name of the view")
+    method = models.CharField(max_length=10)
+    path = models.CharField(max_length=255)
+    status_code = models.PositiveSmallIntegerField()
+    duration_ms = models.FloatField()
+    query_count = models.PositiveIntegerField()
+    sql_ms = models.FloatField()
+    duplicate_queries = models.PositiveIntegerField(default=0)
+    template_ms = models.FloatField(default=0)
+    response_bytes = models.PositiveIntegerField(null=True, blank=True)
+    repeated_query = models.TextField(blank=True, help_text="Statement run most often, if repeated")
+    repeated_count = models.PositiveIntegerField(default=0)
+    
+    class Meta:
+        ordering = ['-timestamp']
+        indexes = [
+            models.Index(fields=['timestamp']),
+        ]
+    
+    def __str__(self):
+        return f"{self.method} {self.endpoint} {self.duration_ms:.0f} ms, {self.query_count} queries"
+    
+    @classmethod
+    def record(cls, record):
+        """Store a record from RequestMetrics.as_record()"""
+        repeated = record['repeated'][0] if record['repeated'] else None
+        return cls.objects.create(
+            endpoint=record['endpoint'][:200],
+            method=record['method'][:10],
+            path=record['path'][:255],
+            status_code=record['status'],
+            duration_ms=record['duration_ms'],
+            query_count=record['queries'],
+            sql_ms=record['sql_ms'],
+            duplicate_queries=record['duplicate_queries'],
+            template_ms=record['template_ms'],
+            response_bytes=record['response_bytes'],
+            repeated_query=repeated['sql'] if repeated else '',
+            repeated_count=repeated['count'] if repeated else 0,
+        )
+    
+    @classmethod
+    def summarize(cls, since):
+        """
+        Latency and query statistics per endpoint and method for the samples
+        taken since a time, slowest (by p95) first
+        """
+        groups = defaultdict(list)
+        samples = cls.objects.filter(timestamp__gte=since).values_list(
+            'endpoint', 'method', 'duration_ms', 'query_count', 'sql_ms',
+            'duplicate_queries', 'template_ms', 'response_bytes', 'repeated_query'
+        )
+        for endpoint, method, *values in samples.iterator():
+            groups[(endpoint, method)].append(values)
+        
+        summaries = []
+        for (endpoint, method), rows in groups.items():
+            durations, queries, sql, duplicates, templates, sizes, repeated = zip(*rows)
+            durations = sorted(durations)
+            sizes = [size for size in sizes if size is not None]
+            repeated = Counter(sql for sql in repeated if sql)
+            count = len(rows)
+            summaries.append({
+                'endpoint': endpoint,
+                'method': method,
+                'count': count,
+                'p50_ms': percentile(durations, 0.5),
+                'p95_ms': percentile(durations, 0.95),
+                'max_ms': durations[-1],
+                'queries': sum(queries) / count,
+                'max_queries': max(queries),
+                'sql_ms': sum(sql) / count,
+                'duplicate_queries': sum(duplicates) / count,
+                'template_ms': sum(templates) / count,
+                'response_bytes': sum(sizes) / len(sizes) if sizes else None,
+                'repeated_query': repeated.most_common(1)[0][0] if repeated else '',
+            })
+        summaries.sort(key=lambda summary: summary['p95_ms'], reverse=True)
+        return summaries
+    
+    @classmethod
+    def prune(cls, days):
+        """Delete samples older than days, returning how many were deleted"""
+        deleted, _ = cls.objects.filter(timestamp__lt=timezone.now() - timedelta(days=days)).delete()
+        return deleted
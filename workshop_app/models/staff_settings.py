@@ -34,6 +34,27 @@ class StaffSettings(models.Model):
     def __str__(self):
         return f"Settings for {self.user.username}"
     
+    @classmethod
+    def for_user(cls, user, create=False):
+        """
+        The user's settings, with the active job, its client and status
+        joined in one query. Read fresh on every call (the middleware calls
+        it once per request), so a job switched in one worker process is
+        active in all of them straight away.
+        Returns None if the user has none yet, unless create is set.
+        """
+        settings = cls.objects.select_related(
+            'active_job__client', 'active_job__status', 'personal_job'
+        ).filter(user=user).first()
+        
+        if settings is None and create:
+            settings, _ = cls.objects.get_or_create(user=user)
+        
+        if settings is None:
+            return None
+        settings.user = user
+        return settings
+    
     def set_active_job(self, job):
         """Set a job as active for this user"""
         self.active_job = job
@@ -125,6 +146,10 @@ class JobActivityLog(models.Model):
     
     class Meta:
         ordering = ['-timestamp']
+        indexes = [
+            # With job, so recent jobs per user are read from the index alone
+            models.Index(fields=['user', 'timestamp', 'job']),
+        ]
     
     def __str__(self):
         return f"{self.get_activity_type_display()} on {self.job.job_id} by {self.user.username}"
@@ -0,0 +1,110 @@
+from decimal import Decimal
+
+from django.db import models, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .material import Material
+from ..dashboard_stats import invalidate_dashboard_stats
+
+
+class StockMovement(models.Model):
+    """
+    Append-only ledger of every change to a material's stock.
+    Material.current_stock and price_per_unit are a cached projection of
+    the latest movement, kept up to date with atomic F() updates.
+    """
+    MOVEMENT_TYPES = [
+        ('purchase', 'Purchase'),
+        ('consumption', 'Consumption'),
+        ('return', 'Return'),
+        ('job_usage', 'Job Usage'),
+        ('adjustment', 'Adjustment'),
+    ]
+    
+    material = models.ForeignKey(Material, on_delete=models.CASCADE, related_name='stock_movements')
+    movement_type = models.CharField(max_length=20, choices=MOVEMENT_TYPES)
+    quantity = models.DecimalField(max_digits=10, decimal_places=2, help_text="Signed change in stock (negative when stock leaves)")
+    unit_cost = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True, help_text="Cost per unit for stock coming in")
+    
+    # Running totals after this movement
+    balance_after = models.DecimalField(max_digits=10, decimal_places=2)
+    average_cost_after = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
+    
+    # Source of the movement
+    entry = models.ForeignKey('workshop_app.MaterialEntry', on_delete=models.SET_NULL, null=True, blank=True, related_name='stock_movements')
+    material_transaction = models.ForeignKey('workshop_app.MaterialTransaction', on_delete=models.SET_NULL, null=True, blank=True, related_name='stock_movements')
+    job_material = models.ForeignKey('workshop_app.JobMaterial', on_delete=models.SET_NULL, null=True, blank=True, related_name='stock_movements')
+    reference = models.CharField(max_length=100, blank=True, help_text="Job or document reference")
+    operator_name = models.CharField(max_length=100, blank=True)
+    notes = models.TextField(blank=True)
+    
+    created_at = models.DateTimeField(default=timezone.now)
+    
+    class Meta:
+        ordering = ['-created_at', '-id']
+    
+    def __str__(self):
+        return f"{self.get_movement_type_display()} of {self.quantity} {self.material.unit_of_measurement} for {self.material.material_id}"
+    
+    def save(self, *args, **kwargs):
+        """Movements are never changed once recorded"""
+        if not self._state.adding:
+            raise ValueError("Stock movements are append-only. Record an adjustment instead.")
+        super().save(*args, **kwargs)
+    
+    @staticmethod
+    def next_totals(balance, average_cost, quantity, unit_cost=None):
+        """
+        Stock balance and weighted-average cost after a movement of quantity
+        (at unit_cost, for stock coming in) from balance and average_cost
+        """
+        new_balance = balance + quantity
+        if unit_cost is not None:
+            if balance <= 0 or average_cost is None:
+                average_cost = unit_cost
+            elif new_balance > 0:
+                total_value = balance * average_cost + quantity * unit_cost
+                average_cost = (total_value / new_balance).quantize(Decimal('0.01'))
+        return new_balance, average_cost
+    
+    @classmethod
+    def record(cls, material, movement_type, quantity, unit_cost=None, **details):
+        """
+        Record a stock movement and apply it to the material.
+        quantity is signed: positive for stock coming in, negative for stock
+        going out. Passing unit_cost updates the weighted-average price.
+        """
+        quantity = Decimal(str(quantity))
+        if unit_cost is not None:
+            unit_cost = Decimal(str(unit_cost))
+        
+        with transaction.atomic():
+            # The increment takes the write lock, so concurrent movements on
+            # the same material queue up here instead of losing updates
+            Material.objects.filter(pk=material.pk).update(
+                current_stock=F('current_stock') + quantity
+            )
+            balance, average_cost = Material.objects.filter(pk=material.pk).values_list(
+                'current_stock', 'price_per_unit'
+            ).get()
+            
+            if unit_cost is not None:
+                _, average_cost = cls.next_totals(balance - quantity, average_cost, quantity, unit_cost)
+                Material.objects.filter(pk=material.pk).update(price_per_unit=average_cost)
+            
+            movement = cls.objects.create(
+                material=material,
+                movement_type=movement_type,
+                quantity=quantity,
+                unit_cost=unit_cost,
+                balance_after=balance,
+                average_cost_after=average_cost,
+                **details
+            )
+        
+        # Keep the caller's instance in step with the database
+        material.current_stock = balance
+        material.price_per_unit = average_cost
+        invalidate_dashboard_stats()
+        return movement
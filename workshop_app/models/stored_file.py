@@ -0,0 +1,131 @@
+from collections import Counter
+from datetime import timedelta
+
+from django.db import models, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .contribution import TotalContributor
+
+# Files stored (or stored again) more recently than this are never collected,
+# so a file saved just before the row that references it is committed isn't
+# taken for an orphan
+GARBAGE_GRACE_PERIOD = timedelta(hours=1)
+
+
+class StoredFile(models.Model):
+    """
+    One uploaded file in the content-addressed store, shared by every
+    attachment, receipt or document with the same contents.
+    ref_count is kept up to date as rows referencing the file are saved
+    and deleted; unreferenced files are removed by collect_garbage().
+    """
+    sha256 = models.CharField(max_length=64, unique=True)
+    name = models.CharField(max_length=255, unique=True, help_text="Path in media storage")
+    size = models.BigIntegerField(default=0)
+    ref_count = models.IntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_stored_at = models.DateTimeField(default=timezone.now, help_text="Last time an upload had these contents")
+    
+    class Meta:
+        ordering = ['name']
+    
+    def __str__(self):
+        return f"{self.name} ({self.ref_count} references)"
+    
+    @classmethod
+    def change_references(cls, names, delta):
+        """Add delta references to each stored file in names (a Counter or iterable)"""
+        for name, count in Counter(names).items():
+            cls.objects.filter(name=name).update(ref_count=F('ref_count') + delta * count)
+    
+    @classmethod
+    def count_references(cls, name=None):
+        """Every stored file name (or just name) referenced by a row, with how often"""
+        references = Counter()
+        for model in StoredFileReferences.referencing_models():
+            for field in model.stored_file_fields:
+                rows = model.objects.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True})
+                if name is not None:
+                    rows = rows.filter(**{field: name})
+                references.update(rows.values_list(field, flat=True).iterator())
+        return references
+    
+    @classmethod
+    def collect_garbage(cls, grace_period=GARBAGE_GRACE_PERIOD, dry_run=False):
+        """
+        Recount the references to every stored file and delete the files
+        nothing references any more. Returns (recounted, deleted, bytes freed).
+        """
+        from ..storage import content_storage
+        
+        references = cls.count_references()
+        cutoff = timezone.now() - grace_period
+        
+        recounted = 0
+        orphans = []
+        for stored in cls.objects.iterator():
+            actual = references.get(stored.name, 0)
+            if actual == 0 and stored.last_stored_at < cutoff:
+                orphans.append(stored)
+            elif stored.ref_count != actual:
+                recounted += 1
+                if not dry_run:
+                    cls.objects.filter(pk=stored.pk).update(ref_count=actual)
+        
+        deleted = freed = 0
+        for stored in orphans:
+            if not dry_run:
+                with transaction.atomic():
+                    # An upload may have reused the file since it was counted -
+                    # check again with the row locked before deleting
+                    locked = cls.objects.select_for_update().filter(
+                        pk=stored.pk, last_stored_at__lt=cutoff
+                    ).first()
+                    if locked is None or cls.count_references(stored.name):
+                        continue
+                    locked.delete()
+                    content_storage.delete(stored.name)
+            deleted += 1
+            freed += stored.size
+        return recounted, deleted, freed
+
+
+class StoredFileReferences(TotalContributor):
+    """
+    Base for models with file fields in the content-addressed store.
+    Saving or deleting a row moves its references from the old files to
+    the new ones, so StoredFile.ref_count stays current without scanning.
+    """
+    # File fields stored in the content-addressed store
+    stored_file_fields = ()
+    
+    class Meta:
+        abstract = True
+    
+    @classmethod
+    def referencing_models(cls):
+        from django.apps import apps
+        return [
+            model for model in apps.get_app_config('workshop_app').get_models()
+            if issubclass(model, cls)
+        ]
+    
+    @classmethod
+    def get_contribution_fields(cls):
+        return cls.stored_file_fields
+    
+    def get_stored_file_names(self):
+        """Names of the files this row references"""
+        return [
+            getattr(self, field).name for field in self.stored_file_fields
+            if getattr(self, field)
+        ]
+    
+    def get_contribution(self):
+        return self.get_stored_file_names()
+    
+    def apply_contribution_change(self, old, new):
+        old, new = Counter(old or ()), Counter(new or ())
+        StoredFile.change_references(new - old, 1)
+        StoredFile.change_references(old - new, -1)
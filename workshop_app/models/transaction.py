@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, transaction
 from django.utils import timezone
 from .material import Material
 
@@ -22,24 +22,56 @@ class MaterialTransaction(models.Model):
     
     class Meta:
         ordering = ['-transaction_date']
+        indexes = [
+            models.Index(fields=['material', 'transaction_date']),
+        ]
     
     def __str__(self):
         action = "used" if self.transaction_type == 'consumption' else "returned"
         return f"{self.quantity} {self.material.unit_of_measurement} {action} on {self.transaction_date.strftime('%Y-%m-%d %H:%M')}"
     
+    def get_stock_change(self):
+        """Signed change in stock: consumption reduces it, returns add it back"""
+        return -self.quantity if self.transaction_type == 'consumption' else self.quantity
+    
     def save(self, *args, **kwargs):
-        """Override save to update the material stock"""
-        super().save(*args, **kwargs)
+        """Override save to book the transaction (or a correction to it) in the stock ledger"""
+        from .stock_movement import StockMovement
         
-        # Update material stock based on transaction type
-        if self.transaction_type == 'consumption':
-            # Reduce stock
-            self.material.current_stock -= self.quantity
-        else:
-            # Add stock
-            self.material.current_stock += self.quantity
+        is_new = self._state.adding
+        previous = None
+        if not is_new:
+            previous = MaterialTransaction.objects.filter(pk=self.pk).select_related('material').first()
         
-        # Save material without triggering recalculation from entries
-        Material.objects.filter(id=self.material.id).update(
-            current_stock=self.material.current_stock
-        )
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            
+            if previous is None:
+                StockMovement.record(
+                    self.material,
+                    self.transaction_type,
+                    self.get_stock_change(),
+                    material_transaction=self,
+                    reference=self.job_reference,
+                    operator_name=self.operator_name
+                )
+                return
+            
+            # An edit books only the difference
+            if previous.material_id == self.material_id:
+                changes = [(self.material, self.get_stock_change() - previous.get_stock_change())]
+            else:
+                # Moved to another material - take it off the old one first
+                changes = [(previous.material, -previous.get_stock_change()), (self.material, self.get_stock_change())]
+            
+            for material, quantity in changes:
+                if quantity:
+                    StockMovement.record(
+                        material,
+                        'adjustment',
+                        quantity,
+                        material_transaction=self,
+                        reference=self.job_reference,
+                        operator_name=self.operator_name,
+                        notes="Transaction corrected"
+                    )
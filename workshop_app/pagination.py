@@ -0,0 +1,133 @@
+import base64
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+# Default and maximum number of rows on one list page
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class KeysetPage:
+    """
+    One page of a keyset-paginated list.
+    Iterates like a list of the page's objects and carries the query
+    strings for the next and previous pages, with the other filters kept.
+    """
+    
+    def __init__(self, items, next_query='', previous_query=''):
+        self.items = items
+        self.next_query = next_query
+        self.previous_query = previous_query
+    
+    def __iter__(self):
+        return iter(self.items)
+    
+    def __len__(self):
+        return len(self.items)
+    
+    def __getitem__(self, index):
+        return self.items[index]
+    
+    @property
+    def has_next(self):
+        return bool(self.next_query)
+    
+    @property
+    def has_previous(self):
+        return bool(self.previous_query)
+
+
+def _normalize_ordering(model, ordering):
+    """Return (field, descending) pairs, ending with the primary key as a tie-breaker"""
+    keys = []
+    for name in ordering:
+        descending = name.startswith('-')
+        field = model._meta.pk if name.lstrip('-') == 'pk' else model._meta.get_field(name.lstrip('-'))
+        keys.append((field, descending))
+    
+    if not any(field.primary_key for field, _ in keys):
+        keys.append((model._meta.pk, keys[-1][1] if keys else False))
+    return keys
+
+
+def _encode_cursor(keys, obj):
+    values = [field.value_to_string(obj) for field, _ in keys]
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+def _decode_cursor(keys, cursor):
+    """Decode a cursor into field values, or None if it isn't valid for this ordering"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if len(values) != len(keys):
+            return None
+        return [field.to_python(value) for (field, _), value in zip(keys, values)]
+    except (ValueError, TypeError, ValidationError):
+        return None
+
+
+def _keyset_filter(keys, values, forward):
+    """Rows that come after (forward) or before the cursor values in the ordering"""
+    condition = Q()
+    equal_so_far = Q()
+    for (field, descending), value in zip(keys, values):
+        # Going forward on a descending key means smaller values
+        lookup = 'lt' if descending == forward else 'gt'
+        condition |= equal_so_far & Q(**{f'{field.attname}__{lookup}': value})
+        equal_so_far &= Q(**{field.attname: value})
+    return condition
+
+
+def paginate_keyset(request, queryset, ordering, page_size=PAGE_SIZE):
+    """
+    Paginate a queryset with a cursor on its ordering instead of an OFFSET.
+    Each page is an indexed range scan after (or before) the last row seen,
+    so deep pages cost the same as the first one however long the list gets.
+    Ordering fields should be non-null; the primary key is added to keep
+    the order stable when values tie.
+    """
+    try:
+        page_size = min(int(request.GET.get('per_page', page_size)), MAX_PAGE_SIZE)
+    except ValueError:
+        pass
+    page_size = max(page_size, 1)
+    
+    keys = _normalize_ordering(queryset.model, ordering)
+    order_by = [('-' if descending else '') + field.attname for field, descending in keys]
+    reverse_order_by = [('' if descending else '-') + field.attname for field, descending in keys]
+    
+    after = _decode_cursor(keys, request.GET.get('after', ''))
+    before = _decode_cursor(keys, request.GET.get('before', '')) if after is None else None
+    
+    if before is not None:
+        # Walk backwards from the cursor, then put the page back in order
+        items = list(queryset.filter(_keyset_filter(keys, before, forward=False))
+                     .order_by(*reverse_order_by)[:page_size + 1])
+        has_previous = len(items) > page_size
+        items = items[:page_size][::-1]
+        has_next = True
+    else:
+        if after is not None:
+            queryset = queryset.filter(_keyset_filter(keys, after, forward=True))
+        items = list(queryset.order_by(*order_by)[:page_size + 1])
+        has_next = len(items) > page_size
+        items = items[:page_size]
+        has_previous = after is not None
+    
+    # Links keep every other query parameter (filters, search, per_page)
+    params = request.GET.copy()
+    params.pop('after', None)
+    params.pop('before', None)
+    
+    next_query = previous_query = ''
+    if items and has_next:
+        params['after'] = _encode_cursor(keys, items[-1])
+        next_query = params.urlencode()
+        params.pop('after')
+    if items and has_previous:
+        params['before'] = _encode_cursor(keys, items[0])
+        previous_query = params.urlencode()
+    
+    return KeysetPage(items, next_query, previous_query)
@@ -0,0 +1,127 @@
+import hashlib
+import io
+import os
+import tempfile
+from functools import lru_cache
+
+from django.conf import settings
+
+# QR codes are rendered on first request into a content-addressed cache
+# under MEDIA_ROOT; the hash of data, format and options names the file and
+# doubles as its ETag. qrcode and PIL are only imported to render.
+
+# Bump when the rendering below changes, so cached files are rendered again
+RENDER_VERSION = 1
+
+CACHE_DIR = 'qr_cache'
+
+FORMATS = {
+    'png': 'image/png',
+    'svg': 'image/svg+xml',
+}
+
+# Pixels per module and quiet-zone width in modules (as the old PNGs)
+BOX_SIZE = 10
+BORDER = 4
+
+
+def qr_digest(data, fmt='png'):
+    """Content address of the rendered code"""
+    key = f"{RENDER_VERSION}:{fmt}:{BOX_SIZE}:{BORDER}:{data}"
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def cache_path(digest, fmt='png'):
+    return os.path.join(settings.MEDIA_ROOT, CACHE_DIR, digest[:2], f"{digest}.{fmt}")
+
+
+@lru_cache(maxsize=1024)
+def qr_matrix(data):
+    """Dark/light modules of the code for data, without the quiet zone"""
+    import qrcode
+    
+    qr = qrcode.QRCode(version=1, error_correction=qrcode.constants.ERROR_CORRECT_L, border=0)
+    qr.add_data(data)
+    qr.make(fit=True)
+    return tuple(tuple(row) for row in qr.get_matrix())
+
+
+def render_png(matrix):
+    from PIL import Image
+    
+    size = len(matrix) + 2 * BORDER
+    image = Image.new('1', (size, size), 1)
+    pixels = image.load()
+    for y, row in enumerate(matrix):
+        for x, dark in enumerate(row):
+            if dark:
+                pixels[x + BORDER, y + BORDER] = 0
+    
+    image = image.resize((size * BOX_SIZE, size * BOX_SIZE), Image.NEAREST)
+    buffer = io.BytesIO()
+    image.save(buffer, format='PNG', optimize=True)
+    return buffer.getvalue()
+
+
+def svg_path(matrix, x_offset=0, y_offset=0):
+    """SVG path data for the dark modules, one rectangle per horizontal run"""
+    parts = []
+    for y, row in enumerate(matrix):
+        x = 0
+        while x < len(row):
+            if not row[x]:
+                x += 1
+                continue
+            run = 1
+            while x + run < len(row) and row[x + run]:
+                run += 1
+            parts.append(f"M{x + x_offset},{y + y_offset}h{run}v1h-{run}z")
+            x += run
+    return ''.join(parts)
+
+
+def render_svg(matrix):
+    size = len(matrix) + 2 * BORDER
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {size} {size}" '
+        f'width="{size * BOX_SIZE}" height="{size * BOX_SIZE}" shape-rendering="crispEdges">'
+        f'<rect width="{size}" height="{size}" fill="#fff"/>'
+        f'<path d="{svg_path(matrix, BORDER, BORDER)}" fill="#000"/>'
+        '</svg>'
+    ).encode()
+
+
+RENDERERS = {
+    'png': render_png,
+    'svg': render_svg,
+}
+
+
+def get_qr_code(data, fmt='png'):
+    """
+    Path and digest of the rendered code for data, rendering it into the
+    cache on first use
+    """
+    digest = qr_digest(data, fmt)
+    path = cache_path(digest, fmt)
+    if not os.path.exists(path):
+        content = RENDERERS[fmt](qr_matrix(data))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write under a temporary name so readers never see a partial file;
+        # mkstemp gives each thread and process its own
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+            # mkstemp makes the file private to this user - cached files are public
+            os.chmod(temp_path, 0o644)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+    return path, digest
+
+
+def get_qr_codes(data_list, fmt='png'):
+    """Render (or find) the codes for many values at once, as {data: (path, digest)}"""
+    return {data: get_qr_code(data, fmt) for data in dict.fromkeys(data_list)}
@@ -0,0 +1,225 @@
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+
+from django.utils.html import escape
+
+from .qr_codes import qr_matrix, svg_path
+
+# Label sheet layout: A4 with 3 x 8 labels of 70 x 37 mm (Avery 3474 and similar)
+PAGE_WIDTH_MM = 210
+PAGE_HEIGHT_MM = 297
+COLUMNS = 3
+ROWS = 8
+LABELS_PER_PAGE = COLUMNS * ROWS
+LABEL_WIDTH_MM = PAGE_WIDTH_MM / COLUMNS
+LABEL_HEIGHT_MM = PAGE_HEIGHT_MM / ROWS
+LABEL_PADDING_MM = 3
+
+# Quiet zone around each code on a label, in modules
+LABEL_BORDER = 2
+
+# Characters of the name that fit next to the code
+SUBTITLE_LENGTH = 18
+
+# Resolution of PDF pages
+DPI = 300
+
+# Most labels one sheet may hold when requested over the web (40 pages);
+# print bigger runs with manage.py print_labels
+MAX_SHEET_LABELS = 40 * LABELS_PER_PAGE
+
+# What a label can be printed for: model, identifier field, type code lookup
+# and creation date lookup (None when the model has no creation date)
+LABEL_SOURCES = {
+    'material': ('Material', 'material_id', 'material_type__code', 'created_at__date'),
+    'machine': ('Machine', 'machine_id', 'machine_type__code', None),
+}
+
+FORMATS = {
+    'pdf': 'application/pdf',
+    'svg': 'image/svg+xml',
+}
+
+
+def label_queryset(kind, type_code=None, created=None, identifiers=None):
+    """
+    Materials or machines to print labels for, filtered by type code,
+    creation date (materials only) and/or a list of IDs
+    """
+    from . import models
+    
+    model_name, id_field, type_lookup, created_lookup = LABEL_SOURCES[kind]
+    queryset = getattr(models, model_name).objects.order_by(id_field)
+    
+    if type_code:
+        queryset = queryset.filter(**{type_lookup: type_code})
+    if created:
+        if created_lookup is None:
+            raise ValueError(f"{kind} labels can't be filtered by creation date")
+        queryset = queryset.filter(**{created_lookup: created})
+    if identifiers:
+        queryset = queryset.filter(**{f'{id_field}__in': identifiers})
+    return queryset
+
+
+def label_items(kind, objects):
+    """(QR data, title, subtitle) for each object's label: its code, ID and name"""
+    id_field = LABEL_SOURCES[kind][1]
+    return [(obj.get_qr_data(), getattr(obj, id_field), obj.name) for obj in objects]
+
+
+def _pages(items):
+    return [items[i:i + LABELS_PER_PAGE] for i in range(0, len(items), LABELS_PER_PAGE)]
+
+
+def _label_origin(index):
+    """Top-left corner of a label on its page, in mm"""
+    row, column = divmod(index, COLUMNS)
+    return column * LABEL_WIDTH_MM, row * LABEL_HEIGHT_MM
+
+
+def render_pdf_page(labels):
+    """
+    One page of labels as a 1-bit image. labels is a list of
+    (matrix, title, subtitle); can run in worker processes, so it only
+    needs PIL.
+    """
+    from PIL import Image, ImageDraw, ImageFont
+    
+    def px(mm):
+        return int(round(mm * DPI / 25.4))
+    
+    page = Image.new('1', (px(PAGE_WIDTH_MM), px(PAGE_HEIGHT_MM)), 1)
+    draw = ImageDraw.Draw(page)
+    title_font = ImageFont.load_default(size=px(4))
+    subtitle_font = ImageFont.load_default(size=px(3))
+    
+    padding = px(LABEL_PADDING_MM)
+    for index, (matrix, title, subtitle) in enumerate(labels):
+        left_mm, top_mm = _label_origin(index)
+        left, top = px(left_mm) + padding, px(top_mm) + padding
+        
+        # Code as large as the label height allows, in whole pixels per module
+        code_size = px(LABEL_HEIGHT_MM) - 2 * padding
+        modules = len(matrix) + 2 * LABEL_BORDER
+        scale = code_size // modules
+        code = Image.new('1', (modules, modules), 1)
+        pixels = code.load()
+        for y, row in enumerate(matrix):
+            for x, dark in enumerate(row):
+                if dark:
+                    pixels[x + LABEL_BORDER, y + LABEL_BORDER] = 0
+        page.paste(code.resize((modules * scale, modules * scale), Image.NEAREST), (left, top))
+        
+        text_left = left + modules * scale + padding
+        draw.text((text_left, top + padding), title, font=title_font, fill=0)
+        draw.text((text_left, top + padding + px(6)), subtitle[:SUBTITLE_LENGTH], font=subtitle_font, fill=0)
+    
+    return page
+
+
+def _pdf_page_objects(number, image):
+    """
+    The page, content and image objects of page number (0-based) as PDF
+    object bodies. Objects 1 and 2 are the catalog and page tree, then
+    each page takes three numbers.
+    """
+    page_id = 3 + 3 * number
+    width, height = (round(mm * 72 / 25.4, 2) for mm in (PAGE_WIDTH_MM, PAGE_HEIGHT_MM))
+    content = f"q {width} 0 0 {height} 0 0 cm /Im0 Do Q".encode()
+    # 1-bit pixels, packed the way PDF expects (1 is white)
+    pixels = zlib.compress(image.tobytes())
+    
+    return [
+        (page_id, (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {width} {height}] "
+            f"/Resources << /XObject << /Im0 {page_id + 2} 0 R >> >> /Contents {page_id + 1} 0 R >>"
+        ).encode()),
+        (page_id + 1, b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content)),
+        (page_id + 2, b"<< /Type /XObject /Subtype /Image /Width %d /Height %d /ColorSpace /DeviceGray "
+                      b"/BitsPerComponent 1 /Filter /FlateDecode /Length %d >>\nstream\n%s\nendstream"
+                      % (image.width, image.height, len(pixels), pixels)),
+    ]
+
+
+def iter_pdf(items, workers=None):
+    """
+    Label sheet for (QR data, title, subtitle) items as a PDF, yielded a
+    page at a time for streaming, so only one rendered page is held in
+    memory. Pages are rendered in this process, or across a pool of
+    worker processes for big offline runs (print_labels).
+    """
+    pages = _pages(items) or [[]]
+    labels = (
+        [(qr_matrix(data), title, subtitle) for data, title, subtitle in page]
+        for page in pages
+    )
+    
+    workers = min(workers or 1, len(pages))
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        images = pool.map(render_pdf_page, labels) if pool else map(render_pdf_page, labels)
+        
+        offsets = {}
+        position = 0
+        
+        def write(chunk):
+            nonlocal position
+            position += len(chunk)
+            return chunk
+        
+        def obj(number, body):
+            offsets[number] = position
+            return write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+        
+        kids = ' '.join(f"{3 + 3 * number} 0 R" for number in range(len(pages)))
+        yield write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        yield obj(1, b"<< /Type /Catalog /Pages 2 0 R >>")
+        yield obj(2, f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode())
+        
+        for number, image in enumerate(images):
+            yield b"".join(obj(object_id, body) for object_id, body in _pdf_page_objects(number, image))
+        
+        # Cross-reference table: where each object starts
+        xref_position = position
+        entries = b"".join(b"%010d 00000 n \n" % offsets[number] for number in sorted(offsets))
+        yield (
+            b"xref\n0 %d\n0000000000 65535 f \n%s" % (len(offsets) + 1, entries)
+            + b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(offsets) + 1, xref_position)
+        )
+    finally:
+        if pool:
+            pool.shutdown()
+
+
+def iter_svg(items):
+    """
+    Label sheet for (QR data, title, subtitle) items as one SVG with the
+    pages stacked top to bottom, yielded a label at a time for streaming
+    """
+    page_count = max(len(_pages(items)), 1)
+    height = PAGE_HEIGHT_MM * page_count
+    yield (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{PAGE_WIDTH_MM}mm" height="{height}mm" '
+        f'viewBox="0 0 {PAGE_WIDTH_MM} {height}" font-family="sans-serif">\n'
+        f'<rect width="{PAGE_WIDTH_MM}" height="{height}" fill="#fff"/>\n'
+    )
+    
+    code_size = LABEL_HEIGHT_MM - 2 * LABEL_PADDING_MM
+    for page_number, page in enumerate(_pages(items)):
+        for index, (data, title, subtitle) in enumerate(page):
+            left, top = _label_origin(index)
+            top += page_number * PAGE_HEIGHT_MM
+            matrix = qr_matrix(data)
+            scale = code_size / (len(matrix) + 2 * LABEL_BORDER)
+            text_left = left + LABEL_PADDING_MM * 2 + code_size
+            yield (
+                f'<g transform="translate({left + LABEL_PADDING_MM:.3f},{top + LABEL_PADDING_MM:.3f}) scale({scale:.4f})">'
+                f'<path d="{svg_path(matrix, LABEL_BORDER, LABEL_BORDER)}" fill="#000"/></g>'
+                f'<text x="{text_left:.3f}" y="{top + LABEL_PADDING_MM + 6:.3f}" font-size="4">{escape(title)}</text>'
+                f'<text x="{text_left:.3f}" y="{top + LABEL_PADDING_MM + 11:.3f}" font-size="3">{escape(subtitle[:SUBTITLE_LENGTH])}</text>\n'
+            )
+    
+    yield '</svg>\n'
@@ -0,0 +1,183 @@
+import functools
+import hashlib
+import json
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+from django.template.base import Template
+
+# What each request costs: its SQL queries (how many, how long, and how
+# often the same statement ran - the mark of a query in a loop), template
+# rendering time and response size. Collected by RequestMetricsMiddleware,
+# sent out as a Server-Timing header and a JSON log line, and sampled into
+# RequestSample for the staff performance page.
+
+logger = logging.getLogger('workshop_app.requests')
+
+# A statement run this many times in one request is reported as repeated
+REPEATED_QUERY_THRESHOLD = 5
+
+# Characters of a repeated statement kept in log lines and samples
+SQL_PREVIEW_LENGTH = 300
+
+WHITESPACE_RE = re.compile(r'\s+')
+IN_LIST_RE = re.compile(r'\((?:%s, )+%s\)')
+SELECT_LIST_RE = re.compile(r'^SELECT (?:DISTINCT )?.+? FROM ')
+
+# Metrics of the request being handled by this thread
+_current = threading.local()
+
+
+def normalize_sql(sql):
+    """Statement with IN lists collapsed, so the queries of a loop compare equal"""
+    return IN_LIST_RE.sub('(%s, ...)', WHITESPACE_RE.sub(' ', sql).strip())
+
+
+def fingerprint(sql):
+    return hashlib.sha1(sql.encode()).hexdigest()[:12]
+
+
+def preview_sql(sql):
+    """Start of a statement for reports, with the column list left out"""
+    return SELECT_LIST_RE.sub('SELECT ... FROM ', sql)[:SQL_PREVIEW_LENGTH]
+
+
+def endpoint_name(request):
+    """URL name of the view that handled the request, so /jobs/<id>/ pages group together"""
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else 'unresolved'
+
+
+class RequestMetrics:
+    """Measurements of one request, collected inside collect()"""
+    
+    def __init__(self):
+        self.duration = 0.0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        self.queries = Counter()
+        self.rendering = False
+    
+    def __call__(self, execute, sql, params, many, context):
+        # Installed as a database execute wrapper
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_time += time.perf_counter() - started
+            self.queries[normalize_sql(sql)] += 1
+    
+    @contextmanager
+    def collect(self):
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(self))
+            _current.metrics = self
+            try:
+                yield self
+            finally:
+                _current.metrics = None
+                self.duration = time.perf_counter() - started
+    
+    @property
+    def query_count(self):
+        return sum(self.queries.values())
+    
+    @property
+    def duplicate_queries(self):
+        """Queries that repeated a statement already run in this request"""
+        return self.query_count - len(self.queries)
+    
+    def repeated_queries(self):
+        """(statement, times run) for statements run REPEATED_QUERY_THRESHOLD times or more"""
+        return [
+            (sql, count) for sql, count in self.queries.most_common()
+            if count >= REPEATED_QUERY_THRESHOLD
+        ]
+    
+    def server_timing(self):
+        """Server-Timing header value, shown with the request in browser dev tools"""
+        entries = [
+            f'total;dur={self.duration * 1000:.1f}',
+            f'db;dur={self.sql_time * 1000:.1f};desc="{self.query_count} queries"',
+            f'tpl;dur={self.template_time * 1000:.1f};desc="Templates"',
+        ]
+        if self.duplicate_queries:
+            entries.append(f'dup;desc="{self.duplicate_queries} repeated queries"')
+        return ', '.join(entries)
+    
+    def as_record(self, request, response):
+        """Everything measured, with what the request was, as a dict for logging and sampling"""
+        if response.streaming:
+            size = response.get('Content-Length')
+            size = int(size) if size else None
+        else:
+            size = len(response.content)
+        
+        return {
+            'endpoint': endpoint_name(request),
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'duration_ms': round(self.duration * 1000, 2),
+            'queries': self.query_count,
+            'sql_ms': round(self.sql_time * 1000, 2),
+            'duplicate_queries': self.duplicate_queries,
+            'template_ms': round(self.template_time * 1000, 2),
+            'response_bytes': size,
+            'repeated': [
+                {'fingerprint': fingerprint(sql), 'count': count, 'sql': preview_sql(sql)}
+                for sql, count in self.repeated_queries()
+            ],
+        }
+
+
+def log_record(record):
+    """One JSON line per request, a warning when a statement was repeated"""
+    level = logging.WARNING if record['repeated'] else logging.INFO
+    logger.log(level, json.dumps(record), extra={'request_metrics': record})
+
+
+@contextmanager
+def logging_disabled():
+    """Silence the per-request log lines (for benchmarks and other bulk requests)"""
+    disabled = logger.disabled
+    logger.disabled = True
+    try:
+        yield
+    finally:
+        logger.disabled = disabled
+
+
+def instrument_templates():
+    """
+    Time template rendering for the current request. Only the outermost
+    render is timed (includes and inheritance render inside it), and it
+    includes any queries run from the template.
+    """
+    if hasattr(Template.render, 'untimed'):
+        return
+    render = Template.render
+    
+    @functools.wraps(render)
+    def timed_render(self, context):
+        metrics = getattr(_current, 'metrics', None)
+        if metrics is None or metrics.rendering:
+            return render(self, context)
+        
+        metrics.rendering = True
+        started = time.perf_counter()
+        try:
+            return render(self, context)
+        finally:
+            metrics.template_time += time.perf_counter() - started
+            metrics.rendering = False
+    
+    timed_render.untimed = render
+    Template.render = timed_render
@@ -0,0 +1,212 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+# Full-text search over materials, machines, jobs and clients. Each kind has
+# an SQLite FTS5 table whose rowid is the object's pk, kept in step with the
+# models by the handlers in signals.py. Other databases fall back to icontains.
+
+# What is searched for each kind: model, identifier field, title field and
+# the fields making up the body
+SEARCH_SOURCES = {
+    'material': ('Material', 'material_id', 'name', ('serial_number', 'supplier_sku', 'supplier_name')),
+    'machine': ('Machine', 'machine_id', 'name', ('serial_number', 'manufacturer')),
+    'job': ('Job', 'job_id', 'project_name', ('client__name', 'description')),
+    'client': ('Client', 'client_id', 'name', ('primary_email', 'phone_number', 'industry')),
+}
+
+TABLE_PREFIX = 'workshop_app_search_'
+
+# bm25 weights of the identifier, title and body columns
+COLUMN_WEIGHTS = (10.0, 5.0, 1.0)
+
+SEARCH_LIMIT = 20
+
+WORD_RE = re.compile(r'\w')
+
+# Queries with a digit in them look like (part of) an ID, serial number or
+# SKU, which is often searched from the middle ("042" for SN-2023-0042) where
+# the index only matches the start of each word
+IDENTIFIER_RE = re.compile(r'\d')
+
+
+def table_name(kind):
+    return f'{TABLE_PREFIX}{kind}'
+
+
+def is_available():
+    """Whether the FTS5 tables exist on this database"""
+    return connection.vendor == 'sqlite'
+
+
+def get_model(kind):
+    from . import models
+    return getattr(models, SEARCH_SOURCES[kind][0])
+
+
+def kind_for_model(model):
+    for kind, source in SEARCH_SOURCES.items():
+        if source[0] == model.__name__:
+            return kind
+    return None
+
+
+def _field_value(obj, path):
+    """Value of a field path like client__name, as text"""
+    value = obj
+    for name in path.split('__'):
+        value = getattr(value, name, None)
+        if value is None:
+            return ''
+    return str(value)
+
+
+def _related_fields(kind):
+    _, identifier, title, body = SEARCH_SOURCES[kind]
+    return [path.rsplit('__', 1)[0] for path in (identifier, title, *body) if '__' in path]
+
+
+def document(kind, obj):
+    """(identifier, title, body) text indexed for obj"""
+    _, identifier, title, body = SEARCH_SOURCES[kind]
+    return (
+        _field_value(obj, identifier),
+        _field_value(obj, title),
+        ' '.join(filter(None, (_field_value(obj, path) for path in body))),
+    )
+
+
+def index_objects(kind, objects):
+    """Add or replace the index entries of objects"""
+    if not is_available():
+        return
+    
+    rows = [(obj.pk, *document(kind, obj)) for obj in objects]
+    if not rows:
+        return
+    
+    table = table_name(kind)
+    with connection.cursor() as cursor:
+        cursor.executemany(f'DELETE FROM {table} WHERE rowid = %s', [(row[0],) for row in rows])
+        cursor.executemany(f'INSERT INTO {table} (rowid, identifier, title, body) VALUES (%s, %s, %s, %s)', rows)
+
+
+def remove_objects(kind, pks):
+    """Drop the index entries of the objects with these pks"""
+    if not is_available():
+        return
+    
+    with connection.cursor() as cursor:
+        cursor.executemany(f'DELETE FROM {table_name(kind)} WHERE rowid = %s', [(pk,) for pk in pks])
+
+
+def rebuild(kind, chunk_size=2000):
+    """Re-index every object of a kind, returning how many were indexed"""
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {table_name(kind)}')
+    
+    objects = get_model(kind).objects.select_related(*_related_fields(kind)).order_by('pk')
+    chunk = []
+    count = 0
+    for obj in objects.iterator(chunk_size=chunk_size):
+        chunk.append(obj)
+        if len(chunk) == chunk_size:
+            index_objects(kind, chunk)
+            count += len(chunk)
+            chunk = []
+    index_objects(kind, chunk)
+    return count + len(chunk)
+
+
+def match_expression(query):
+    """
+    FTS5 query matching objects containing every word of query as a
+    prefix, or None when query has no words
+    """
+    terms = [term.replace('"', '') for term in query.split() if WORD_RE.search(term)]
+    if not terms:
+        return None
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def _contains_filter(kind, query):
+    """icontains over the searched fields, for databases without the index"""
+    _, identifier, title, body = SEARCH_SOURCES[kind]
+    condition = Q()
+    for path in (identifier, title, *body):
+        condition |= Q(**{f'{path}__icontains': query})
+    return condition
+
+
+def looks_like_identifier(query):
+    return bool(IDENTIFIER_RE.search(query))
+
+
+def filter_queryset(queryset, kind, query):
+    """
+    Objects in queryset matching a search query: by the index, plus
+    icontains for identifier-like queries or when the index finds nothing
+    """
+    expression = match_expression(query)
+    if not is_available() or expression is None:
+        return queryset.filter(_contains_filter(kind, query))
+    
+    table = table_name(kind)
+    matches = Q(pk__in=RawSQL(f'SELECT rowid FROM {table} WHERE {table} MATCH %s', [expression]))
+    if looks_like_identifier(query) or not queryset.filter(matches).exists():
+        matches |= _contains_filter(kind, query)
+    return queryset.filter(matches)
+
+
+def _contains_hits(kinds, query, limit):
+    hits = []
+    for kind in kinds:
+        pks = get_model(kind).objects.filter(_contains_filter(kind, query)).values_list('pk', flat=True)[:limit]
+        hits.extend((0, kind, pk) for pk in pks)
+    return hits
+
+
+def search(query, kinds=None, limit=SEARCH_LIMIT):
+    """
+    Best matches for query across kinds as [(kind, object)], best first.
+    Identifier-like queries, or ones the index finds nothing for, also get
+    icontains matches, after the ranked ones.
+    """
+    kinds = kinds or list(SEARCH_SOURCES)
+    expression = match_expression(query)
+    
+    hits = []
+    if is_available() and expression is not None:
+        weights = ', '.join(str(weight) for weight in COLUMN_WEIGHTS)
+        with connection.cursor() as cursor:
+            for kind in kinds:
+                table = table_name(kind)
+                # bm25 scores are negative, better matches lower
+                cursor.execute(
+                    f'SELECT rowid, bm25({table}, {weights}) AS score FROM {table} '
+                    f'WHERE {table} MATCH %s ORDER BY score LIMIT %s',
+                    [expression, limit]
+                )
+                hits.extend((score, kind, pk) for pk, score in cursor.fetchall())
+        hits.sort()
+        hits = hits[:limit]
+        
+        if len(hits) < limit and (looks_like_identifier(query) or not hits):
+            found = {(kind, pk) for _, kind, pk in hits}
+            hits.extend(
+                hit for hit in _contains_hits(kinds, query, limit)
+                if (hit[1], hit[2]) not in found
+            )
+    else:
+        hits = _contains_hits(kinds, query, limit)
+    hits = hits[:limit]
+    
+    # Load the objects, one query per kind
+    objects = {}
+    for kind in kinds:
+        pks = [pk for _, hit_kind, pk in hits if hit_kind == kind]
+        if pks:
+            objects[kind] = get_model(kind).objects.select_related(*_related_fields(kind)).in_bulk(pks)
+    return [(kind, objects[kind][pk]) for _, kind, pk in hits if pk in objects.get(kind, {})]
@@ -0,0 +1,657 @@
+import random
+from collections import Counter, defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from . import lookup_cache, search_index, typeahead
+from .dashboard_stats import invalidate_dashboard_stats
+from .models import (
+    IdSequence, MaterialCategory, MaterialType, Material, MaterialEntry,
+    MaterialTransaction, StockMovement, MachineType, Machine, MachineUsage,
+    MachineSession, MachineDailyUsage, MachineMaintenance, Operator, Client,
+    ContactPerson, ClientHistory, Communication, Job, JobStatus, JobMilestone,
+    JobMaterial, JobMachine, JobLabor, JobFinancial, JobActivityLog,
+)
+from .models.id_sequence import highest_number
+
+# Synthetic workshop data for load testing: clients, jobs, materials with
+# their purchases and usage, machines with years of sessions, labor,
+# maintenance and activity logs. Rows are built in memory from a seeded
+# random generator and written with bulk_create, so no per-row saves run;
+# the derived data those saves would keep up to date (the stock ledger,
+# machine sessions and daily usage, job financial summaries) is calculated
+# here with the same model methods instead.
+
+# Rows created per unit of scale (everything else follows from these)
+BASE_COUNTS = {
+    'operators': 8,
+    'clients': 60,
+    'materials': 250,
+    'machines': 12,
+    'jobs': 600,
+}
+
+CENT = Decimal('0.01')
+
+FIRST_NAMES = [
+    'Anna', 'Luca', 'Sofia', 'Noah', 'Mia', 'Elias', 'Lea', 'Jonas', 'Laura', 'David',
+    'Nina', 'Marco', 'Sara', 'Tim', 'Julia', 'Felix', 'Lena', 'Simon', 'Chiara', 'Nico',
+]
+LAST_NAMES = [
+    'Meier', 'Keller', 'Weber', 'Huber', 'Schmid', 'Frei', 'Baumann', 'Moser', 'Graf', 'Brunner',
+    'Fischer', 'Roth', 'Steiner', 'Gerber', 'Vogel', 'Bianchi', 'Rossi', 'Favre', 'Bernasconi', 'Widmer',
+]
+COMPANY_WORDS = [
+    'Alpine', 'Nordwind', 'Precision', 'Helvetic', 'Lakeside', 'Summit', 'Orbit', 'Granite',
+    'Vector', 'Aurora', 'Riverbend', 'Pioneer', 'Quantum', 'Cedar', 'Meridian', 'Atlas',
+]
+COMPANY_SUFFIXES = ['AG', 'GmbH', 'Labs', 'Design', 'Engineering', 'Studio', 'Robotics', 'Systems']
+INDUSTRIES = ['Architecture', 'Medical devices', 'Robotics', 'Education', 'Retail displays', 'Automotive', 'Film & stage', 'Consumer products']
+CITIES = ['Zurich', 'Basel', 'Bern', 'Lausanne', 'Geneva', 'Lucerne', 'Winterthur', 'St. Gallen', 'Lugano']
+PROJECT_ADJECTIVES = ['Prototype', 'Custom', 'Replacement', 'Display', 'Mounting', 'Test', 'Exhibition', 'Small-batch']
+PROJECT_NOUNS = ['bracket', 'enclosure', 'gear set', 'signage', 'fixture', 'housing', 'model', 'jig', 'panel', 'stand']
+COLORS = ['Black', 'White', 'Grey', 'Red', 'Blue', 'Orange', 'Natural', 'Clear', 'Green', 'Yellow']
+SUPPLIERS = ['Prusa Research', 'Filamentworld', 'Opitec', 'Modulor', 'Dold Holz', 'Metallwaren Huber', 'Formlabs']
+
+# Category, type and unit, and the range of the unit price
+MATERIAL_KINDS = [
+    ('PRT', '3D Printing', 'PLA', 'PLA Filament', 'kg', (18, 35)),
+    ('PRT', '3D Printing', 'PETG', 'PETG Filament', 'kg', (20, 40)),
+    ('PRT', '3D Printing', 'RES', 'Resin', 'l', (40, 90)),
+    ('LSR', 'Laser Cutting', 'PLY', 'Plywood Sheet', 'sheet', (4, 15)),
+    ('LSR', 'Laser Cutting', 'ACR', 'Acrylic Sheet', 'sheet', (8, 30)),
+    ('CNC', 'CNC Machining', 'ALU', 'Aluminium Stock', 'kg', (6, 14)),
+    ('CNC', 'CNC Machining', 'MDF', 'MDF Board', 'sheet', (5, 12)),
+]
+
+# Stock bought per purchase and used per consumption, by unit
+PURCHASE_QUANTITY = {'kg': (5, 20), 'l': (2, 10), 'sheet': (10, 50)}
+USAGE_QUANTITY = {'kg': (0.1, 2.0), 'l': (0.1, 1.0), 'sheet': (1, 5)}
+
+# Type code, name, hourly rate range and models
+MACHINE_KINDS = [
+    ('FDM', 'FDM 3D Printer', (8, 15), ['Prusa MK4', 'Bambu Lab X1C', 'Ultimaker S5']),
+    ('SLA', 'Resin Printer', (12, 20), ['Formlabs Form 3', 'Elegoo Saturn 3']),
+    ('LSR', 'Laser Cutter', (30, 60), ['Trotec Speedy 400', 'Epilog Fusion Pro']),
+    ('CNC', 'CNC Router', (40, 80), ['Shapeoko 5 Pro', 'ShopBot PRSalpha']),
+]
+
+# Status, colour and whether jobs in it are finished
+JOB_STATUSES = [
+    ('Active', '#17a2b8', False),
+    ('In Progress', '#007bff', False),
+    ('On Hold', '#ffc107', False),
+    ('Completed', '#28a745', True),
+]
+
+# Working hours in which machine sessions are booked
+WORKDAY_START = 8 * 60
+WORKDAY_END = 19 * 60
+
+
+def money(value):
+    return Decimal(str(value)).quantize(CENT)
+
+
+class WorkshopSeeder:
+    """
+    Builds a synthetic dataset of about 110,000 rows per unit of scale and
+    two years of history (about a million rows at scale 9). The same seed,
+    scale, years and end date always give the same data.
+    """
+    
+    def __init__(self, seed=0, scale=1, years=2, until=None, batch_size=2000, log=None):
+        self.rng = random.Random(seed)
+        self.counts = {name: max(1, round(count * scale)) for name, count in BASE_COUNTS.items()}
+        self.until = until or timezone.localdate()
+        self.start = self.until - timedelta(days=round(365 * years))
+        self.batch_size = batch_size
+        self.log = log or (lambda message: None)
+        self.created = Counter()
+    
+    def run(self):
+        """Create everything, returning the number of rows created per model"""
+        with transaction.atomic():
+            self.create_catalogue()
+            self.create_operators()
+            self.create_clients()
+            self.create_machines()
+            self.create_materials()
+            self.create_jobs()
+            self.create_stock_ledger()
+            self.create_machine_time()
+            self.create_labor_and_activity()
+            self.create_maintenance()
+            self.create_summaries()
+        self.refresh_derived_data()
+        return self.created
+    
+    def bulk_create(self, model, objects):
+        model.objects.bulk_create(objects, batch_size=self.batch_size)
+        self.created[model.__name__] += len(objects)
+        return objects
+    
+    # Dates and times
+    
+    def moment(self, day, minutes=0):
+        """Aware datetime minutes after midnight on day"""
+        return timezone.make_aware(datetime.combine(day, time()) + timedelta(minutes=minutes))
+    
+    def random_day(self, first=None, last=None):
+        first = first or self.start
+        last = last or self.until - timedelta(days=1)
+        return first + timedelta(days=self.rng.randrange(max((last - first).days, 0) + 1))
+    
+    def random_moment(self, first=None, last=None):
+        return self.moment(self.random_day(first, last), self.rng.randrange(WORKDAY_START, WORKDAY_END))
+    
+    def working_days(self, first, last):
+        day = first
+        while day <= last:
+            if day.weekday() < 5:
+                yield day
+            day += timedelta(days=1)
+    
+    def person_name(self):
+        return f"{self.rng.choice(FIRST_NAMES)} {self.rng.choice(LAST_NAMES)}"
+    
+    # Reference data
+    
+    def create_catalogue(self):
+        self.material_types = []
+        for category_code, category_name, type_code, type_name, unit, prices in MATERIAL_KINDS:
+            category, _ = MaterialCategory.objects.get_or_create(code=category_code, defaults={'name': category_name})
+            material_type, _ = MaterialType.objects.get_or_create(
+                category=category, code=type_code, defaults={'name': type_name}
+            )
+            material_type.category = category
+            self.material_types.append((material_type, unit, prices))
+        
+        self.machine_types = []
+        for code, name, rates, models in MACHINE_KINDS:
+            machine_type, _ = MachineType.objects.get_or_create(code=code, defaults={'name': name})
+            self.machine_types.append((machine_type, rates, models))
+        
+        self.statuses = {}
+        for order, (name, color, finished) in enumerate(JOB_STATUSES):
+            status, _ = JobStatus.objects.get_or_create(name=name, defaults={'color_code': color, 'order': order})
+            self.statuses[name] = status
+    
+    def create_operators(self):
+        taken = set(User.objects.values_list('username', flat=True))
+        users = []
+        for _ in range(self.counts['operators']):
+            first, last = self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+            username = base = f"{first}.{last}".lower()
+            number = 1
+            while username in taken:
+                number += 1
+                username = f"{base}{number}"
+            taken.add(username)
+            
+            user = User(username=username, first_name=first, last_name=last, email=f"{username}@workshop.example")
+            user.set_unusable_password()
+            users.append(user)
+        self.users = self.bulk_create(User, users)
+        
+        prefix = 'HUM-'
+        first = IdSequence.allocate(prefix, len(users), seed=lambda: highest_number(Operator.objects, 'operator_id', prefix))
+        self.operators = self.bulk_create(Operator, [
+            Operator(
+                operator_id=f"{prefix}{number:03d}",
+                user=user,
+                skill_level=self.rng.choice(['beginner', 'intermediate', 'intermediate', 'expert']),
+                hourly_rate=money(self.rng.randint(35, 85)),
+            )
+            for number, user in enumerate(users, first)
+        ])
+    
+    def create_clients(self):
+        clients = []
+        for _ in range(self.counts['clients']):
+            company = self.rng.random() < 0.8
+            name = (
+                f"{self.rng.choice(COMPANY_WORDS)} {self.rng.choice(COMPANY_SUFFIXES)}" if company
+                else self.person_name()
+            )
+            slug = name.lower().replace(' ', '').replace('.', '')
+            clients.append(Client(
+                name=name,
+                type='company' if company else 'individual',
+                industry=self.rng.choice(INDUSTRIES) if company else '',
+                city=self.rng.choice(CITIES),
+                country='Switzerland',
+                primary_email=f"info@{slug}.example",
+                phone_number=f"+41 44 {self.rng.randrange(100, 1000)} {self.rng.randrange(10, 100)} {self.rng.randrange(10, 100)}",
+                status='active' if self.rng.random() < 0.9 else 'inactive',
+                created_date=self.random_moment(last=self.start + (self.until - self.start) / 2),
+            ))
+        IdSequence.assign_ids(clients, 'client_id')
+        self.clients = self.bulk_create(Client, clients)
+        self.histories = self.bulk_create(ClientHistory, [ClientHistory(client=client) for client in clients])
+        
+        contacts = []
+        for client in clients:
+            for number in range(self.rng.randint(1, 3)):
+                name = self.person_name()
+                contacts.append(ContactPerson(
+                    client=client,
+                    name=name,
+                    position=self.rng.choice(['Owner', 'Project Manager', 'Engineer', 'Designer', 'Purchasing']),
+                    primary_contact=number == 0,
+                    direct_email=f"{name.lower().replace(' ', '.')}@example.com",
+                ))
+        self.bulk_create(ContactPerson, contacts)
+        self.contacts = defaultdict(list)
+        for contact in contacts:
+            self.contacts[contact.client_id].append(contact)
+    
+    def create_machines(self):
+        by_type = defaultdict(list)
+        for _ in range(self.counts['machines']):
+            machine_type, rates, models = self.rng.choice(self.machine_types)
+            hourly_rate = money(self.rng.randint(*rates))
+            by_type[machine_type].append(Machine(
+                name=self.rng.choice(models),
+                machine_type=machine_type,
+                manufacturer=self.rng.choice(models).split()[0],
+                serial_number=f"{machine_type.code}{self.rng.randrange(10 ** 7):07d}",
+                location_in_workshop=f"Bay {self.rng.randint(1, 6)}",
+                purchase_date=self.start - timedelta(days=self.rng.randrange(30, 700)),
+                hourly_rate=hourly_rate,
+                setup_rate=money(hourly_rate * Decimal('0.5')) if self.rng.random() < 0.5 else None,
+                cleanup_rate=money(hourly_rate * Decimal('0.5')) if self.rng.random() < 0.3 else None,
+                status=self.rng.choice(['active'] * 8 + ['maintenance']),
+            ))
+        
+        self.machines = []
+        for machine_type, machines in by_type.items():
+            prefix = f"{machine_type.code}-"
+            first = IdSequence.allocate(prefix, len(machines), seed=lambda: highest_number(Machine.objects, 'machine_id', prefix))
+            for number, machine in enumerate(machines, first):
+                machine.machine_id = f"{prefix}{number:03d}"
+            self.machines.extend(machines)
+        self.bulk_create(Machine, self.machines)
+    
+    def create_materials(self):
+        materials = []
+        for _ in range(self.counts['materials']):
+            material_type, unit, prices = self.rng.choice(self.material_types)
+            supplier = self.rng.choice(SUPPLIERS)
+            color = self.rng.choice(COLORS)
+            material = Material(
+                name=f"{material_type.name} {color}",
+                material_type=material_type,
+                color=color,
+                unit_of_measurement=unit,
+                supplier_name=supplier,
+                supplier_sku=f"{supplier[:3].upper()}-{self.rng.randrange(10 ** 6):06d}",
+                current_stock=0,
+                minimum_stock_level=money(PURCHASE_QUANTITY[unit][0]),
+                location_in_workshop=f"Shelf {self.rng.choice('ABCDEF')}{self.rng.randint(1, 9)}",
+                created_by=self.rng.choice(self.users),
+                created_at=self.random_moment(last=self.start + timedelta(days=30)),
+            )
+            # Unit price the purchases vary around
+            material.base_price = self.rng.uniform(*prices)
+            materials.append(material)
+        IdSequence.assign_ids(materials, 'material_id')
+        self.materials = self.bulk_create(Material, materials)
+    
+    def create_jobs(self):
+        moments = sorted(self.random_moment() for _ in range(self.counts['jobs']))
+        jobs = []
+        for created in moments:
+            duration = timedelta(days=self.rng.randint(3, 45))
+            finished = created + duration < self.moment(self.until)
+            if finished:
+                status = self.statuses['Completed'] if self.rng.random() < 0.9 else self.statuses['On Hold']
+            else:
+                status = self.statuses[self.rng.choice(['Active', 'In Progress', 'In Progress'])]
+            
+            client = self.rng.choice(self.clients) if self.rng.random() < 0.85 else None
+            job = Job(
+                project_name=f"{self.rng.choice(PROJECT_ADJECTIVES)} {self.rng.choice(PROJECT_NOUNS)}",
+                client=client,
+                contact_person=self.rng.choice(self.contacts[client.pk]) if client else None,
+                description=f"Synthetic job for load testing ({self.rng.choice(INDUSTRIES).lower()})",
+                created_date=created,
+                created_by=self.rng.choice(self.users),
+                status=status,
+                percent_complete=100 if status.name == 'Completed' else self.rng.randrange(0, 100, 5),
+                priority=self.rng.choice(['low', 'normal', 'normal', 'normal', 'high', 'urgent']),
+                start_date=created.date(),
+                deadline=(created + duration).date(),
+                end_date=(created + duration).date() if status.name == 'Completed' else None,
+            )
+            # Window the job's materials, machine time and labor fall in
+            job.window = (created, min(created + duration, self.moment(self.until) - timedelta(minutes=1)))
+            jobs.append(job)
+        IdSequence.assign_ids(jobs, 'job_id')
+        self.jobs = self.bulk_create(Job, jobs)
+        
+        milestones = []
+        for job in jobs:
+            first, last = job.window
+            for order in range(self.rng.randint(0, 4)):
+                due = first + (last - first) * (order + 1) / 4
+                completed = job.status.name == 'Completed' or due < self.moment(self.until) - timedelta(days=7)
+                milestones.append(JobMilestone(
+                    job=job,
+                    name=['Design', 'Prototype', 'Production', 'Delivery'][order],
+                    due_date=due.date(),
+                    completed=completed,
+                    completed_date=due.date() if completed else None,
+                    order=order,
+                ))
+        self.bulk_create(JobMilestone, milestones)
+        
+        # Jobs running on each day, for machine sessions to be booked against
+        self.jobs_by_day = defaultdict(list)
+        for job in jobs:
+            first, last = job.window
+            day = first.date()
+            while day <= last.date():
+                self.jobs_by_day[day].append(job)
+                day += timedelta(days=1)
+        
+        self.job_costs = defaultdict(lambda: {'material_cost': Decimal(0), 'machine_cost': Decimal(0), 'labor_cost': Decimal(0)})
+    
+    # Materials: purchases, consumption and job usage through the stock ledger
+    
+    def create_stock_ledger(self):
+        # Job usage is planned per job, then booked in each material's history
+        usage = defaultdict(list)
+        for job in self.jobs:
+            first, last = job.window
+            for _ in range(self.rng.randint(0, 10)):
+                material = self.rng.choice(self.materials)
+                used_at = max(first + (last - first) * self.rng.random(), material.created_at + timedelta(days=1))
+                if used_at < self.moment(self.until):
+                    usage[material.pk].append((used_at, job))
+        
+        chunk = 200
+        for start in range(0, len(self.materials), chunk):
+            self._create_ledger_chunk(self.materials[start:start + chunk], usage)
+        self.log(f"Stock ledger for {len(self.materials)} materials")
+    
+    def _usage_quantity(self, unit):
+        low, high = USAGE_QUANTITY[unit]
+        if unit == 'sheet':
+            return Decimal(self.rng.randint(low, high))
+        return money(self.rng.uniform(low, high))
+    
+    def _create_ledger_chunk(self, materials, usage):
+        entries, material_transactions, job_materials, movements = [], [], [], []
+        
+        for material in materials:
+            unit = material.unit_of_measurement
+            events = [(used_at, 'job_usage', job) for used_at, job in usage[material.pk]]
+            
+            # Walk-in consumption and the odd return, a few a month
+            moment = material.created_at
+            while True:
+                moment += timedelta(days=self.rng.expovariate(1 / 6))
+                if moment >= self.moment(self.until):
+                    break
+                events.append((moment, 'return' if self.rng.random() < 0.05 else 'consumption', None))
+            events.sort(key=lambda event: event[0])
+            
+            balance, average_cost = Decimal(0), None
+            
+            def purchase(moment):
+                nonlocal balance, average_cost
+                quantity = Decimal(self.rng.randint(*PURCHASE_QUANTITY[unit]))
+                unit_cost = money(material.base_price * self.rng.uniform(0.9, 1.1))
+                entry = MaterialEntry(
+                    material=material, quantity=quantity, price_per_unit=unit_cost,
+                    purchase_date=moment.date(), supplier_name=material.supplier_name,
+                )
+                entries.append(entry)
+                balance, average_cost = StockMovement.next_totals(balance, average_cost, quantity, unit_cost)
+                movements.append((entry, dict(
+                    material=material, movement_type='purchase', quantity=quantity, unit_cost=unit_cost,
+                    balance_after=balance, average_cost_after=average_cost, created_at=moment,
+                )))
+            
+            purchase(material.created_at)
+            for moment, kind, job in events:
+                quantity = self._usage_quantity(unit)
+                if kind != 'return' and quantity > balance:
+                    # Restock just before running out
+                    purchase(moment - timedelta(minutes=30))
+                
+                operator = self.rng.choice(self.users)
+                if kind == 'job_usage':
+                    source = JobMaterial(
+                        job=job, material=material, quantity=quantity, unit_price=average_cost,
+                        date_used=moment, added_by=operator.get_full_name(),
+                        result=self.rng.choice(['success'] * 17 + ['scrap', 'failed', 'returned']),
+                    )
+                    job_materials.append(source)
+                    self.job_costs[job.pk]['material_cost'] += source.get_rollup_cost()
+                    details = {'job_material': source, 'reference': job.job_id}
+                    quantity = -quantity
+                else:
+                    source = MaterialTransaction(
+                        material=material, quantity=quantity, transaction_type=kind, transaction_date=moment,
+                        operator_name=operator.get_full_name(),
+                    )
+                    material_transactions.append(source)
+                    details = {'material_transaction': source}
+                    if kind == 'consumption':
+                        quantity = -quantity
+                
+                balance, average_cost = StockMovement.next_totals(balance, average_cost, quantity)
+                movements.append((None, dict(
+                    material=material, movement_type=kind, quantity=quantity,
+                    balance_after=balance, average_cost_after=average_cost, created_at=moment,
+                    operator_name=operator.get_full_name(), **details,
+                )))
+            
+            material.current_stock = balance
+            material.price_per_unit = average_cost
+            material.purchase_date = entries[-1].purchase_date
+        
+        self.bulk_create(MaterialEntry, entries)
+        self.bulk_create(MaterialTransaction, material_transactions)
+        self.bulk_create(JobMaterial, job_materials)
+        
+        ledger = []
+        for entry, values in movements:
+            if entry is not None:
+                values.update(entry=entry, reference=f"Entry {entry.pk}")
+            ledger.append(StockMovement(**values))
+        self.bulk_create(StockMovement, ledger)
+        Material.objects.bulk_update(materials, ['current_stock', 'price_per_unit', 'purchase_date'], batch_size=self.batch_size)
+    
+    # Machines: sessions entered as usage records or against jobs
+    
+    def create_machine_time(self):
+        daily_usage = {}
+        for machine in self.machines:
+            usages, job_machines = [], []
+            first_day = max(self.start, machine.purchase_date)
+            for day in self.working_days(first_day, self.until - timedelta(days=1)):
+                minute = WORKDAY_START + self.rng.randrange(60)
+                for _ in range(self.rng.choice([0, 1, 1, 2, 2, 3, 3, 4, 5])):
+                    setup = self.rng.choice([0, 0, 5, 10, 15, 20])
+                    duration = self.rng.randint(15, 300)
+                    cleanup = self.rng.choice([0, 0, 5, 10, 15])
+                    start = minute + setup
+                    if start + duration > WORKDAY_END:
+                        break
+                    
+                    operator = self.rng.choice(self.users).get_full_name()
+                    running_jobs = self.jobs_by_day.get(day)
+                    values = dict(
+                        machine=machine, start_time=self.moment(day, start),
+                        end_time=self.moment(day, start + duration),
+                        setup_time=setup, cleanup_time=cleanup, operator_name=operator,
+                    )
+                    if running_jobs and self.rng.random() < 0.6:
+                        source = JobMachine(job=self.rng.choice(running_jobs), is_active=False, **values)
+                        job_machines.append(source)
+                    else:
+                        job = self.rng.choice(running_jobs) if running_jobs and self.rng.random() < 0.5 else None
+                        source = MachineUsage(job_reference=job.job_id if job else '', **values)
+                        usages.append(source)
+                    source.calculate_costs()
+                    minute = start + duration + cleanup + self.rng.randint(10, 90)
+            
+            self.bulk_create(MachineUsage, usages)
+            self.bulk_create(JobMachine, job_machines)
+            
+            sessions = []
+            for source in usages + job_machines:
+                session = MachineSession(**{source.session_link: source}, **source.get_session_values())
+                sessions.append(session)
+                
+                machine_id, date, totals = session.get_daily_usage()
+                day = daily_usage.setdefault((machine_id, date), Counter())
+                day.update(totals)
+            self.bulk_create(MachineSession, sessions)
+            
+            for job_machine in job_machines:
+                self.job_costs[job_machine.job_id]['machine_cost'] += job_machine.get_rollup_cost()
+        
+        self.bulk_create(MachineDailyUsage, [
+            MachineDailyUsage(machine_id=machine_id, date=date, **totals)
+            for (machine_id, date), totals in daily_usage.items()
+        ])
+        self.log(f"Machine time for {len(self.machines)} machines")
+    
+    # People: labor, job activity and client communication
+    
+    def create_labor_and_activity(self):
+        rates = {operator.user_id: operator.hourly_rate for operator in self.operators}
+        labor, activity = [], []
+        for job in self.jobs:
+            first, last = job.window
+            for _ in range(self.rng.randint(1, 8)):
+                user = self.rng.choice(self.users)
+                entry = JobLabor(
+                    job=job, operator=user,
+                    labor_type=self.rng.choice(['design', 'production', 'production', 'assembly', 'quality_control', 'packaging']),
+                    hourly_rate=rates[user.pk],
+                    date=(first + (last - first) * self.rng.random()).date(),
+                    hours=money(self.rng.choice([0.5, 1, 1.5, 2, 3, 4, 6, 8])),
+                    description='Synthetic labor entry',
+                )
+                labor.append(entry)
+                self.job_costs[job.pk]['labor_cost'] += entry.get_rollup_cost()
+            
+            creator = job.created_by
+            activity.append(JobActivityLog(
+                user=creator, job=job, timestamp=first, activity_type='activation',
+                description=f"Job activated by {creator.get_full_name()}",
+            ))
+            for _ in range(self.rng.randint(1, 8)):
+                user = self.rng.choice(self.users)
+                activity_type = self.rng.choice(['activation', 'deactivation', 'material_usage', 'machine_usage', 'other'])
+                activity.append(JobActivityLog(
+                    user=user, job=job, timestamp=first + (last - first) * self.rng.random(),
+                    activity_type=activity_type,
+                    description=f"{dict(JobActivityLog.ACTIVITY_TYPES)[activity_type]} by {user.get_full_name()}",
+                ))
+            if job.status.name == 'Completed':
+                activity.append(JobActivityLog(
+                    user=creator, job=job, timestamp=last, activity_type='status_change',
+                    description="Status changed to Completed",
+                ))
+        self.bulk_create(JobLabor, labor)
+        self.bulk_create(JobActivityLog, activity)
+        
+        communications = []
+        for client, history in zip(self.clients, self.histories):
+            contacts = self.contacts[client.pk]
+            for _ in range(self.rng.randint(0, 12)):
+                communications.append(Communication(
+                    client_history=history,
+                    date=self.random_moment(first=client.created_date.date()),
+                    comm_type=self.rng.choice(['email', 'email', 'phone', 'meeting', 'other']),
+                    contact_person=self.rng.choice(contacts),
+                    staff_member=self.rng.choice(self.users),
+                    summary=self.rng.choice(['Quote requested', 'Design review', 'Delivery scheduled', 'Invoice question', 'New project enquiry']),
+                    follow_up_required=self.rng.random() < 0.2,
+                ))
+        self.bulk_create(Communication, communications)
+    
+    def create_maintenance(self):
+        records = []
+        for machine in self.machines:
+            day = max(self.start, machine.purchase_date)
+            while True:
+                day += timedelta(days=self.rng.randint(30, 120))
+                if day >= self.until:
+                    break
+                external = self.rng.random() < 0.3
+                labor_cost = money(self.rng.uniform(40, 400))
+                parts_cost = money(self.rng.uniform(0, 300)) if self.rng.random() < 0.5 else None
+                records.append(MachineMaintenance(
+                    machine=machine,
+                    maintenance_date=day,
+                    maintenance_type=self.rng.choice(['preventive', 'preventive', 'inspection', 'calibration', 'corrective']),
+                    performed_by=f"{machine.manufacturer} Service" if external else self.rng.choice(self.users).get_full_name(),
+                    is_external_provider=external,
+                    tasks_performed=self.rng.choice(['Cleaned and lubricated axes', 'Replaced nozzle', 'Aligned laser optics', 'Calibrated bed', 'Replaced spindle bearings']),
+                    labor_cost=labor_cost,
+                    parts_cost=parts_cost,
+                    total_cost=labor_cost + (parts_cost or 0),
+                    downtime_hours=money(self.rng.uniform(0.5, 8)),
+                ))
+        self.bulk_create(MachineMaintenance, records)
+    
+    # Summaries kept up to date by saves in the app
+    
+    def create_summaries(self):
+        financials = []
+        spending = defaultdict(Decimal)
+        completed = defaultdict(list)
+        for job in self.jobs:
+            costs = self.job_costs[job.pk]
+            total = sum(costs.values()).quantize(CENT)
+            costs = {field: value.quantize(CENT) for field, value in costs.items()}
+            quoted = money(total * Decimal(self.rng.uniform(1.1, 1.6))) if self.rng.random() < 0.7 else None
+            finished = job.status.name == 'Completed'
+            billed = (quoted or total) if finished else Decimal(0)
+            financials.append(JobFinancial(
+                job=job, total_cost=total, **costs,
+                quoted_amount=quoted,
+                variance=total - quoted if quoted is not None else None,
+                billing_status=self.rng.choice(['fully_billed', 'paid', 'paid']) if finished else 'not_billed',
+                billed_amount=billed,
+                last_updated=job.window[1],
+            ))
+            if finished and job.client_id:
+                spending[job.client_id] += billed
+                completed[job.client_id].append(job.window[1].date())
+        self.bulk_create(JobFinancial, financials)
+        
+        for history in self.histories:
+            dates = completed[history.client_id]
+            history.projects_completed = len(dates)
+            history.total_spending = spending[history.client_id]
+            history.first_project_date = min(dates, default=None)
+            history.latest_project_date = max(dates, default=None)
+            history.update_stats()
+        ClientHistory.objects.bulk_update(
+            self.histories,
+            ['projects_completed', 'total_spending', 'average_project_value', 'first_project_date', 'latest_project_date'],
+            batch_size=self.batch_size
+        )
+    
+    def refresh_derived_data(self):
+        """Search index and caches, which bulk_create bypasses"""
+        if search_index.is_available():
+            for kind in search_index.SEARCH_SOURCES:
+                with transaction.atomic():
+                    search_index.rebuild(kind)
+        typeahead.reset()
+        lookup_cache.invalidate('material')
+        lookup_cache.invalidate('job')
+        invalidate_dashboard_stats()
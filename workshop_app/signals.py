@@ -0,0 +1,106 @@
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from . import lookup_cache, search_index, typeahead
+from .dashboard_stats import invalidate_dashboard_stats
+from .models import (
+    Material, MaterialType, MaterialAttachment, Machine,
+    Job, JobStatus, Client,
+)
+from .models.contribution import TotalContributor
+
+
+@receiver(post_save, sender=Material)
+@receiver(post_save, sender=Machine)
+@receiver(post_save, sender=Job)
+@receiver(post_save, sender=Client)
+def update_search_index(sender, instance, raw=False, **kwargs):
+    """Re-index an object whenever it's saved"""
+    if raw:
+        return
+    search_index.index_objects(search_index.kind_for_model(sender), [instance])
+
+
+@receiver(post_delete, sender=Material)
+@receiver(post_delete, sender=Machine)
+@receiver(post_delete, sender=Job)
+@receiver(post_delete, sender=Client)
+def remove_from_search_index(sender, instance, **kwargs):
+    search_index.remove_objects(search_index.kind_for_model(sender), [instance.pk])
+
+
+@receiver(post_save, sender=Client)
+def update_client_jobs_search_index(sender, instance, raw=False, created=False, **kwargs):
+    """Jobs are indexed with their client's name"""
+    if raw or created:
+        return
+    search_index.index_objects('job', instance.jobs.select_related('client'))
+
+
+@receiver(post_save, sender=Material)
+@receiver(post_save, sender=Machine)
+@receiver(post_save, sender=Job)
+@receiver(post_delete, sender=Material)
+@receiver(post_delete, sender=Machine)
+@receiver(post_delete, sender=Job)
+def update_typeahead_index(sender, instance, raw=False, **kwargs):
+    """Have every process pick up the saved or deleted row for suggestions"""
+    if raw:
+        return
+    typeahead.record_change(typeahead.kind_for_model(sender), instance.pk)
+
+
+@receiver(post_delete)
+def release_contributions(sender, instance, **kwargs):
+    """
+    A deleted row (directly or by cascade) comes off the totals it fed:
+    job costs, daily machine usage and stored file references
+    """
+    if isinstance(instance, TotalContributor):
+        instance.release_contribution()
+
+
+@receiver(post_delete, sender=Material)
+@receiver(post_delete, sender=Machine)
+def invalidate_dashboard(sender, **kwargs):
+    """Deleted materials and machines come off the dashboard tiles (saves do this themselves)"""
+    invalidate_dashboard_stats()
+
+
+@receiver(post_save, sender=Material)
+@receiver(post_save, sender=MaterialType)
+@receiver(post_save, sender=MaterialAttachment)
+@receiver(post_delete, sender=Material)
+@receiver(post_delete, sender=MaterialType)
+@receiver(post_delete, sender=MaterialAttachment)
+def invalidate_material_lookups(sender, raw=False, **kwargs):
+    """
+    Scanned material details show the type and product image (stock is
+    read fresh, so stock movements leave the cache alone)
+    """
+    if not raw:
+        lookup_cache.invalidate('material')
+
+
+@receiver(post_save, sender=Job)
+@receiver(post_save, sender=JobStatus)
+@receiver(post_save, sender=Client)
+@receiver(post_delete, sender=Job)
+@receiver(post_delete, sender=JobStatus)
+@receiver(post_delete, sender=Client)
+def invalidate_job_lookups(sender, raw=False, **kwargs):
+    """Scanned job details show the status and client name"""
+    if not raw:
+        lookup_cache.invalidate('job')
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """Tune each new SQLite connection for the production database profile"""
+    if connection.vendor != 'sqlite' or settings.DATABASE_PROFILE != 'production':
+        return
+    with connection.cursor() as cursor:
+        for name, value in settings.SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,63 @@
+import hashlib
+import os
+
+from django.core.files.storage import FileSystemStorage
+from django.utils import timezone
+
+# Uploads are stored once per distinct content, under a path derived from
+# their SHA-256; saving a file that is already stored just returns its name.
+# StoredFile rows record each stored file and how many rows reference it.
+
+CAS_DIR = 'cas'
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Media storage that keeps one copy of each distinct file, at
+    cas/<sha[:2]>/<sha>/<first uploaded name>
+    """
+    
+    def get_available_name(self, name, max_length=None):
+        if not name.startswith(f"{CAS_DIR}/"):
+            # Only the file name is kept - _save() picks the path
+            return name
+        return super().get_available_name(name, max_length)
+    
+    def _save(self, name, content):
+        from .models import StoredFile
+        
+        sha256 = hashlib.sha256()
+        for chunk in content.chunks():
+            sha256.update(chunk)
+        digest = sha256.hexdigest()
+        
+        stored = StoredFile.objects.filter(sha256=digest).first()
+        if stored and self.exists(stored.name):
+            # Same contents already stored - nothing to write, but mark it
+            # as just stored so garbage collection leaves it alone until the
+            # row referencing it is saved
+            StoredFile.objects.filter(pk=stored.pk).update(last_stored_at=timezone.now())
+            return stored.name
+        
+        cas_name = f"{CAS_DIR}/{digest[:2]}/{digest}/{os.path.basename(name)}"
+        if not self.exists(cas_name):
+            cas_name = super()._save(cas_name, content)
+        
+        StoredFile.objects.update_or_create(
+            sha256=digest, defaults={'name': cas_name, 'size': content.size, 'last_stored_at': timezone.now()}
+        )
+        return cas_name
+    
+    def delete(self, name):
+        super().delete(name)
+        if name.startswith(f"{CAS_DIR}/"):
+            # Drop the file's digest and prefix directories once empty
+            directory = os.path.dirname(self.path(name))
+            for path in (directory, os.path.dirname(directory)):
+                try:
+                    os.rmdir(path)
+                except OSError:
+                    break
+
+
+content_storage = ContentAddressedStorage()
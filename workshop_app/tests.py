@@ -1,3 +1,671 @@
-from django.test import TestCase
+import os
+import shutil
+import time as time_module
+import tempfile
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db import DatabaseError, connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import benchmarks, lookup_cache, request_metrics, search_index, thumbnails
+from .dashboard_stats import get_dashboard_stats
+from .file_serving import path_response
+
+from .models import (
+    Job, JobFinancial, JobLabor, JobMachine, JobMaterial, Operator, Machine,
+    MachineType, MachineUsage, MachineDailyUsage, MachineSession, Material,
+    MaterialCategory, MaterialType, MaterialEntry, MaterialTransaction,
+    StockMovement, Client, ClientDocument, StoredFile, StaffSettings, RequestSample,
+)
+
+
+class JobLaborRollupTests(TestCase):
+    """Labor entries keep the job's labor cost current"""
+    
+    def setUp(self):
+        self.user = User.objects.create_user('operator')
+        self.job = Job.objects.create(project_name="Rollup test")
+    
+    def test_time_ranged_entry_adds_to_labor_cost(self):
+        # No Operator record, so the default rate applies
+        labor = JobLabor.objects.create(
+            job=self.job, operator=self.user, labor_type='production',
+            date=date(2024, 3, 1), start_time=time(9, 0), end_time=time(10, 30),
+            hours=None, hourly_rate=None
+        )
+        
+        self.assertEqual(labor.hours, Decimal('1.50'))
+        self.assertEqual(labor.hourly_rate, Decimal('50.00'))
+        summary = JobFinancial.objects.get(job=self.job)
+        self.assertEqual(summary.labor_cost, Decimal('75.00'))
+        self.assertEqual(summary.total_cost, Decimal('75.00'))
+    
+    def test_time_ranged_entry_at_operator_rate(self):
+        Operator.objects.create(operator_id='HUM-001', user=self.user, hourly_rate=Decimal('40.00'))
+        labor = JobLabor.objects.create(
+            job=self.job, operator=self.user, labor_type='assembly',
+            date=date(2024, 3, 1), start_time=time(22, 0), end_time=time(0, 20),
+            hours=None, hourly_rate=None
+        )
+        
+        self.assertIsInstance(labor.hours, Decimal)
+        self.assertEqual(labor.hours, Decimal('2.33'))
+        self.assertEqual(JobFinancial.objects.get(job=self.job).labor_cost, Decimal('93.20'))
+        
+        # Editing the entry applies only the difference
+        labor.hours = Decimal('3.00')
+        labor.save()
+        self.assertEqual(JobFinancial.objects.get(job=self.job).labor_cost, Decimal('120.00'))
+
+
+class JobCostRollupTests(TestCase):
+    """Job rows apply only their change in cost to the job's summary"""
+    
+    def setUp(self):
+        category = MaterialCategory.objects.create(code='PRT', name="Printing")
+        material_type = MaterialType.objects.create(category=category, code='PLA', name="PLA")
+        self.material = Material.objects.create(
+            name="Black PLA", material_type=material_type, unit_of_measurement='kg',
+            current_stock=0, price_per_unit=Decimal('20.00')
+        )
+        self.job = Job.objects.create(project_name="Rollup test")
+    
+    def costs(self, job=None):
+        summary = JobFinancial.objects.get(job=job or self.job)
+        return summary.material_cost, summary.total_cost
+    
+    def test_create_update_and_delete(self):
+        usage = JobMaterial.objects.create(job=self.job, material=self.material, quantity=Decimal('2'))
+        JobMaterial.objects.create(job=self.job, material=self.material, quantity=Decimal('1'), unit_price=Decimal('5.00'))
+        self.assertEqual(self.costs(), (Decimal('45.00'), Decimal('45.00')))
+        
+        usage.quantity = Decimal('3')
+        usage.save()
+        self.assertEqual(self.costs(), (Decimal('65.00'), Decimal('65.00')))
+        
+        usage.delete()
+        self.assertEqual(self.costs(), (Decimal('5.00'), Decimal('5.00')))
+        self.assertEqual(JobFinancial.reconcile(), {})
+    
+    def test_moving_a_row_to_another_job(self):
+        other = Job.objects.create(project_name="Other job")
+        other.create_financial_summary()
+        usage = JobMaterial.objects.create(job=self.job, material=self.material, quantity=Decimal('2'))
+        
+        # Loaded without its cost fields, so the saved cost is read back once
+        usage = JobMaterial.objects.only('id', 'job').get(pk=usage.pk)
+        usage.job = other
+        usage.save()
+        self.assertEqual(self.costs(), (Decimal('0.00'), Decimal('0.00')))
+        self.assertEqual(self.costs(other), (Decimal('40.00'), Decimal('40.00')))
+    
+    def test_cascade_and_bulk_deletes(self):
+        JobMaterial.objects.create(job=self.job, material=self.material, quantity=Decimal('2'))
+        JobLabor.objects.create(
+            job=self.job, operator=User.objects.create_user('operator'), labor_type='design',
+            hours=Decimal('1.00'), hourly_rate=Decimal('30.00')
+        )
+        self.assertEqual(JobFinancial.objects.get(job=self.job).total_cost, Decimal('70.00'))
+        
+        # The material's usage rows go with it
+        self.material.delete()
+        self.assertEqual(self.costs(), (Decimal('0.00'), Decimal('30.00')))
+        
+        JobLabor.objects.filter(job=self.job).delete()
+        self.assertEqual(self.costs(), (Decimal('0.00'), Decimal('0.00')))
+        self.assertEqual(JobFinancial.reconcile(), {})
+
+
+class StockLedgerTests(TestCase):
+    """Material stock only changes through the stock ledger"""
+    
+    def setUp(self):
+        category = MaterialCategory.objects.create(code='PRT', name="Printing")
+        self.material_type = MaterialType.objects.create(category=category, code='PLA', name="PLA")
+        self.material = self.add_material("Black PLA")
+    
+    def add_material(self, name):
+        return Material.objects.create(
+            name=name, material_type=self.material_type, unit_of_measurement='kg', current_stock=0
+        )
+    
+    def stock(self, material=None):
+        material = Material.objects.get(pk=(material or self.material).pk)
+        ledger = StockMovement.objects.filter(material=material).order_by('-id').first()
+        # The cached stock always matches the ledger's running balance
+        self.assertEqual(material.current_stock, ledger.balance_after if ledger else 0)
+        return material.current_stock, material.price_per_unit
+    
+    def test_entries_book_purchases_and_corrections(self):
+        entry = MaterialEntry.objects.create(material=self.material, quantity=Decimal('10'), price_per_unit=Decimal('20.00'))
+        MaterialEntry.objects.create(material=self.material, quantity=Decimal('10'), price_per_unit=Decimal('30.00'))
+        self.assertEqual(self.stock(), (Decimal('20.00'), Decimal('25.00')))
+        
+        entry.quantity = Decimal('12')
+        entry.save()
+        self.assertEqual(self.stock()[0], Decimal('22.00'))
+    
+    def test_transaction_edits_book_corrections(self):
+        MaterialEntry.objects.create(material=self.material, quantity=Decimal('10'), price_per_unit=Decimal('20.00'))
+        used = MaterialTransaction.objects.create(material=self.material, quantity=Decimal('3'), transaction_type='consumption')
+        self.assertEqual(self.stock()[0], Decimal('7.00'))
+        
+        used.quantity = Decimal('4')
+        used.save()
+        self.assertEqual(self.stock()[0], Decimal('6.00'))
+        
+        used.transaction_type = 'return'
+        used.save()
+        self.assertEqual(self.stock()[0], Decimal('14.00'))
+        
+        # Moved to another material: off this one, onto the other
+        other = self.add_material("White PLA")
+        used.material = other
+        used.save()
+        self.assertEqual(self.stock()[0], Decimal('10.00'))
+        self.assertEqual(self.stock(other)[0], Decimal('4.00'))
+    
+    def test_editing_a_stale_material_keeps_ledger_stock(self):
+        stale = Material.objects.get(pk=self.material.pk)
+        MaterialEntry.objects.create(material=self.material, quantity=Decimal('5'), price_per_unit=Decimal('8.00'))
+        
+        stale.notes = "Edited while stock came in"
+        stale.save()
+        self.assertEqual(self.stock(), (Decimal('5.00'), Decimal('8.00')))
+        self.assertEqual(Material.objects.get(pk=self.material.pk).notes, "Edited while stock came in")
+    
+    def test_job_material_and_its_movement_are_saved_together(self):
+        MaterialEntry.objects.create(material=self.material, quantity=Decimal('10'), price_per_unit=Decimal('20.00'))
+        job = Job.objects.create(project_name="Ledger test")
+        self.client.force_login(User.objects.create_user('operator'))
+        url = reverse('workshop_app:job_material_add', args=[job.job_id])
+        
+        with mock.patch.object(StockMovement, 'record', side_effect=DatabaseError("ledger unavailable")):
+            with self.assertRaises(DatabaseError):
+                self.client.post(
+                    f"{url}?material_id={self.material.material_id}", {'quantity': '2', 'result': 'success'}
+                )
+        self.assertFalse(JobMaterial.objects.exists())
+        self.assertEqual(self.stock()[0], Decimal('10.00'))
+    
+    def test_job_material_delete_is_undone_with_its_movement(self):
+        MaterialEntry.objects.create(material=self.material, quantity=Decimal('10'), price_per_unit=Decimal('20.00'))
+        job = Job.objects.create(project_name="Ledger test")
+        used = JobMaterial.objects.create(job=job, material=self.material, quantity=Decimal('2'), result='success')
+        used.take_from_inventory()
+        self.client.force_login(User.objects.create_user('operator'))
+        
+        with mock.patch.object(JobMaterial, 'delete', side_effect=DatabaseError("locked")):
+            with self.assertRaises(DatabaseError):
+                self.client.post(reverse('workshop_app:job_material_delete', args=[used.pk]))
+        self.assertTrue(JobMaterial.objects.filter(pk=used.pk).exists())
+        self.assertEqual(self.stock()[0], Decimal('8.00'))
+
+
+class ActiveJobTests(TestCase):
+    """The active job is read fresh for every request"""
+    
+    def test_switch_elsewhere_is_seen_straight_away(self):
+        user = User.objects.create_user('operator')
+        first = Job.objects.create(project_name="First job")
+        second = Job.objects.create(project_name="Second job", created_by=user)
+        StaffSettings.for_user(user, create=True).set_active_job(first)
+        self.assertEqual(StaffSettings.for_user(user).active_job, first)
+        
+        # Switched by another process, which shares only the database
+        StaffSettings.objects.filter(user=user).update(active_job=second)
+        self.assertEqual(StaffSettings.for_user(user).active_job, second)
+        
+        self.client.force_login(user)
+        response = self.client.get(reverse('workshop_app:job_detail', args=[second.job_id]))
+        self.assertTrue(response.context['is_active_job'])
+    
+    def test_saving_a_job_leaves_staff_settings_alone(self):
+        job = Job.objects.create(project_name="Renamed job")
+        job.project_name = "Renamed"
+        with CaptureQueriesContext(connection) as queries:
+            job.save()
+        # No lookup of the users who have the job active
+        self.assertFalse([query for query in queries.captured_queries if 'staffsettings' in query['sql']])
+
+
+class DashboardStatsTests(TestCase):
+    """Cached dashboard tiles are dropped when what they count changes"""
+    
+    def setUp(self):
+        cache.clear()
+    
+    def test_deletes_invalidate_the_tiles(self):
+        category = MaterialCategory.objects.create(code='PRT', name="Printing")
+        material_type = MaterialType.objects.create(category=category, code='PLA', name="PLA")
+        machine_type = MachineType.objects.create(code='FDM', name="FDM printer")
+        with self.captureOnCommitCallbacks(execute=True):
+            material = Material.objects.create(
+                name="Black PLA", material_type=material_type, unit_of_measurement='kg', current_stock=0
+            )
+            machine = Machine.objects.create(machine_id='FDM-001', name="Printer", machine_type=machine_type)
+        
+        stats = get_dashboard_stats()
+        self.assertEqual((stats['materials_count'], stats['machines_count']), (1, 1))
+        
+        with self.captureOnCommitCallbacks(execute=True):
+            material.delete()
+            machine.delete()
+        stats = get_dashboard_stats()
+        self.assertEqual((stats['materials_count'], stats['machines_count']), (0, 0))
+
+
+class LookupCacheTests(TestCase):
+    """Scanner lookups stay cached through stock movements but show current stock"""
+    
+    def setUp(self):
+        cache.clear()
+        lookup_cache.clear_local()
+        category = MaterialCategory.objects.create(code='PRT', name="Printing")
+        material_type = MaterialType.objects.create(category=category, code='PLA', name="PLA")
+        with self.captureOnCommitCallbacks(execute=True):
+            self.material = Material.objects.create(
+                name="Black PLA", material_type=material_type, unit_of_measurement='kg', current_stock=0
+            )
+        self.client.force_login(User.objects.create_user('operator'))
+    
+    def lookup(self):
+        response = self.client.get(reverse('workshop_app:material_lookup'), {'identifier': self.material.material_id})
+        return response.json()
+    
+    def test_stock_movements_keep_the_cache(self):
+        self.assertEqual(self.lookup()['current_stock'], 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            MaterialEntry.objects.create(material=self.material, quantity=Decimal('4'), price_per_unit=Decimal('9.50'))
+        
+        with mock.patch('workshop_app.views.scanner_views.find_materials') as find_materials:
+            data = self.lookup()
+        find_materials.assert_not_called()
+        self.assertEqual((data['current_stock'], data['price_per_unit']), (4.0, '9.50'))
+    
+    def test_local_entries_expire(self):
+        load = mock.Mock(return_value={'code': {'found': True}})
+        lookup_cache.reset_stats()
+        lookup_cache.get_many('test', ['code'], load)
+        lookup_cache.get_many('test', ['code'], load)
+        
+        # Past LOCAL_TIMEOUT the process asks the shared cache again
+        later = time_module.monotonic() + lookup_cache.LOCAL_TIMEOUT + 1
+        with mock.patch('workshop_app.lookup_cache.time.monotonic', return_value=later):
+            lookup_cache.get_many('test', ['code'], load)
+        
+        stats = lookup_cache.get_stats()
+        self.assertEqual(
+            [stats[outcome]['lookups'] for outcome in lookup_cache.OUTCOMES], [1, 1, 1]
+        )
+        self.assertEqual(load.call_count, 1)
+
+
+class FileServingTests(TestCase):
+    """Uploaded files are only displayed inline when they can't run script"""
+    
+    def serve(self, suffix, content, **headers):
+        fd, path = tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(content)
+        self.addCleanup(os.remove, path)
+        response = path_response(RequestFactory().get('/', headers=headers), path)
+        response.close()
+        return response
+    
+    def test_image_is_inline(self):
+        response = self.serve('.png', b'\x89PNG\r\n\x1a\n' + b'\0' * 16)
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertTrue(response['Content-Disposition'].startswith('inline'))
+        self.assertEqual(response['X-Content-Type-Options'], 'nosniff')
+        self.assertEqual(response['Content-Security-Policy'], 'sandbox')
+    
+    def test_html_and_svg_are_downloaded(self):
+        for suffix in ('.html', '.svg'):
+            response = self.serve(suffix, b'<svg onload="alert(1)"></svg>')
+            self.assertEqual(response['Content-Type'], 'application/octet-stream')
+            self.assertTrue(response['Content-Disposition'].startswith('attachment'))
+            self.assertEqual(response['X-Content-Type-Options'], 'nosniff')
+    
+    def test_pdf_is_shown_inline_unsandboxed(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        with override_settings(MEDIA_ROOT=media_root):
+            document = ClientDocument(client=Client.objects.create(name="PDF test"), doc_type='other', title="Quote")
+            document.file.save('quote.pdf', ContentFile(b'%PDF-1.4\n%%EOF\n'), save=False)
+            document.save()
+            self.client.force_login(User.objects.create_user('viewer'))
+            response = self.client.get(reverse('workshop_app:protected_file', args=['client-document', document.pk]))
+            response.close()
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertTrue(response['Content-Disposition'].startswith('inline'))
+        self.assertNotIn('Content-Security-Policy', response)
+    
+    def test_invalid_range_serves_the_whole_file(self):
+        response = self.serve('.png', b'\x89PNG\r\n\x1a\n' + b'\0' * 16, Range='bytes=5-3')
+        self.assertEqual(response.status_code, 200)
+        
+        response = self.serve('.png', b'\x89PNG\r\n\x1a\n' + b'\0' * 16, Range='bytes=100-')
+        self.assertEqual(response.status_code, 416)
+
+
+class QrLabelSheetTests(TestCase):
+    """Label sheets need a filter, are capped in size and stream as they render"""
+    
+    def setUp(self):
+        category = MaterialCategory.objects.create(code='PRT', name="Printing")
+        material_type = MaterialType.objects.create(category=category, code='PLA', name="PLA")
+        for name in ("Black PLA", "White PLA"):
+            Material.objects.create(name=name, material_type=material_type, unit_of_measurement='kg', current_stock=0)
+        self.client.force_login(User.objects.create_user('operator'))
+    
+    def sheet(self, **params):
+        return self.client.get(reverse('workshop_app:qr_label_sheet'), {'kind': 'material', 'format': 'pdf', **params})
+    
+    def test_filter_required(self):
+        self.assertEqual(self.sheet().status_code, 400)
+    
+    def test_pdf_is_streamed(self):
+        response = self.sheet(type='PLA')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content)
+        self.assertTrue(content.startswith(b'%PDF-'))
+        self.assertTrue(content.rstrip().endswith(b'%%EOF'))
+    
+    def test_too_many_labels(self):
+        with mock.patch('workshop_app.qr_labels.MAX_SHEET_LABELS', 1):
+            self.assertEqual(self.sheet(type='PLA').status_code, 400)
+
+
+class ThumbnailTests(TestCase):
+    """Thumbnails render safely from several threads and refuse oversized images"""
+    
+    def setUp(self):
+        from PIL import Image
+        
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.source = os.path.join(media_root, 'photo.png')
+        Image.new('RGB', (64, 48), 'red').save(self.source)
+    
+    def test_concurrent_renders(self):
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            paths = set(pool.map(lambda _: thumbnails.get_thumbnail(self.source, 'small'), range(8)))
+        
+        path, = paths
+        directory = os.path.dirname(path)
+        self.assertEqual(os.listdir(directory), [os.path.basename(path)])
+        self.assertGreater(os.path.getsize(path), 0)
+    
+    def test_decompression_bomb_is_an_os_error(self):
+        with mock.patch('PIL.Image.MAX_IMAGE_PIXELS', 100):
+            with self.assertRaises(OSError):
+                thumbnails.render_thumbnail(self.source, 'small', 'webp')
+
+
+class SearchTests(TestCase):
+    """Search finds IDs from the middle and ranks in the database"""
+    
+    def setUp(self):
+        machine_type = MachineType.objects.create(code='FDM', name="FDM printer")
+        self.machine = Machine.objects.create(
+            machine_id='FDM-001', name="Printer", machine_type=machine_type, serial_number='SN-2023-0042'
+        )
+        self.client.force_login(User.objects.create_user('operator'))
+    
+    def test_part_of_an_identifier(self):
+        self.assertEqual(search_index.search('042'), [('machine', self.machine)])
+        self.assertEqual(list(search_index.filter_queryset(Machine.objects.all(), 'machine', '042')), [self.machine])
+    
+    def test_no_index_match_falls_back(self):
+        self.assertEqual(search_index.search('rinter'), [('machine', self.machine)])
+    
+    def test_results_without_an_id_are_skipped(self):
+        Machine.objects.filter(pk=self.machine.pk).update(machine_id='')
+        response = self.client.get(reverse('workshop_app:global_search'), {'q': 'Printer'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['results'], [])
+    
+    def test_suggestion_limit_is_clamped(self):
+        url = reverse('workshop_app:search_suggestions')
+        for limit, expected in (('-5', 1), ('0', 1), ('1000', 1)):
+            response = self.client.get(url, {'q': 'FDM', 'limit': limit})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(len(response.json()['results']), expected)
+
+
+class RequestMetricsTests(TestCase):
+    """Request timings are only shown to staff and not sampled by default"""
+    
+    def server_timing(self):
+        return self.client.get(reverse('workshop_app:home')).get('Server-Timing')
+    
+    def test_hidden_from_other_users(self):
+        self.assertIsNone(self.server_timing())
+        self.client.force_login(User.objects.create_user('operator'))
+        self.assertIsNone(self.server_timing())
+    
+    def test_shown_to_staff(self):
+        self.client.force_login(User.objects.create_user('manager', is_staff=True))
+        self.assertIn('db;dur=', self.server_timing())
+    
+    @override_settings(DEBUG=True)
+    def test_shown_with_debug(self):
+        self.assertIn('db;dur=', self.server_timing())
+    
+    def test_not_sampled_by_default(self):
+        self.client.force_login(User.objects.create_user('manager', is_staff=True))
+        with mock.patch('workshop_app.middleware.random.random', return_value=0):
+            self.server_timing()
+        self.assertFalse(RequestSample.objects.exists())
+
+
+class BenchmarkTests(TestCase):
+    """Benchmark cases run, and a failing case is always a regression"""
+    
+    def test_job_detail_financials_case(self):
+        category = MaterialCategory.objects.create(code='PRT', name="Printing")
+        material_type = MaterialType.objects.create(category=category, code='PLA', name="PLA")
+        Material.objects.create(name="Black PLA", material_type=material_type, unit_of_measurement='kg', current_stock=0)
+        job = Job.objects.create(project_name="Benchmarked", created_by=User.objects.create_user('owner'))
+        job.create_financial_summary()
+        
+        run = benchmarks.CASES['job_detail_financials'](benchmarks.Subjects())
+        with request_metrics.logging_disabled():
+            run()
+        self.assertTrue(JobFinancial.objects.filter(job=job).exists())
+    
+    def test_failing_case_is_a_regression(self):
+        failed = {'cases': {'page': {'error': "TemplateDoesNotExist: page.html"}}}
+        self.assertEqual(list(benchmarks.compare(failed, failed)), ['page'])
+
+
+class MachineDailyUsageTests(TestCase):
+    """Daily machine usage follows sessions as they're saved and deleted"""
+    
+    def setUp(self):
+        machine_type = MachineType.objects.create(code='FDM', name="FDM printer")
+        self.machine = Machine.objects.create(machine_id='FDM-001', name="Printer", machine_type=machine_type)
+        self.start = timezone.make_aware(datetime(2024, 3, 1, 9, 0))
+    
+    def add_usage(self, minutes, **kwargs):
+        return MachineUsage.objects.create(
+            machine=self.machine, start_time=self.start,
+            end_time=self.start + timedelta(minutes=minutes), **kwargs
+        )
+    
+    def day(self):
+        return MachineDailyUsage.objects.filter(machine=self.machine, date=date(2024, 3, 1)).first()
+    
+    def test_saves_and_deletes_update_the_day(self):
+        first = self.add_usage(60, setup_time=10)
+        self.add_usage(30)
+        self.assertEqual((self.day().sessions, self.day().busy_minutes, self.day().setup_minutes), (2, 90, 10))
+        
+        first.end_time = self.start + timedelta(minutes=120)
+        first.save()
+        self.assertEqual(self.day().busy_minutes, 150)
+        
+        first.delete()
+        self.assertEqual((self.day().sessions, self.day().busy_minutes, self.day().setup_minutes), (1, 30, 0))
+    
+    def test_bulk_delete_updates_the_day(self):
+        self.add_usage(60)
+        self.add_usage(30)
+        MachineUsage.objects.filter(machine=self.machine).delete()
+        self.assertEqual((self.day().sessions, self.day().busy_minutes), (0, 0))
+        self.assertEqual(MachineDailyUsage.reconcile(), {})
+    
+    def test_job_delete_takes_its_machine_time_off(self):
+        self.add_usage(30)
+        job = Job.objects.create(project_name="Cascade test")
+        JobMachine.objects.create(
+            job=job, machine=self.machine, start_time=self.start,
+            end_time=self.start + timedelta(minutes=45), operation_time=45
+        )
+        self.assertEqual((self.day().sessions, self.day().busy_minutes), (2, 75))
+        
+        job.delete()
+        self.assertFalse(MachineSession.objects.filter(source='job').exists())
+        self.assertEqual((self.day().sessions, self.day().busy_minutes), (1, 30))
+        self.assertEqual(MachineDailyUsage.reconcile(), {})
+    
+    def test_edit_never_creates_a_partial_day(self):
+        usage = self.add_usage(60)
+        MachineDailyUsage.objects.all().delete()
+        usage.end_time = self.start + timedelta(minutes=30)
+        usage.save()
+        self.assertIsNone(self.day())
+    
+    def test_migration_backfills_existing_sessions(self):
+        from django.apps import apps
+        from importlib import import_module
+        
+        self.add_usage(60, setup_time=10)
+        self.add_usage(30)
+        MachineDailyUsage.objects.all().delete()
+        
+        migration = import_module('workshop_app.migrations.0020_backfill_machine_daily_usage')
+        migration.backfill_daily_usage(apps, None)
+        self.assertEqual((self.day().sessions, self.day().busy_minutes, self.day().setup_minutes), (2, 90, 10))
+        self.assertEqual(MachineDailyUsage.reconcile(), {})
+    
+    def test_usage_list_includes_job_machine_time(self):
+        self.add_usage(30, job_reference="Walk-in")
+        job = Job.objects.create(project_name="Listed job")
+        JobMachine.objects.create(
+            job=job, machine=self.machine, start_time=self.start + timedelta(hours=1),
+            end_time=self.start + timedelta(hours=2), operation_time=60
+        )
+        
+        self.client.force_login(User.objects.create_user('viewer'))
+        response = self.client.get(reverse('workshop_app:machine_usage_list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['usage_count'], 2)
+        self.assertEqual(response.context['total_machine_time'], 1.5)
+        self.assertContains(response, job.job_id)
+    
+    def test_usage_report_fills_empty_periods(self):
+        self.add_usage(60)
+        self.client.force_login(User.objects.create_user('viewer'))
+        url = reverse('workshop_app:machine_usage_report')
+        
+        response = self.client.get(url, {'period': 'day', 'date_from': '2024-02-01', 'date_to': '2024-03-31'})
+        self.assertEqual(response.context['period'], 'day')
+        rows = response.context['period_rows']
+        self.assertEqual(len(rows), 60)
+        self.assertEqual((rows[0]['period'], rows[0]['hours'], rows[0]['count']), (date(2024, 2, 1), 0, 0))
+        self.assertEqual([row['period'] for row in rows if row['hours']], [date(2024, 3, 1)])
+        
+        # Years of days are grouped by month instead, empty months included
+        response = self.client.get(url, {'period': 'day', 'date_from': '2020-01-01', 'date_to': '2024-12-31'})
+        self.assertEqual(response.context['period'], 'month')
+        rows = response.context['period_rows']
+        self.assertEqual(len(rows), 60)
+        self.assertEqual([row['period'] for row in rows if row['hours']], [date(2024, 3, 1)])
+        self.assertEqual(response.context['overall_stats']['total_hours'], 1)
+    
+    def test_machine_delete_removes_its_days(self):
+        self.add_usage(60)
+        self.machine.delete()
+        self.assertFalse(MachineDailyUsage.objects.exists())
+
+
+class StoredFileReferenceTests(TestCase):
+    """Stored files count the rows referencing them"""
+    
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        media = override_settings(MEDIA_ROOT=media_root)
+        media.enable()
+        self.addCleanup(media.disable)
+        self.client_record = Client.objects.create(name="Reference test")
+    
+    def add_document(self, content, name='document.pdf'):
+        document = ClientDocument(client=self.client_record, doc_type='other', title=name)
+        document.file.save(name, ContentFile(content), save=False)
+        document.save()
+        return document
+    
+    def ref_counts(self):
+        return sorted(StoredFile.objects.values_list('ref_count', flat=True))
+    
+    def test_same_content_is_stored_once(self):
+        first = self.add_document(b'%PDF-1 same')
+        second = self.add_document(b'%PDF-1 same', name='copy.pdf')
+        self.assertEqual(first.file.name, second.file.name)
+        self.assertEqual(self.ref_counts(), [2])
+        
+        second.file.save('other.pdf', ContentFile(b'%PDF-1 other'), save=False)
+        second.save()
+        self.assertEqual(self.ref_counts(), [1, 1])
+        
+        first.delete()
+        self.assertEqual(self.ref_counts(), [0, 1])
+    
+    def test_cascade_delete_releases_references(self):
+        self.add_document(b'%PDF-1 same')
+        self.add_document(b'%PDF-1 same')
+        self.client_record.delete()
+        self.assertEqual(self.ref_counts(), [0])
+        self.assertEqual(StoredFile.collect_garbage(grace_period=timedelta(0)), (0, 1, 11))
+    
+    def test_reused_file_is_not_collected(self):
+        self.add_document(b'%PDF-1 same').delete()
+        StoredFile.objects.update(last_stored_at=timezone.now() - timedelta(days=30))
+        
+        # Stored again, but the referencing row isn't saved yet
+        document = ClientDocument(client=self.client_record, doc_type='other', title='again')
+        document.file.save('again.pdf', ContentFile(b'%PDF-1 same'), save=False)
+        self.assertEqual(StoredFile.collect_garbage(), (0, 0, 0))
+        self.assertTrue(os.path.exists(document.file.path))
+    
+    def test_references_are_checked_again_before_deleting(self):
+        document = self.add_document(b'%PDF-1 same')
+        StoredFile.objects.update(last_stored_at=timezone.now() - timedelta(days=30))
+        
+        # Counted as an orphan, then found referenced when it's about to go
+        count_references = StoredFile.count_references
+        with mock.patch.object(
+            StoredFile, 'count_references', side_effect=lambda name=None: count_references(name) if name else Counter()
+        ):
+            self.assertEqual(StoredFile.collect_garbage(), (0, 0, 0))
+        self.assertTrue(StoredFile.objects.exists())
+        self.assertTrue(os.path.exists(document.file.path))
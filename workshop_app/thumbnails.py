@@ -0,0 +1,118 @@
+import hashlib
+import io
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import transaction
+
+# Scaled-down copies of image attachments, rendered in the background after
+# upload (or on first request if that hasn't finished) into a cache under
+# MEDIA_ROOT named by a hash of the source file and the size and format.
+# PIL is only imported to render.
+
+# Bump when the rendering below changes, so cached files are rendered again
+RENDER_VERSION = 1
+
+CACHE_DIR = 'thumb_cache'
+
+# Longest side in pixels for each size
+THUMBNAIL_SIZES = {
+    'small': 120,
+    'medium': 400,
+    'large': 1200,
+}
+
+FORMATS = {
+    'webp': 'image/webp',
+    'jpeg': 'image/jpeg',
+}
+
+QUALITY = 80
+
+_executor = None
+
+
+def thumbnail_digest(source_path, size, fmt):
+    """Cache key of a thumbnail: changes whenever the source file does"""
+    stat = os.stat(source_path)
+    key = f"{RENDER_VERSION}:{size}:{fmt}:{source_path}:{stat.st_size}:{stat.st_mtime_ns}"
+    return hashlib.sha256(key.encode()).hexdigest()
+
+
+def cache_path(digest, fmt):
+    return os.path.join(settings.MEDIA_ROOT, CACHE_DIR, digest[:2], f"{digest}.{fmt}")
+
+
+def render_thumbnail(source_path, size, fmt):
+    """
+    Thumbnail of an image file as bytes. Raises OSError for anything PIL
+    won't render, including images too big to decode safely.
+    """
+    from PIL import Image, ImageOps
+    
+    try:
+        with Image.open(source_path) as image:
+            # Phone photos are stored sideways with an EXIF rotation
+            image = ImageOps.exif_transpose(image)
+            longest = THUMBNAIL_SIZES[size]
+            image.thumbnail((longest, longest), Image.LANCZOS)
+            image = image.convert('RGBA')
+    except Image.DecompressionBombError as e:
+        # Not an OSError, but callers treat it like any unreadable image
+        raise OSError(str(e)) from e
+    
+    if fmt == 'jpeg':
+        # No transparency in JPEG - flatten onto white
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A'))
+        image = background
+    
+    buffer = io.BytesIO()
+    image.save(buffer, format=fmt.upper(), quality=QUALITY)
+    return buffer.getvalue()
+
+
+def get_thumbnail(source_path, size, fmt='webp'):
+    """Path of the thumbnail of an image file, rendering it on first use"""
+    path = cache_path(thumbnail_digest(source_path, size, fmt), fmt)
+    if not os.path.exists(path):
+        content = render_thumbnail(source_path, size, fmt)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write under a temporary name so readers never see a partial file;
+        # mkstemp gives each thread and process its own
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(content)
+            # mkstemp makes the file private to this user - cached files are public
+            os.chmod(temp_path, 0o644)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+    return path
+
+
+def render_all(source_path):
+    """Render every size and format of an image's thumbnails"""
+    for size in THUMBNAIL_SIZES:
+        for fmt in FORMATS:
+            get_thumbnail(source_path, size, fmt)
+
+
+def queue_thumbnails(source_path):
+    """Render an image's thumbnails in a background thread once the upload commits"""
+    def submit():
+        global _executor
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='thumbnails')
+        _executor.submit(render_all, source_path)
+    
+    transaction.on_commit(submit)
+
+
+def preferred_format(request):
+    """WebP for browsers that accept it, JPEG otherwise"""
+    return 'webp' if 'image/webp' in request.headers.get('Accept', '') else 'jpeg'
@@ -0,0 +1,205 @@
+import random
+import threading
+from bisect import bisect_left, insort
+
+from django.core.cache import cache
+from django.db import transaction
+from django.urls import reverse
+
+# Typeahead suggestions for materials, machines and jobs come from a sorted
+# prefix index held in memory by each process. Saves and deletes are recorded
+# as numbered changes in the shared cache; before answering, a process reloads
+# just the rows changed since its last lookup, and only rebuilds the whole
+# index when it has fallen too far behind.
+
+# What suggestions are found by: model, identifier field, name field and
+# other exact codes (serial numbers, SKUs)
+TYPEAHEAD_SOURCES = {
+    'material': ('Material', 'material_id', 'name', ('serial_number', 'supplier_sku')),
+    'machine': ('Machine', 'machine_id', 'name', ('serial_number',)),
+    'job': ('Job', 'job_id', 'project_name', ()),
+}
+
+# Order suggestions are listed in: identifier matches, then codes, then names
+RANK_IDENTIFIER = 0
+RANK_CODE = 1
+RANK_NAME = 2
+RANKS = (RANK_IDENTIFIER, RANK_CODE, RANK_NAME)
+
+SUGGESTION_LIMIT = 10
+
+GENERATION_KEY = 'workshop_app:typeahead:generation'
+CHANGE_KEY = 'workshop_app:typeahead:change:{}'
+CHANGE_TIMEOUT = 60 * 60
+
+# More changes than this since a process last looked and it rebuilds instead
+MAX_REPLAY = 500
+
+
+def new_generation():
+    """
+    Starting change number, random so that processes can't mistake a
+    restarted count for the one they last saw
+    """
+    return random.randrange(1 << 40)
+
+
+def normalize(text):
+    return ' '.join(str(text).lower().split())
+
+
+def get_model(kind):
+    from . import models
+    return getattr(models, TYPEAHEAD_SOURCES[kind][0])
+
+
+def kind_for_model(model):
+    for kind, source in TYPEAHEAD_SOURCES.items():
+        if source[0] == model.__name__:
+            return kind
+    return None
+
+
+def index_keys(identifier, name, codes):
+    """(rank, key) pairs a row is found by: its IDs and every word onwards of its name"""
+    keys = {(RANK_IDENTIFIER, normalize(identifier))}
+    keys.update((RANK_CODE, normalize(code)) for code in codes if code)
+    words = normalize(name).split()
+    keys.update((RANK_NAME, ' '.join(words[i:])) for i in range(len(words)))
+    return {(rank, key) for rank, key in keys if key}
+
+
+class PrefixIndex:
+    """
+    Sorted (key, pk) pairs per rank and kind, so the rows with a key
+    starting with a prefix are found with one binary search
+    """
+    
+    def __init__(self, generation=0):
+        self.generation = generation
+        self.keys = {(rank, kind): [] for rank in RANKS for kind in TYPEAHEAD_SOURCES}
+        # (kind, pk): (identifier, name, keys)
+        self.entries = {}
+    
+    @classmethod
+    def build(cls, generation=0):
+        index = cls(generation)
+        for kind in TYPEAHEAD_SOURCES:
+            for row in cls.load_rows(kind):
+                index._add(kind, *row, sort=False)
+        for keys in index.keys.values():
+            keys.sort()
+        return index
+    
+    @staticmethod
+    def load_rows(kind, pks=None):
+        """(pk, identifier, name, codes) for every row of a kind, or just some"""
+        _, identifier, name, codes = TYPEAHEAD_SOURCES[kind]
+        rows = get_model(kind).objects.order_by()
+        if pks is not None:
+            rows = rows.filter(pk__in=pks)
+        for row in rows.values_list('pk', identifier, name, *codes).iterator():
+            yield row[0], row[1], row[2], row[3:]
+    
+    def _add(self, kind, pk, identifier, name, codes, sort=True):
+        keys = index_keys(identifier, name, codes)
+        self.entries[(kind, pk)] = (identifier, name, keys)
+        for rank, key in keys:
+            if sort:
+                insort(self.keys[(rank, kind)], (key, pk))
+            else:
+                self.keys[(rank, kind)].append((key, pk))
+    
+    def _remove(self, kind, pk):
+        entry = self.entries.pop((kind, pk), None)
+        if entry is None:
+            return
+        for rank, key in entry[2]:
+            keys = self.keys[(rank, kind)]
+            i = bisect_left(keys, (key, pk))
+            if i < len(keys) and keys[i] == (key, pk):
+                del keys[i]
+    
+    def refresh(self, kind, pks):
+        """Reload some rows of a kind from the database (dropping deleted ones)"""
+        for pk in pks:
+            self._remove(kind, pk)
+        for row in self.load_rows(kind, pks):
+            self._add(kind, *row)
+    
+    def lookup(self, query, kinds=None, limit=SUGGESTION_LIMIT):
+        """[(kind, pk, identifier, name)] for rows with a key starting with query"""
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        
+        found = {}
+        for rank in RANKS:
+            for kind in kinds or TYPEAHEAD_SOURCES:
+                keys = self.keys[(rank, kind)]
+                i = bisect_left(keys, (prefix,))
+                while i < len(keys) and len(found) < limit and keys[i][0].startswith(prefix):
+                    pk = keys[i][1]
+                    if (kind, pk) not in found:
+                        identifier, name, _ = self.entries[(kind, pk)]
+                        found[(kind, pk)] = (kind, pk, identifier, name)
+                    i += 1
+        return list(found.values())
+
+
+_index = None
+_lock = threading.Lock()
+
+
+def get_index():
+    """This process's index, brought up to date with the recorded changes"""
+    global _index
+    
+    generation = cache.get_or_set(GENERATION_KEY, new_generation, None)
+    with _lock:
+        if _index is not None and 0 < generation - _index.generation <= MAX_REPLAY:
+            keys = [CHANGE_KEY.format(n) for n in range(_index.generation + 1, generation + 1)]
+            changes = cache.get_many(keys)
+            if len(changes) == len(keys):
+                changed = {}
+                for kind, pk in changes.values():
+                    changed.setdefault(kind, set()).add(pk)
+                for kind, pks in changed.items():
+                    _index.refresh(kind, pks)
+                _index.generation = generation
+        
+        if _index is None or _index.generation != generation:
+            _index = PrefixIndex.build(generation)
+        return _index
+
+
+def record_change(kind, pk):
+    """Have every process reload this row, once the current transaction commits"""
+    def record():
+        try:
+            generation = cache.incr(GENERATION_KEY)
+        except ValueError:
+            # Nothing recorded yet (or the cache was cleared) - processes rebuild
+            cache.add(GENERATION_KEY, new_generation(), None)
+            return
+        cache.set(CHANGE_KEY.format(generation), (kind, pk), CHANGE_TIMEOUT)
+    
+    transaction.on_commit(record)
+
+
+def reset():
+    """Have every process rebuild its index, after rows were written without saves (bulk loads)"""
+    transaction.on_commit(lambda: cache.set(GENERATION_KEY, new_generation(), None))
+
+
+def suggest(query, kinds=None, limit=SUGGESTION_LIMIT):
+    """Compact suggestions for query: type, ID, name and detail page URL"""
+    return [
+        {
+            'type': kind,
+            'id': identifier,
+            'name': name,
+            'url': reverse(f'workshop_app:{kind}_detail', args=[identifier]),
+        }
+        for kind, pk, identifier, name in get_index().lookup(query, kinds, limit)
+    ]
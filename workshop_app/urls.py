@@ -4,8 +4,8 @@ from .views import (
     material_list, material_detail, 
     material_create, material_update, material_delete,
     material_entry_add, material_attachment_delete,
-    material_attachment_view, material_attachment_download,
-    scanner_view, material_lookup,
+    material_attachment_view, material_attachment_download, material_attachment_thumbnail,
+    scanner_view, material_lookup, material_lookup_batch, lookup_cache_stats,
     machine_list, machine_detail,
     machine_create, machine_update, machine_delete,
     machine_status_update,
@@ -24,7 +24,9 @@ from .views import (
     job_machine_add, job_machine_end, job_machine_list,
     job_financial_summary, job_report,
     # Existing
-    test_view, profile_view, dashboard_view
+    test_view, profile_view, dashboard_view,
+    qr_code, qr_label_sheet, global_search, search_suggestions,
+    protected_file, request_performance
 )
 
 app_name = 'workshop_app'
@@ -39,6 +41,10 @@ urlpatterns = [
     # User profile
     path('profile/', profile_view, name='profile'),
     
+    # Search across materials, machines, jobs and clients
+    path('search/', global_search, name='global_search'),
+    path('api/search/', search_suggestions, name='search_suggestions'),
+    
     # Test view - keeping for backward compatibility
     path('test/', test_view, name='test'),
     
@@ -53,11 +59,18 @@ urlpatterns = [
     # Material Attachment URLs
     path('attachments/<int:attachment_id>/', material_attachment_view, name='material_attachment_view'),
     path('attachments/<int:attachment_id>/download/', material_attachment_download, name='material_attachment_download'),
+    path('attachments/<int:attachment_id>/thumbnail/<str:size>/', material_attachment_thumbnail, name='material_attachment_thumbnail'),
     path('attachments/<int:attachment_id>/delete/', material_attachment_delete, name='material_attachment_delete'),
     
+    # Uploaded files (attachments, receipts, maintenance and client documents)
+    path('files/<str:kind>/<int:pk>/', protected_file, name='protected_file'),
+    
     # Material Scanner URLs - just keep scanner and lookup
     path('scanner/', scanner_view, name='scanner'),
     path('api/material-lookup/', material_lookup, name='material_lookup'),
+    path('api/material-lookup/batch/', material_lookup_batch, name='material_lookup_batch'),
+    path('api/lookup-cache/stats/', lookup_cache_stats, name='lookup_cache_stats'),
+    path('performance/', request_performance, name='request_performance'),
     
     # Machine URLs
     path('machines/', machine_list, name='machine_list'),
@@ -124,4 +137,8 @@ urlpatterns = [
     path('contacts/<int:contact_id>/delete/', contact_delete, name='contact_delete'),
     path('clients/<str:client_id>/communication/add/', communication_add, name='communication_add'),
     path('documents/<int:document_id>/delete/', document_delete, name='document_delete'),
+    
+    # QR codes (rendered on first request)
+    path('qr/labels/', qr_label_sheet, name='qr_label_sheet'),
+    path('qr/<str:kind>/<str:identifier>/', qr_code, name='qr_code'),
 ]
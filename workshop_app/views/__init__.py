@@ -4,10 +4,10 @@ from .material_views import (
     material_entry_add, material_attachment_delete
 )
 from .attachment_views import (
-    material_attachment_view, material_attachment_download
+    material_attachment_view, material_attachment_download, material_attachment_thumbnail
 )
 from .scanner_views import (
-    scanner_view, material_lookup
+    scanner_view, material_lookup, material_lookup_batch, lookup_cache_stats
 )
 from .machine_views import (
     machine_list, machine_detail,
@@ -44,3 +44,7 @@ from .job_financial_views import (
 from .test_view import test_view
 from .user_views import profile_view
 from .dashboard_view import dashboard_view
+from .qr_views import qr_code, qr_label_sheet
+from .search_views import global_search, search_suggestions
+from .file_views import protected_file
+from .performance_views import request_performance
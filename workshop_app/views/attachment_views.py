@@ -1,10 +1,13 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import HttpResponse, Http404
+from django.http import Http404
+from django.utils.cache import patch_vary_headers
 
 from ..models import MaterialAttachment
 from ..forms import MaterialAttachmentForm
+from ..file_serving import file_response, path_response
+from .. import thumbnails
 
 @login_required
 def material_attachment_view(request, attachment_id):
@@ -33,9 +36,7 @@ def material_attachment_view(request, attachment_id):
         return render(request, 'workshop_app/materials/attachment_pdf.html', context)
     else:
         # For other files, prompt download
-        response = HttpResponse(attachment.file, content_type='application/octet-stream')
-        response['Content-Disposition'] = f'attachment; filename="{attachment.file.name.split("/")[-1]}"'
-        return response
+        return file_response(request, attachment.file, as_attachment=True)
 
 @login_required
 def material_attachment_download(request, attachment_id):
@@ -49,7 +50,28 @@ def material_attachment_download(request, attachment_id):
         raise Http404("Attachment not found")
     
     # Serve the file for download
-    response = HttpResponse(attachment.file, content_type='application/octet-stream')
-    response['Content-Disposition'] = f'attachment; filename="{attachment.file.name.split("/")[-1]}"'
-    return response
+    return file_response(request, attachment.file, as_attachment=True)
 
+@login_required
+def material_attachment_thumbnail(request, attachment_id, size):
+    """
+    Scaled-down copy of an image attachment, as WebP where the browser
+    accepts it and JPEG otherwise
+    """
+    attachment = get_object_or_404(MaterialAttachment, id=attachment_id)
+    if size not in thumbnails.THUMBNAIL_SIZES:
+        raise Http404("No such thumbnail size")
+    if not attachment.is_image():
+        return file_response(request, attachment.file)
+    
+    try:
+        path = thumbnails.get_thumbnail(attachment.file.path, size, thumbnails.preferred_format(request))
+    except FileNotFoundError:
+        raise Http404("Attachment file not found")
+    except OSError:
+        # Not an image PIL can read - send the original instead
+        return file_response(request, attachment.file)
+    
+    response = path_response(request, path)
+    patch_vary_headers(response, ['Accept'])
+    return response
@@ -1,12 +1,13 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Q
 from django.http import HttpResponseRedirect
 from django.utils import timezone
 
 from ..models import Client, ContactPerson, ClientHistory, Communication, ClientDocument
 from ..forms import ClientForm, ContactPersonForm, ClientDocumentForm
+from ..pagination import paginate_keyset
+from .. import search_index
 
 
 @login_required
@@ -30,16 +31,14 @@ def client_list(request):
         clients = clients.filter(type=type_filter)
     
     if search_query:
-        clients = clients.filter(
-            Q(name__icontains=search_query) | 
-            Q(client_id__icontains=search_query) |
-            Q(primary_email__icontains=search_query) |
-            Q(phone_number__icontains=search_query) |
-            Q(industry__icontains=search_query)
-        )
+        clients = search_index.filter_queryset(clients, 'client', search_query)
+    
+    # Only the current page is loaded
+    page = paginate_keyset(request, clients, ['name'])
     
     context = {
-        'clients': clients,
+        'clients': page,
+        'page': page,
         'status_choices': Client.STATUS_CHOICES,
         'type_choices': Client.CLIENT_TYPES,
         'selected_status': status_filter,
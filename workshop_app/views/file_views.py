@@ -0,0 +1,28 @@
+from django.shortcuts import get_object_or_404
+from django.contrib.auth.decorators import login_required
+from django.http import Http404
+
+from ..models import MaterialAttachment, MaterialEntry, MachineMaintenance, ClientDocument, Communication
+from ..file_serving import file_response
+
+# Uploaded files that can be served: model and file field
+SERVED_FILES = {
+    'material-attachment': (MaterialAttachment, 'file'),
+    'material-receipt': (MaterialEntry, 'receipt'),
+    'maintenance-receipt': (MachineMaintenance, 'receipt'),
+    'maintenance-docs': (MachineMaintenance, 'documentation'),
+    'client-document': (ClientDocument, 'file'),
+    'communication-attachment': (Communication, 'attachment'),
+}
+
+@login_required
+def protected_file(request, kind, pk):
+    """
+    Serve an uploaded file (inline, or as a download with ?download=1)
+    """
+    if kind not in SERVED_FILES:
+        raise Http404("Unknown file type")
+    
+    model, field = SERVED_FILES[kind]
+    obj = get_object_or_404(model, pk=pk)
+    return file_response(request, getattr(obj, field), as_attachment='download' in request.GET)
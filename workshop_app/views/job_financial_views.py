@@ -17,10 +17,8 @@ def job_financial_summary(request, job_id):
     try:
         financial = job.financial
     except JobFinancial.DoesNotExist:
-        financial = JobFinancial.objects.create(job=job)
-    
-    # Update with latest costs
-    job.create_financial_summary()
+        # Build it once - row saves keep it current after that
+        financial = job.create_financial_summary()
     
     # Handle update of quoted amount
     if request.method == 'POST' and 'update_quote' in request.POST:
@@ -142,10 +140,8 @@ def job_report(request, job_id):
     try:
         financial = job.financial
     except JobFinancial.DoesNotExist:
-        financial = JobFinancial.objects.create(job=job)
-    
-    # Update with latest costs
-    job.create_financial_summary()
+        # Build it once - row saves keep it current after that
+        financial = job.create_financial_summary()
     
     # Get detailed breakdowns
     materials = JobMaterial.objects.filter(job=job).order_by('-date_used')
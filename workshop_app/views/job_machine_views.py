@@ -4,7 +4,7 @@ from django.contrib import messages
 from django.db.models import Q
 from django.utils import timezone
 
-from ..models import Job, JobMachine, Machine, StaffSettings
+from ..models import Job, JobMachine, Machine
 from ..forms import JobMachineForm, QuickMachineStartForm, QuickMachineEndForm
 
 @login_required
@@ -18,14 +18,9 @@ def job_machine_add(request, job_id=None, machine_id=None):
         job = get_object_or_404(Job, job_id=job_id)
     else:
         # Get active job from user settings
-        try:
-            staff_settings = StaffSettings.objects.get(user=request.user)
-            job = staff_settings.active_job
-            if not job:
-                # Redirect to scanner to select a job
-                messages.warning(request, "Please activate a job first.")
-                return redirect('workshop_app:job_scanner_view')
-        except StaffSettings.DoesNotExist:
+        job = request.active_job
+        if not job:
+            # Redirect to scanner to select a job
             messages.warning(request, "Please activate a job first.")
             return redirect('workshop_app:job_scanner_view')
     
@@ -71,6 +66,8 @@ def job_machine_add(request, job_id=None, machine_id=None):
                     request, 
                     f"Started tracking usage of '{machine.name}' for job '{job.project_name}'"
                 )
+                if machine_usage.get_overlapping_sessions().exists():
+                    messages.warning(request, f"'{machine.name}' already has another session running.")
                 
                 # Redirect to job detail
                 return redirect('workshop_app:job_detail', job_id=job.job_id)
@@ -98,16 +95,15 @@ def job_machine_add(request, job_id=None, machine_id=None):
     if request.method == 'POST':
         form = JobMachineForm(request.POST, job=job, user=request.user, machine=machine)
         if form.is_valid():
+            # Saving calculates costs and updates the job's financial summary
             machine_usage = form.save()
+            if machine_usage.get_overlapping_sessions().exists():
+                messages.warning(
+                    request,
+                    f"This usage overlaps another session on '{machine_usage.machine.name}'."
+                )
             
-            # If end time is provided, calculate costs
             if machine_usage.end_time:
-                machine_usage.calculate_costs()
-                machine_usage.save()
-                
-                # Update job financial summary
-                job.create_financial_summary()
-                
                 # Success message
                 duration = machine_usage.get_duration_display()
                 messages.success(
@@ -184,13 +180,9 @@ def job_machine_end(request, usage_id):
                 else:
                     machine_usage.notes = additional_notes
             
-            # Save and calculate costs
-            machine_usage.calculate_costs()
+            # Save and calculate costs (also updates the job's financial summary)
             machine_usage.save()
             
-            # Update job financial summary
-            machine_usage.job.create_financial_summary()
-            
             messages.success(
                 request, 
                 f"Ended machine usage of '{machine_usage.machine.name}'. "
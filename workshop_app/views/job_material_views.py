@@ -1,11 +1,12 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
+from django.db import transaction
 from django.db.models import Q
 from django.http import HttpResponseRedirect, Http404
 from django.utils import timezone
 
-from ..models import Job, JobMaterial, Material, StaffSettings
+from ..models import Job, JobMaterial, Material, StockMovement
 from ..forms import JobMaterialForm, JobMaterialScanForm
 
 @login_required
@@ -19,14 +20,9 @@ def job_material_add(request, job_id=None):
         job = get_object_or_404(Job, job_id=job_id)
     else:
         # Get active job from user settings
-        try:
-            staff_settings = StaffSettings.objects.get(user=request.user)
-            job = staff_settings.active_job
-            if not job:
-                # Redirect to scanner to select a job
-                messages.warning(request, "Please activate a job first.")
-                return redirect('workshop_app:job_scanner_view')
-        except StaffSettings.DoesNotExist:
+        job = request.active_job
+        if not job:
+            # Redirect to scanner to select a job
             messages.warning(request, "Please activate a job first.")
             return redirect('workshop_app:job_scanner_view')
     
@@ -58,15 +54,13 @@ def job_material_add(request, job_id=None):
                     if material.price_per_unit:
                         job_material.unit_price = material.price_per_unit
                     
-                    job_material.save()
-                    
-                    # Update material stock (if not a return)
-                    if form.cleaned_data['result'] != 'returned':
-                        material.current_stock -= form.cleaned_data['quantity']
-                        material.save(update_fields=['current_stock'])
-                    
-                    # Update job financial summary
-                    job.create_financial_summary()
+                    # The usage and its stock movement are saved together or not at all
+                    with transaction.atomic():
+                        job_material.save()
+                        
+                        # Update material stock (if not a return)
+                        if form.cleaned_data['result'] != 'returned':
+                            job_material.take_from_inventory()
                     
                     messages.success(
                         request, 
@@ -135,17 +129,20 @@ def job_material_delete(request, material_id):
         quantity = job_material.quantity
         unit = job_material.material.unit_of_measurement
         
-        # Restore material stock if not a 'returned' record
-        if job_material.result != 'returned':
-            material = job_material.material
-            material.current_stock += job_material.quantity
-            material.save(update_fields=['current_stock'])
-        
-        # Delete the record
-        job_material.delete()
-        
-        # Update job financial summary
-        job.create_financial_summary()
+        with transaction.atomic():
+            # Restore material stock if not a 'returned' record
+            if job_material.result != 'returned':
+                StockMovement.record(
+                    job_material.material,
+                    'return',
+                    job_material.quantity,
+                    reference=job.job_id,
+                    operator_name=request.user.get_full_name() or request.user.username,
+                    notes="Job material usage removed"
+                )
+            
+            # Delete the record (also takes its cost off the job's financial summary)
+            job_material.delete()
         
         messages.success(
             request, 
@@ -5,6 +5,7 @@ from django.contrib import messages
 from django.db.models import Q
 from django.utils import timezone
 
+from .. import lookup_cache
 from ..models import Job, JobStatus, StaffSettings, JobActivityLog
 from ..models import Material, Machine
 
@@ -13,13 +14,11 @@ def job_scanner_view(request):
     """Main job scanner interface page"""
     
     # Get the active job for this user
-    try:
-        staff_settings = StaffSettings.objects.get(user=request.user)
-        active_job = staff_settings.active_job
-    except StaffSettings.DoesNotExist:
+    staff_settings = request.staff_settings
+    active_job = request.active_job
+    if staff_settings is None:
         # Create settings for this user if not exists
-        staff_settings = StaffSettings.objects.create(user=request.user)
-        active_job = None
+        staff_settings = StaffSettings.for_user(request.user, create=True)
         
         # Ensure personal job exists
         staff_settings.ensure_personal_job()
@@ -39,6 +38,24 @@ def job_scanner_view(request):
     
     return render(request, 'workshop_app/jobs/scanner.html', context)
 
+def load_job(identifier):
+    """JSON details of a scanned job, or None, for the lookup cache"""
+    job = Job.objects.select_related('client', 'status').filter(job_id=identifier).first()
+    if job is None:
+        return None
+    
+    return {
+        'found': True,
+        'job_id': job.job_id,
+        'project_name': job.project_name,
+        'client_name': job.client.name if job.client else 'No client',
+        'status': job.status.name,
+        'priority': job.get_priority_display(),
+        'percent_complete': job.percent_complete,
+        'detail_url': f"/jobs/{job.job_id}/",
+        'activate_url': f"/jobs/{job.job_id}/activate/",
+    }
+
 @login_required
 def job_lookup(request):
     """
@@ -52,24 +69,10 @@ def job_lookup(request):
     
     try:
         # Try to find by job_id
-        job = Job.objects.get(job_id=identifier)
+        data = lookup_cache.get('job', identifier, load_job)
+        if data is not None:
+            return JsonResponse(data)
         
-        # Return job details as JSON
-        data = {
-            'found': True,
-            'job_id': job.job_id,
-            'project_name': job.project_name,
-            'client_name': job.client.name if job.client else 'No client',
-            'status': job.status.name,
-            'priority': job.get_priority_display(),
-            'percent_complete': job.percent_complete,
-            'detail_url': f"/jobs/{job.job_id}/",
-            'activate_url': f"/jobs/{job.job_id}/activate/",
-        }
-        
-        return JsonResponse(data)
-        
-    except Job.DoesNotExist:
         return JsonResponse({
             'found': False,
             'error': 'Job not found',
@@ -91,7 +94,7 @@ def job_activate(request, job_id):
     job = get_object_or_404(Job, job_id=job_id)
     
     # Get or create StaffSettings for this user
-    staff_settings, created = StaffSettings.objects.get_or_create(user=request.user)
+    staff_settings = request.staff_settings or StaffSettings.for_user(request.user, create=True)
     
     # Set the job as active
     staff_settings.set_active_job(job)
@@ -120,10 +123,7 @@ def job_deactivate(request):
     Deactivate the current job and return to personal job
     """
     # Get StaffSettings for this user
-    try:
-        staff_settings = StaffSettings.objects.get(user=request.user)
-    except StaffSettings.DoesNotExist:
-        staff_settings = StaffSettings.objects.create(user=request.user)
+    staff_settings = request.staff_settings or StaffSettings.for_user(request.user, create=True)
     
     # Get current active job (for message)
     active_job = staff_settings.active_job
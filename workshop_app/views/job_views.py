@@ -1,7 +1,7 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.db.models import Q, Sum, Count
+from django.db.models import Sum, Count
 from django.http import HttpResponseRedirect
 from django.urls import reverse
 from django.utils import timezone
@@ -9,6 +9,8 @@ from django.utils import timezone
 from ..models import Job, JobStatus, JobMilestone, Client, ContactPerson
 from ..models import JobMaterial, JobMachine, JobLabor, JobFinancial, StaffSettings
 from ..forms import JobForm, JobMilestoneForm, JobStatusForm
+from ..pagination import paginate_keyset
+from .. import search_index
 
 
 @login_required
@@ -37,12 +39,7 @@ def job_list(request):
         jobs = jobs.filter(priority=priority_filter)
     
     if search_query:
-        jobs = jobs.filter(
-            Q(project_name__icontains=search_query) | 
-            Q(job_id__icontains=search_query) |
-            Q(client__name__icontains=search_query) |
-            Q(description__icontains=search_query)
-        )
+        jobs = search_index.filter_queryset(jobs, 'job', search_query)
     
     # Hide completed jobs unless requested
     if not show_completed:
@@ -56,14 +53,14 @@ def job_list(request):
     clients = Client.objects.filter(status='active').order_by('name')
     
     # Get the active job for the current user
-    try:
-        staff_settings = StaffSettings.objects.get(user=request.user)
-        active_job = staff_settings.active_job
-    except StaffSettings.DoesNotExist:
-        active_job = None
+    active_job = request.active_job
+    
+    # Only the current page is loaded
+    page = paginate_keyset(request, jobs.select_related('client', 'status'), ['-created_date'])
     
     context = {
-        'jobs': jobs,
+        'jobs': page,
+        'page': page,
         'statuses': statuses,
         'clients': clients,
         'priority_choices': Job.PRIORITY_CHOICES,
@@ -102,15 +99,10 @@ def job_detail(request, job_id):
     try:
         financial = job.financial
     except JobFinancial.DoesNotExist:
-        financial = JobFinancial.objects.create(job=job)
-        job.create_financial_summary()
+        financial = job.create_financial_summary()
     
     # Check if this is the active job for the current user
-    try:
-        staff_settings = StaffSettings.objects.get(user=request.user)
-        is_active_job = staff_settings.active_job == job
-    except StaffSettings.DoesNotExist:
-        is_active_job = False
+    is_active_job = request.active_job == job
     
     # Get all statuses for the status change form
     all_statuses = JobStatus.objects.all().order_by('order', 'name')
@@ -144,11 +136,7 @@ def job_create(request):
             
             # Set as active job if checkbox checked
             if request.POST.get('set_active', '') == 'on':
-                try:
-                    staff_settings = StaffSettings.objects.get(user=request.user)
-                except StaffSettings.DoesNotExist:
-                    staff_settings = StaffSettings.objects.create(user=request.user)
-                    
+                staff_settings = request.staff_settings or StaffSettings.for_user(request.user, create=True)
                 staff_settings.set_active_job(job)
             
             messages.success(request, f"Job '{job.project_name}' created successfully.")
@@ -5,12 +5,15 @@ from django.db.models.functions import TruncDate, TruncMonth, TruncWeek
 from django.utils import timezone
 import datetime
 
-from ..models import Machine, MachineUsage, MachineMaintenance, MachineType
+from ..models import Machine, MachineSession, MachineMaintenance, MachineType, MachineDailyUsage
+from ..models.machine_daily_usage import PERIODS
+from ..pagination import paginate_keyset
 
 @login_required
 def machine_usage_list(request):
     """
-    Display a list of all machine usage records.
+    Display a list of all machine time, whether it was recorded on the
+    machine or booked to a job.
     """
     # Get filter parameters from request
     machine_id = request.GET.get('machine', '')
@@ -19,8 +22,8 @@ def machine_usage_list(request):
     operator = request.GET.get('operator', '')
     status = request.GET.get('status', '')
     
-    # Start with all usage records
-    usages = MachineUsage.objects.all().select_related('machine').order_by('-start_time')
+    # Start with all machine sessions (usage records and job machine time)
+    usages = MachineSession.objects.all().select_related('machine', 'job').order_by('-start_time')
     
     # Apply filters if provided
     if machine_id:
@@ -51,25 +54,43 @@ def machine_usage_list(request):
     # Get all machines for the filter dropdown
     machines = Machine.objects.all().order_by('machine_id')
     
-    # Calculate totals
-    total_cost = usages.aggregate(total=Sum('total_cost'))['total'] or 0
+    # Calculate per-machine subtotals in one grouped query, then add them up
+    machine_totals = []
+    usage_count = 0
+    total_cost = 0
     total_machine_time = 0
     total_setup_time = 0
     total_cleanup_time = 0
     
-    for usage in usages:
-        if usage.get_duration_minutes():
-            total_machine_time += usage.get_duration_minutes()
-        if usage.setup_time:
-            total_setup_time += usage.setup_time
-        if usage.cleanup_time:
-            total_cleanup_time += usage.cleanup_time
+    for row in usages.totals_by_machine():
+        machine_minutes = row['machine_time'] or 0
+        machine_totals.append({
+            'machine_id': row['machine__machine_id'],
+            'name': row['machine__name'],
+            'count': row['count'],
+            'machine_hours': machine_minutes / 60,
+            'setup_hours': (row['setup_time'] or 0) / 60,
+            'cleanup_hours': (row['cleanup_time'] or 0) / 60,
+            'total_cost': row['total_cost'] or 0,
+        })
+        
+        usage_count += row['count']
+        total_cost += row['total_cost'] or 0
+        total_machine_time += machine_minutes
+        total_setup_time += row['setup_time'] or 0
+        total_cleanup_time += row['cleanup_time'] or 0
     
     # For active sessions, add a current duration
     now = timezone.now()
     
+    # Only the current page is loaded
+    page = paginate_keyset(request, usages, ['-start_time'])
+    
     context = {
-        'usages': usages,
+        'usages': page,
+        'page': page,
+        'usage_count': usage_count,
+        'machine_totals': machine_totals,
         'machines': machines,
         'selected_machine': machine_id,
         'date_from': date_from,
@@ -127,8 +148,13 @@ def maintenance_list(request):
     total_cost = records.aggregate(total=Sum('total_cost'))['total'] or 0
     total_downtime = records.aggregate(total=Sum('downtime_hours'))['total'] or 0
     
+    # Only the current page is loaded
+    page = paginate_keyset(request, records, ['-maintenance_date'])
+    
     context = {
-        'records': records,
+        'records': page,
+        'page': page,
+        'record_count': records.count(),
         'machines': machines,
         'selected_machine': machine_id,
         'selected_type': maintenance_type,
@@ -141,6 +167,44 @@ def maintenance_list(request):
     
     return render(request, 'workshop_app/machines/maintenance_list.html', context)
 
+# Most periods the report shows; longer ranges are grouped by a longer period
+MAX_REPORT_PERIODS = 120
+
+# Rough length of each period in days, to count the periods in a range
+PERIOD_DAYS = {'day': 1, 'week': 7, 'month': 30}
+
+def _period_starts(date_from, date_to, period):
+    """
+    Start date of every period between date_from and date_to, matching the
+    database truncation (weeks start on Monday, months on the 1st), so periods
+    without any usage still get a row.
+    """
+    if period == 'week':
+        current = date_from - datetime.timedelta(days=date_from.weekday())
+    elif period == 'month':
+        current = date_from.replace(day=1)
+    else:
+        current = date_from
+    
+    starts = []
+    while current <= date_to:
+        starts.append(current)
+        if period == 'week':
+            current += datetime.timedelta(days=7)
+        elif period == 'month':
+            current = (current + datetime.timedelta(days=32)).replace(day=1)
+        else:
+            current += datetime.timedelta(days=1)
+    return starts
+
+def _report_period(date_from, date_to, period):
+    """period, or the shortest longer one that keeps the range within MAX_REPORT_PERIODS"""
+    days = (date_to - date_from).days + 1
+    for candidate in PERIODS[PERIODS.index(period):]:
+        if days / PERIOD_DAYS[candidate] <= MAX_REPORT_PERIODS:
+            return candidate
+    return PERIODS[-1]
+
 @login_required
 def machine_usage_report(request):
     """
@@ -148,6 +212,8 @@ def machine_usage_report(request):
     """
     # Get filter parameters
     period = request.GET.get('period', 'month')  # day, week, month
+    if period not in PERIODS:
+        period = 'month'
     date_from = request.GET.get('date_from', '')
     date_to = request.GET.get('date_to', '')
     machine_type = request.GET.get('machine_type', '')
@@ -169,58 +235,74 @@ def machine_usage_report(request):
         except ValueError:
             date_to = timezone.now().date()
     
-    # Filter usage records
-    usages = MachineUsage.objects.filter(
-        start_time__date__gte=date_from,
-        start_time__date__lte=date_to
-    ).select_related('machine', 'machine__machine_type')
+    # Read the daily rollup rather than every session in the range
+    days = MachineDailyUsage.objects.filter(date__gte=date_from, date__lte=date_to)
     
     if machine_type:
-        usages = usages.filter(machine__machine_type__code=machine_type)
+        days = days.filter(machine__machine_type__code=machine_type)
+    
+    # Long ranges are grouped by a longer period rather than into thousands of rows
+    requested_period = period
+    period = _report_period(date_from, date_to, period)
     
-    # Group by machine type
+    # One grouped query: period x machine type x machine, put into a bucket
+    # for every period in the range so gaps show as zero
+    rows = list(days.time_series(period))
+    periods = _period_starts(date_from, date_to, period)
+    period_index = {start: i for i, start in enumerate(periods)}
+    
+    def empty_stats(name):
+        return {
+            'name': name,
+            'total_hours': 0,
+            'total_cost': 0,
+            'count': 0,
+            'series': [{'period': start, 'hours': 0, 'cost': 0, 'count': 0} for start in periods],
+        }
+    
+    overall = empty_stats('All machines')
     machine_type_stats = {}
-    for usage in usages:
-        type_code = usage.machine.machine_type.code
+    machine_usage_stats = {}
+    total_usage_count = 0
+    
+    for row in rows:
+        total_usage_count += row['sessions']
+        hours = row['busy_minutes'] / 60
+        cost = float(row['total_cost'])
+        bucket = period_index[row['period']]
+        
+        type_code = row['machine__machine_type__code']
+        machine_id = row['machine__machine_id']
         if type_code not in machine_type_stats:
-            machine_type_stats[type_code] = {
-                'name': usage.machine.machine_type.name,
-                'total_hours': 0,
-                'total_cost': 0,
-                'count': 0
-            }
+            machine_type_stats[type_code] = empty_stats(row['machine__machine_type__name'])
+        if machine_id not in machine_usage_stats:
+            machine_usage_stats[machine_id] = empty_stats(row['machine__name'])
         
-        # Add duration if completed
-        if usage.end_time:
-            hours = usage.get_duration_minutes() / 60
-            machine_type_stats[type_code]['total_hours'] += hours
-            machine_type_stats[type_code]['count'] += 1
-            if usage.total_cost:
-                machine_type_stats[type_code]['total_cost'] += float(usage.total_cost)
+        for stats in (overall, machine_type_stats[type_code], machine_usage_stats[machine_id]):
+            stats['total_hours'] += hours
+            stats['total_cost'] += cost
+            stats['count'] += row['sessions']
+            stats['series'][bucket]['hours'] += hours
+            stats['series'][bucket]['cost'] += cost
+            stats['series'][bucket]['count'] += row['sessions']
+    
+    machine_type_stats = dict(sorted(machine_type_stats.items()))
+    
+    # Rows for the period table, one column of hours per machine type
+    period_rows = [
+        {
+            'period': bucket['period'],
+            'type_hours': [stats['series'][i]['hours'] for stats in machine_type_stats.values()],
+            'hours': bucket['hours'],
+            'count': bucket['count'],
+            'cost': bucket['cost'],
+        }
+        for i, bucket in enumerate(overall['series'])
+    ]
     
     # Get machine types for filter
     machine_types = MachineType.objects.all().order_by('code')
     
-    # Calculate most used machines
-    machine_usage_stats = {}
-    for usage in usages:
-        machine_id = usage.machine.machine_id
-        if machine_id not in machine_usage_stats:
-            machine_usage_stats[machine_id] = {
-                'name': usage.machine.name,
-                'total_hours': 0,
-                'total_cost': 0,
-                'count': 0
-            }
-        
-        # Add duration if completed
-        if usage.end_time:
-            hours = usage.get_duration_minutes() / 60
-            machine_usage_stats[machine_id]['total_hours'] += hours
-            machine_usage_stats[machine_id]['count'] += 1
-            if usage.total_cost:
-                machine_usage_stats[machine_id]['total_cost'] += float(usage.total_cost)
-    
     # Sort by total hours
     top_machines = sorted(
         machine_usage_stats.items(), 
@@ -230,13 +312,16 @@ def machine_usage_report(request):
     
     context = {
         'period': period,
+        'requested_period': requested_period,
         'date_from': date_from,
         'date_to': date_to,
         'machine_types': machine_types,
         'selected_machine_type': machine_type,
         'machine_type_stats': machine_type_stats,
         'top_machines': top_machines,
-        'total_usage_count': usages.count(),
+        'period_rows': period_rows,
+        'overall_stats': overall,
+        'total_usage_count': total_usage_count,
     }
     
     return render(request, 'workshop_app/machines/usage_report.html', context)
@@ -3,9 +3,12 @@ from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.db.models import Q, Sum, Avg, Count
 from django.utils import timezone
+import datetime
 
 from ..models import Machine, MachineType, MachineUsage, MachineMaintenance, MachineConsumable
 from ..forms import MachineForm, MachineUsageForm, MachineMaintenanceForm, MachineConsumableForm
+from ..pagination import paginate_keyset
+from .. import search_index
 
 @login_required
 def machine_list(request):
@@ -28,18 +31,17 @@ def machine_list(request):
         machines = machines.filter(status=status_filter)
     
     if search_query:
-        machines = machines.filter(
-            Q(name__icontains=search_query) | 
-            Q(machine_id__icontains=search_query) |
-            Q(serial_number__icontains=search_query) |
-            Q(manufacturer__icontains=search_query)
-        )
+        machines = search_index.filter_queryset(machines, 'machine', search_query)
     
     # Get all machine types for the filter dropdown
     machine_types = MachineType.objects.all()
     
+    # Only the current page is loaded
+    page = paginate_keyset(request, machines.select_related('machine_type'), ['name'])
+    
     context = {
-        'machines': machines,
+        'machines': page,
+        'page': page,
         'machine_types': machine_types,
         'selected_type': type_code,
         'selected_status': status_filter,
@@ -60,8 +62,9 @@ def machine_detail(request, machine_id):
         Q(machine_id=machine_id) | Q(serial_number=machine_id)
     )
     
-    # Get usage records
-    usage_records = machine.usage_records.all().order_by('-start_time')[:10]
+    # Recent sessions, whether recorded on the machine or on a job
+    usage_records = machine.sessions.all().order_by('-start_time')[:10]
+    session_count = machine.sessions.count()
     
     # Get maintenance records
     maintenance_records = machine.maintenance_records.all().order_by('-maintenance_date')[:10]
@@ -69,25 +72,33 @@ def machine_detail(request, machine_id):
     # Get consumables
     consumables = machine.consumables.all()
     
-    # Calculate statistics
-    total_usage_time = sum(record.get_duration_minutes() for record in usage_records if record.end_time)
-    total_usage_hours = total_usage_time / 60 if total_usage_time else 0
+    # Usage statistics from the daily rollup
+    usage_totals = machine.daily_usage.totals()
+    total_usage_hours = usage_totals['busy_minutes'] / 60
+    total_usage_cost = usage_totals['total_cost']
+    
+    last_30_days = machine.daily_usage.filter(
+        date__gt=timezone.localdate() - datetime.timedelta(days=30)
+    ).totals()
+    recent_usage_hours = last_30_days['busy_minutes'] / 60
+    # Share of the last 30 days the machine was running
+    recent_utilization = recent_usage_hours / (30 * 24) * 100
     
     # Calculate costs
     total_maintenance_cost = machine.maintenance_records.aggregate(
         total=Sum('total_cost')
     )['total'] or 0
     
-    total_usage_cost = machine.usage_records.aggregate(
-        total=Sum('total_cost')
-    )['total'] or 0
-    
     context = {
         'machine': machine,
         'usage_records': usage_records,
+        'session_count': session_count,
         'maintenance_records': maintenance_records,
         'consumables': consumables,
         'total_usage_hours': total_usage_hours,
+        'total_sessions': usage_totals['sessions'],
+        'recent_usage_hours': recent_usage_hours,
+        'recent_utilization': recent_utilization,
         'total_maintenance_cost': total_maintenance_cost,
         'total_usage_cost': total_usage_cost
     }
@@ -205,6 +216,8 @@ def machine_usage_add(request, machine_id):
         if form.is_valid():
             usage = form.save()
             messages.success(request, 'Machine usage recorded successfully.')
+            if usage.get_overlapping_sessions().exists():
+                messages.warning(request, f"This usage overlaps another session on '{machine.name}'.")
             return redirect('workshop_app:machine_usage_success', usage_id=usage.id)
     else:
         # Pre-fill with current time
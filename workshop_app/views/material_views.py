@@ -2,13 +2,16 @@ from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.db import transaction
-from django.db.models import Q
+from django.db.models import Q, Count, Prefetch
 from django.http import HttpResponseRedirect
 from django.urls import reverse
 from django.utils import timezone
 
 from ..models import Material, MaterialCategory, MaterialType, MaterialEntry, MaterialAttachment, AttachmentType
+from ..models.material import LOW_STOCK_FILTER
 from ..forms import MaterialForm, MaterialEntryForm, MaterialAttachmentForm
+from ..pagination import paginate_keyset
+from .. import search_index
 
 
 @login_required
@@ -22,8 +25,15 @@ def material_list(request):
     search_query = request.GET.get('search', '')
     color_filter = request.GET.get('color', '')
     
-    # Start with all materials
-    materials = Material.objects.all()
+    # Start with all materials, loading each one's type and product images
+    # in a fixed number of queries rather than one per row
+    materials = Material.objects.select_related('material_type').prefetch_related(
+        Prefetch(
+            'attachments',
+            queryset=MaterialAttachment.objects.filter(attachment_type__name='Product'),
+            to_attr='product_images'
+        )
+    )
     
     # Apply filters if provided
     if category_code:
@@ -36,13 +46,7 @@ def material_list(request):
         materials = materials.filter(color=color_filter)
     
     if search_query:
-        materials = materials.filter(
-            Q(name__icontains=search_query) | 
-            Q(material_id__icontains=search_query) |
-            Q(supplier_name__icontains=search_query) |
-            Q(serial_number__icontains=search_query) |
-            Q(supplier_sku__icontains=search_query)
-        )
+        materials = search_index.filter_queryset(materials, 'material', search_query)
     
     # Get all categories for the filter dropdown
     categories = MaterialCategory.objects.all()
@@ -55,20 +59,21 @@ def material_list(request):
     # Get all distinct colors for the filter dropdown
     colors = Material.objects.exclude(color='').values_list('color', flat=True).distinct().order_by('color')
     
-    # Count low stock items
-    low_stock_count = sum(1 for m in materials if m.is_low_stock())
+    # Count low stock items in the database
+    low_stock_count = materials.aggregate(
+        count=Count('pk', filter=LOW_STOCK_FILTER)
+    )['count']
     
-    # For each material, find a product image attachment
-    for material in materials:
-        product_image = MaterialAttachment.objects.filter(
-            material=material, 
-            attachment_type__name='Product'
-        ).first()
-        
-        material.product_image = product_image
+    # Only the current page is loaded
+    page = paginate_keyset(request, materials, ['name'])
+    
+    # For each material, pick its first product image from the prefetched ones
+    for material in page:
+        material.product_image = material.product_images[0] if material.product_images else None
 
     context = {
-        'materials': materials,
+        'materials': page,
+        'page': page,
         'categories': categories,
         'material_types': material_types,
         'colors': colors,
@@ -181,13 +186,10 @@ def material_create(request):
                 material.created_by = request.user  # Set the creator
                 material.save()
                 
-                # Create entry linked to the material
+                # Create entry linked to the material (books the stock purchase)
                 entry = entry_form.save(commit=False)
                 entry.material = material
                 entry.save()
-                
-                # Update material stock and price
-                material.update_price_and_stock()
             
             messages.success(request, 'Material created successfully.')
             return redirect('workshop_app:material_detail', material_id=material.material_id)
@@ -250,13 +252,11 @@ def material_entry_add(request, material_id):
     if request.method == 'POST':
         form = MaterialEntryForm(request.POST, request.FILES, material=material)
         if form.is_valid():
+            # Saving the entry books the purchase and updates stock and average price
             entry = form.save(commit=False)
             entry.material = material
             entry.save()
             
-            # Update material average price and stock
-            material.update_price_and_stock()
-            
             messages.success(request, 'Material purchase added successfully.')
             return redirect('workshop_app:material_detail', material_id=material.material_id)
     else:
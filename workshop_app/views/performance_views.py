@@ -0,0 +1,49 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.shortcuts import render
+from django.utils import timezone
+
+from ..models import RequestSample
+
+# Periods the page can cover, in days
+PERIODS = (1, 7, 30)
+
+SORT_KEYS = {
+    'p95': 'p95_ms',
+    'p50': 'p50_ms',
+    'queries': 'queries',
+    'duplicates': 'duplicate_queries',
+    'count': 'count',
+}
+
+@staff_member_required
+def request_performance(request):
+    """
+    Endpoints ranked by latency (p50/p95) and queries per request, from the
+    requests sampled by RequestMetricsMiddleware
+    """
+    try:
+        days = int(request.GET.get('days', 7))
+    except ValueError:
+        days = 7
+    if days not in PERIODS:
+        days = 7
+    
+    sort = request.GET.get('sort', 'p95')
+    if sort not in SORT_KEYS:
+        sort = 'p95'
+    
+    endpoints = RequestSample.summarize(since=timezone.now() - timedelta(days=days))
+    endpoints.sort(key=lambda endpoint: endpoint[SORT_KEYS[sort]], reverse=True)
+    
+    context = {
+        'endpoints': endpoints,
+        'samples': sum(endpoint['count'] for endpoint in endpoints),
+        'days': days,
+        'periods': PERIODS,
+        'sort': sort,
+        'sample_rate': getattr(settings, 'REQUEST_METRICS_SAMPLE_RATE', 0),
+    }
+    return render(request, 'workshop_app/performance.html', context)
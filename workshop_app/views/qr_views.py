@@ -0,0 +1,92 @@
+from django.shortcuts import get_object_or_404
+from django.contrib.auth.decorators import login_required
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseBadRequest, HttpResponseNotModified, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import patch_cache_control
+import datetime
+
+from ..models import Material, Machine, Job
+from ..qr_codes import FORMATS, get_qr_code
+from .. import qr_labels
+
+# Objects that carry a QR code, by URL kind: (model, identifier field)
+QR_SOURCES = {
+    'material': (Material, 'material_id'),
+    'machine': (Machine, 'machine_id'),
+    'job': (Job, 'job_id'),
+}
+
+@login_required
+def qr_code(request, kind, identifier):
+    """
+    Serve the QR code for a material, machine or job as PNG or SVG
+    (?format=svg). Codes are rendered on first request and cached on disk;
+    the content hash is the ETag, so browsers revalidate without a download.
+    """
+    if kind not in QR_SOURCES:
+        raise Http404("Unknown QR code type")
+    
+    fmt = request.GET.get('format', 'png')
+    if fmt not in FORMATS:
+        raise Http404("Unknown QR code format")
+    
+    model, field = QR_SOURCES[kind]
+    obj = get_object_or_404(model, **{field: identifier})
+    
+    path, digest = get_qr_code(obj.get_qr_data(), fmt)
+    etag = f'"{digest}"'
+    
+    if etag in request.headers.get('If-None-Match', ''):
+        response = HttpResponseNotModified()
+    else:
+        response = FileResponse(open(path, 'rb'), content_type=FORMATS[fmt])
+    
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, max_age=86400)
+    return response
+
+@login_required
+def qr_label_sheet(request):
+    """
+    Printable label sheet for many materials or machines at once, as a
+    multi-page PDF or a streamed SVG.
+    Filters: kind (material/machine), type (type code), created
+    (YYYY-MM-DD or 'today', materials only), ids (comma separated); at
+    least one is required, and a sheet holds at most MAX_SHEET_LABELS.
+    """
+    kind = request.GET.get('kind', 'material')
+    fmt = request.GET.get('format', 'pdf')
+    if kind not in qr_labels.LABEL_SOURCES or fmt not in qr_labels.FORMATS:
+        raise Http404("Unknown label type or format")
+    
+    created = request.GET.get('created', '')
+    if created == 'today':
+        created = timezone.localdate()
+    elif created:
+        try:
+            created = datetime.datetime.strptime(created, '%Y-%m-%d').date()
+        except ValueError:
+            return HttpResponseBadRequest("created must be YYYY-MM-DD or 'today'")
+    
+    identifiers = [value.strip() for value in request.GET.get('ids', '').split(',') if value.strip()]
+    type_code = request.GET.get('type', '')
+    if not (type_code or created or identifiers):
+        return HttpResponseBadRequest("Choose a type, creation date or IDs to print labels for")
+    
+    try:
+        objects = qr_labels.label_queryset(kind, type_code=type_code, created=created, identifiers=identifiers)
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+    
+    items = qr_labels.label_items(kind, objects[:qr_labels.MAX_SHEET_LABELS + 1])
+    if len(items) > qr_labels.MAX_SHEET_LABELS:
+        return HttpResponseBadRequest(
+            f"More than {qr_labels.MAX_SHEET_LABELS} labels - narrow the filters or use manage.py print_labels"
+        )
+    filename = f"{kind}-labels.{fmt}"
+    
+    # Both formats are rendered in this process and streamed as they're made
+    renderer = qr_labels.iter_svg if fmt == 'svg' else qr_labels.iter_pdf
+    response = StreamingHttpResponse(renderer(items), content_type=qr_labels.FORMATS[fmt])
+    response['Content-Disposition'] = f'inline; filename="{filename}"'
+    return response
@@ -1,10 +1,19 @@
+import json
+
 from django.shortcuts import render, get_object_or_404, redirect
 from django.http import JsonResponse
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.db.models import Q
+from django.urls import reverse
+from django.views.decorators.http import require_POST
+
+from .. import lookup_cache
+from ..models import Material, MaterialAttachment
 
-from ..models import Material, MaterialAttachment, AttachmentType, StaffSettings
+# Most identifiers one batch lookup may resolve
+BATCH_LOOKUP_LIMIT = 200
 
 @login_required
 def scanner_view(request):
@@ -14,6 +23,119 @@ def scanner_view(request):
     }
     return render(request, 'workshop_app/materials/scanner.html', context)
 
+def lookup_codes(identifier):
+    """Codes an identifier is looked up by - both halves of an id|serial QR code"""
+    return [part.strip() for part in identifier.split('|') if part.strip()]
+
+def find_materials(identifiers):
+    """
+    {identifier: (material, product image)} for the identifiers that match
+    a material ID or serial number, in two queries however many there are
+    """
+    codes = {code for identifier in identifiers for code in lookup_codes(identifier)}
+    if not codes:
+        return {}
+    
+    by_id = {}
+    by_serial = {}
+    for material in Material.objects.select_related('material_type').filter(
+        Q(material_id__in=codes) | Q(serial_number__in=codes)
+    ):
+        by_id[material.material_id] = material
+        if material.serial_number:
+            by_serial.setdefault(material.serial_number, material)
+    
+    # First product image of each material found
+    product_images = {}
+    for attachment in MaterialAttachment.objects.filter(
+        material__in=by_id.values(), attachment_type__name='Product'
+    ):
+        product_images.setdefault(attachment.material_id, attachment)
+    
+    found = {}
+    for identifier in identifiers:
+        # Material IDs take precedence over serial numbers
+        candidates = lookup_codes(identifier)
+        material = next((by_id[code] for code in candidates if code in by_id), None)
+        if material is None:
+            material = next((by_serial[code] for code in candidates if code in by_serial), None)
+        if material is not None:
+            found[identifier] = (material, product_images.get(material.pk))
+    return found
+
+def material_data(material, product_image):
+    """
+    JSON details of a scanned material, the same for every user, without
+    the stock and price (see with_stock())
+    """
+    data = {
+        'found': True,
+        'material_id': material.material_id,
+        'serial_number': material.serial_number,
+        'name': material.name,
+        'type': material.material_type.name,
+        'unit': material.unit_of_measurement,
+        'supplier_name': material.supplier_name,
+        'detail_url': f"/materials/{material.material_id}/",
+        'has_product_image': product_image is not None,
+    }
+    
+    # Add the image URLs if available (a thumbnail, to keep scans quick on Wi-Fi)
+    if product_image:
+        data['product_image_url'] = product_image.get_thumbnail_url('medium')
+        data['product_thumbnail_url'] = product_image.get_thumbnail_url('small')
+        data['product_image_original_url'] = reverse('workshop_app:protected_file', args=['material-attachment', product_image.pk])
+    
+    return data
+
+def load_materials(identifiers):
+    """{identifier: material details or None}, for the lookup cache"""
+    found = find_materials(identifiers)
+    return {identifier: material_data(*found[identifier]) for identifier in found}
+
+def with_stock(found):
+    """
+    Cached lookups with each material's current stock and average price
+    added, read in one query: they change with every stock movement, so
+    they aren't cached. Materials deleted since they were cached come back
+    as None.
+    """
+    material_ids = {data['material_id'] for data in found.values() if data is not None}
+    stock = {}
+    if material_ids:
+        stock = {
+            material_id: (current_stock, price_per_unit)
+            for material_id, current_stock, price_per_unit in Material.objects.filter(
+                material_id__in=material_ids
+            ).values_list('material_id', 'current_stock', 'price_per_unit')
+        }
+    
+    results = {}
+    for identifier, data in found.items():
+        if data is not None and data['material_id'] in stock:
+            current_stock, price_per_unit = stock[data['material_id']]
+            data = {
+                **data,
+                'current_stock': float(current_stock),
+                'price_per_unit': str(price_per_unit) if price_per_unit else '',
+            }
+        else:
+            data = None
+        results[identifier] = data
+    return results
+
+def with_active_job(data, active_job):
+    """A material's details with the user's active job added"""
+    data = {**data, 'has_active_job': active_job is not None}
+    
+    # Add job-related URLs if there's an active job
+    if active_job:
+        data['job_material_url'] = f"/jobs/material/add/?material_id={data['material_id']}"
+        data['active_job_name'] = active_job.project_name
+        data['active_job_id'] = active_job.job_id
+    
+    return data
+
 @login_required
 def material_lookup(request):
     """
@@ -26,76 +148,16 @@ def material_lookup(request):
         return JsonResponse({'error': 'No identifier provided'}, status=400)
     
     try:
-        # Check if the identifier contains a pipe character (from QR code)
-        if '|' in identifier:
-            # Split the identifier by pipe
-            parts = identifier.split('|')
-            # Try to find by either part
-            material = Material.objects.get(
-                Q(material_id=parts[0]) | Q(serial_number=parts[0]) |
-                Q(material_id=parts[1]) | Q(serial_number=parts[1])
-            )
-        else:
-            # Original search logic for identifiers without pipe
-            material = Material.objects.get(
-                Q(material_id=identifier) | Q(serial_number=identifier)
-            )
-            
-        # Look for a product image
-        product_image = None
-        try:
-            product_attachment_type = AttachmentType.objects.get(name='Product')
-            product_image = MaterialAttachment.objects.filter(
-                material=material,
-                attachment_type=product_attachment_type
-            ).first()
-        except AttachmentType.DoesNotExist:
-            # Product attachment type doesn't exist
-            pass
-        
-        # Get active job from user settings
-        active_job = None
-        try:
-            staff_settings = StaffSettings.objects.get(user=request.user)
-            active_job = staff_settings.active_job
-        except StaffSettings.DoesNotExist:
-            pass
-            
-        # Return material details as JSON
-        data = {
-            'found': True,
-            'material_id': material.material_id,
-            'serial_number': material.serial_number,
-            'name': material.name,
-            'type': material.material_type.name,
-            'current_stock': float(material.current_stock),
-            'unit': material.unit_of_measurement,
-            'supplier_name': material.supplier_name,
-            'price_per_unit': str(material.price_per_unit) if material.price_per_unit else '',
-            'detail_url': f"/materials/{material.material_id}/",
-            'has_product_image': product_image is not None,
-            'has_active_job': active_job is not None,
-        }
-        
-        # Add job-related URLs if there's an active job
-        if active_job:
-            data['job_material_url'] = f"/jobs/material/add/?material_id={material.material_id}"
-            data['active_job_name'] = active_job.project_name
-            data['active_job_id'] = active_job.job_id
+        data = with_stock(lookup_cache.get_many('material', [identifier], load_materials))[identifier]
+        if data is None:
+            return JsonResponse({
+                'found': False,
+                'error': 'Material not found',
+                'message': f'No material found with ID or serial number: {identifier}',
+                'scanned_id': identifier  # Include the scanned ID in the response
+            }, status=404)
         
-        # Add the image URL if available
-        if product_image:
-            data['product_image_url'] = product_image.file.url
-        
-        return JsonResponse(data)
-        
-    except Material.DoesNotExist:
-        return JsonResponse({
-            'found': False,
-            'error': 'Material not found',
-            'message': f'No material found with ID or serial number: {identifier}',
-            'scanned_id': identifier  # Include the scanned ID in the response
-        }, status=404)
+        return JsonResponse(with_active_job(data, request.active_job))
     
     except Exception as e:
         return JsonResponse({
@@ -104,3 +166,56 @@ def material_lookup(request):
             'message': str(e),
             'scanned_id': identifier  # Include the scanned ID in the response
         }, status=500)
+
+@login_required
+@require_POST
+def material_lookup_batch(request):
+    """
+    API endpoint to look up many scanned materials at once, e.g. a tray
+    at kitting time. Takes a JSON body {"identifiers": [...]} (or repeated
+    identifiers form fields) and returns the details of each, keyed by
+    the identifier as scanned, with found: false for unknown ones.
+    """
+    if request.content_type == 'application/json':
+        try:
+            identifiers = json.loads(request.body).get('identifiers')
+        except (ValueError, AttributeError):
+            return JsonResponse({'error': 'Invalid JSON'}, status=400)
+    else:
+        identifiers = request.POST.getlist('identifiers')
+    
+    if not isinstance(identifiers, list) or not all(isinstance(i, str) for i in identifiers):
+        return JsonResponse({'error': 'identifiers must be a list of strings'}, status=400)
+    identifiers = list(dict.fromkeys(i for i in identifiers if i))
+    if not identifiers:
+        return JsonResponse({'error': 'No identifiers provided'}, status=400)
+    if len(identifiers) > BATCH_LOOKUP_LIMIT:
+        return JsonResponse({'error': f'At most {BATCH_LOOKUP_LIMIT} identifiers per request'}, status=400)
+    
+    found = with_stock(lookup_cache.get_many('material', identifiers, load_materials))
+    active_job = request.active_job
+    
+    results = {}
+    for identifier, data in found.items():
+        if data is not None:
+            results[identifier] = with_active_job(data, active_job)
+        else:
+            results[identifier] = {
+                'found': False,
+                'message': f'No material found with ID or serial number: {identifier}',
+                'scanned_id': identifier,
+            }
+    
+    return JsonResponse({
+        'results': results,
+        'found': sum(1 for data in found.values() if data is not None),
+        'not_found': [identifier for identifier, data in found.items() if data is None],
+    })
+
+@staff_member_required
+def lookup_cache_stats(request):
+    """
+    API endpoint with the scanner lookup cache's counters: lookups answered
+    by each tier, their average time and the overall hit rate
+    """
+    return JsonResponse(lookup_cache.get_stats())
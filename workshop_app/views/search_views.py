@@ -0,0 +1,66 @@
+from django.shortcuts import render
+from django.contrib.auth.decorators import login_required
+from django.http import JsonResponse
+from django.urls import reverse
+
+from .. import search_index, typeahead
+
+# Results shown on the global search page
+GLOBAL_SEARCH_LIMIT = 50
+
+# Most suggestions a typeahead request can ask for
+MAX_SUGGESTIONS = 50
+
+
+@login_required
+def global_search(request):
+    """
+    Search materials, machines, jobs and clients at once, best matches first
+    """
+    query = request.GET.get('q', '').strip()
+    
+    results = []
+    if query:
+        for kind, obj in search_index.search(query, limit=GLOBAL_SEARCH_LIMIT):
+            identifier, title, body = search_index.document(kind, obj)
+            if not identifier:
+                # Not given an ID yet - no detail page to link to
+                continue
+            results.append({
+                'kind': kind,
+                'identifier': identifier,
+                'title': title,
+                'details': body,
+                'url': reverse(f'workshop_app:{kind}_detail', args=[identifier]),
+            })
+    
+    context = {
+        'query': query,
+        'results': results,
+    }
+    
+    return render(request, 'workshop_app/search.html', context)
+
+
+@login_required
+def search_suggestions(request):
+    """
+    API endpoint for typeahead: materials, machines and jobs whose ID,
+    serial number, SKU or name starts with q, as compact JSON.
+    Optional: type=material,machine to limit the kinds, limit=N.
+    """
+    query = request.GET.get('q', '')
+    
+    kinds = [kind for kind in request.GET.get('type', '').split(',') if kind]
+    if any(kind not in typeahead.TYPEAHEAD_SOURCES for kind in kinds):
+        return JsonResponse({'error': 'Unknown type'}, status=400)
+    
+    try:
+        limit = max(1, min(int(request.GET.get('limit', typeahead.SUGGESTION_LIMIT)), MAX_SUGGESTIONS))
+    except ValueError:
+        return JsonResponse({'error': 'limit must be a number'}, status=400)
+    
+    return JsonResponse({
+        'query': query,
+        'results': typeahead.suggest(query, kinds or None, limit),
+    })
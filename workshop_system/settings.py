@@ -13,6 +13,8 @@ https://docs.djangoproject.com/en/4.2/ref/settings/
 from pathlib import Path
 import os
 
+import django
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -45,11 +47,13 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'workshop_app.middleware.RequestMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'workshop_app.middleware.ActiveJobMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -85,6 +89,56 @@ DATABASES = {
     }
 }
 
+# 'production' tunes SQLite for several people scanning at once: the
+# SQLITE_PRAGMAS below are run on each new connection (WAL lets readers
+# carry on while a write is in progress) and connections are kept open
+# between requests. 'development' leaves SQLite's defaults.
+DATABASE_PROFILE = os.environ.get('WORKSHOP_DATABASE_PROFILE', 'development')
+
+SQLITE_PRAGMAS = {
+    'journal_mode': 'wal',
+    # Safe with WAL: a power cut can lose the last commits, never corrupt
+    'synchronous': 'normal',
+    # Milliseconds to wait for another writer before "database is locked"
+    'busy_timeout': 20000,
+    'mmap_size': 256 * 1024 * 1024,
+    # Negative means KiB: 64 MB of page cache per connection
+    'cache_size': -64000,
+    'temp_store': 'memory',
+}
+
+if DATABASE_PROFILE == 'production':
+    DATABASES['default'].update({
+        'CONN_MAX_AGE': 600,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            'timeout': SQLITE_PRAGMAS['busy_timeout'] / 1000,
+        },
+    })
+    if django.VERSION >= (5, 1):
+        # Take the write lock when a transaction begins, so a transaction
+        # that reads before writing waits its turn instead of failing
+        DATABASES['default']['OPTIONS']['transaction_mode'] = 'IMMEDIATE'
+
+
+# Cache
+# The dashboard tiles and scanner lookups are cached here and dropped when
+# the rows behind them change. The default local-memory cache is private to
+# each process, so a change made through one worker isn't seen by the
+# others: with more than one worker process, point WORKSHOP_REDIS_URL at a
+# Redis server (needs the redis package) or configure another shared backend.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+if os.environ.get('WORKSHOP_REDIS_URL'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ['WORKSHOP_REDIS_URL'],
+    }
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -131,6 +185,40 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Hand uploaded files to the front web server instead of streaming them from
+# Django: None, 'x-sendfile' (Apache mod_xsendfile) or 'x-accel' (nginx, with an
+# internal location serving MEDIA_ROOT at FILE_OFFLOAD_PREFIX)
+FILE_OFFLOAD = None
+FILE_OFFLOAD_PREFIX = '/protected-media/'
+
+# Every request's query count and timings are logged on
+# 'workshop_app.requests' (and sent back in a Server-Timing header to staff,
+# or to everyone with DEBUG on); this fraction of requests is also stored for
+# the staff performance page. Each sample is a write on the request path,
+# competing with the app's own writes for SQLite's single writer, so it's
+# off unless WORKSHOP_REQUEST_SAMPLE_RATE turns it on while investigating.
+REQUEST_METRICS_SAMPLE_RATE = float(os.environ.get('WORKSHOP_REQUEST_SAMPLE_RATE', '0'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        # Every request is logged at INFO and requests that repeat a query at
+        # WARNING; only the warnings by default, set WORKSHOP_REQUEST_LOG_LEVEL
+        # to INFO for a line per request
+        'workshop_app.requests': {
+            'handlers': ['console'],
+            'level': os.environ.get('WORKSHOP_REQUEST_LOG_LEVEL', 'WARNING'),
+            'propagate': False,
+        },
+    },
+}
+
 # Login/logout settings
 LOGIN_URL = 'login'
 LOGIN_REDIRECT_URL = '/'